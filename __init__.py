@@ -1,9 +1,35 @@
+import argparse
+import bisect
+import calendar
+import contextlib
+import datetime
+import cProfile
+import ctypes
 import glob
+import itertools
 import re
 import time
-import cloudscraper
+import random
+import threading
 import urllib.request
+import urllib.parse
+import urllib.error
+import sqlite3
 import json
+import codecs
+import io
+import socket
+import select
+import signal
+import shutil
+import hashlib
+import struct
+import zipfile
 import os
-from bs4 import BeautifulSoup
+import sys
+from array import array
+from collections import Counter, deque, namedtuple
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from colorama import Back, Fore, Style
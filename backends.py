@@ -0,0 +1,164 @@
+# --------------------------------
+# File      : backends.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Fetch backends; the one place MVM actually talks to the network. ModVersionMaintainer
+#             and the crawler take a backend so it can be swapped out (e.g. for the local stand-in server).
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from cache import CachedResponse
+from sessions import SessionPool
+
+
+class StreamedResponse:
+    # A urllib response that hasn't been read yet, shaped like a requests.Response made with stream=True
+    def __init__(self, url, status_code, headers, raw) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self._raw = raw
+        self._content = None
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def content(self):
+        # Like requests, reading the content consumes the stream once and keeps the result
+        if self._content is None:
+            self._content = self._raw.read() or b''
+            self._raw.close()
+        return self._content
+
+    def iter_content(self, chunk_size = 64 * 1024):
+        for chunk in iter(lambda: self._raw.read(chunk_size), b''):
+            yield chunk
+
+    def close(self) -> None:
+        self._raw.close()
+
+
+class RequestRefused(Exception):
+    # Raised by a backend that won't send a request at all (e.g. its hourly budget for the host is spent).
+    # Nothing went over the network, so retrying right away can't help.
+    pass
+
+
+# Sent by sessions that don't bring a User-Agent of their own (plain urllib)
+DEFAULT_USER_AGENT = 'Mozilla/5.0'
+
+
+def request_headers(session, headers = None) -> dict:
+    # Headers for one request on a session. A session with headers of its own (a cloudscraper session) keeps its User-Agent:
+    # that's the one its Cloudflare clearance was issued to and the one saved with the cookie, so overriding it per
+    # request would send the cookie with a different user agent and lose the clearance.
+    headers = dict(headers or {})
+    if 'User-Agent' not in (getattr(session, 'headers', None) or {}):
+        headers.setdefault('User-Agent', DEFAULT_USER_AGENT)
+    return headers
+
+
+class FetchBackend:
+    # A backend needs two things:
+    #   get(url, headers, stream)  -> a response with status_code, ok, content, text and headers, for one-off fetches.
+    #                                 With stream=True the body isn't read up front and comes out of iter_content() instead.
+    #   session()                  -> an object with .get(url, headers=..., stream=...) returning the same, handed to one
+    #                                 crawler/download worker each
+    def get(self, url, headers = None, stream = False):
+        raise NotImplementedError
+
+    #   acquire() / release(session, status)
+    #                              -> borrow a session for a request or two and give it back with the last status code,
+    #                                 so backends that pool their sessions can reuse (or throw out) them
+    def session(self):
+        # Backends without any per-connection state can just serve the workers themselves
+        return self
+
+    def acquire(self):
+        return self.session()
+
+    def release(self, session, status = None) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class UrllibBackend(FetchBackend):
+    def __init__(self, timeout = 30) -> None:
+        self._timeout = timeout
+
+    def get(self, url, headers = None, stream = False):
+        # urllib raises on anything that isn't a 2xx, including the 304 the cache asks for when revalidating,
+        # so we catch it and turn it into a plain response like requests would give us.
+        req = urllib.request.Request(url, headers=headers or {})
+        try:
+            res = urllib.request.urlopen(req, timeout=self._timeout)
+            status = res.status
+        except urllib.error.HTTPError as e:
+            res, status = e, e.code
+
+        if stream:
+            return StreamedResponse(url, status, dict(res.headers or {}), res)
+
+        with res:
+            return CachedResponse(url, status, res.read() or b'', dict(res.headers or {}))
+
+
+class ScraperBackend(UrllibBackend):
+    # The default: GitHub and Mojang are plain urllib requests like they always were, while CurseForge crawl workers
+    # each get a CloudFare bypass scraper (cloudscraper sessions aren't safe to share between threads).
+    #
+    # Scrapers are pooled: a worker borrows one per request and hands it back, so its kept-alive connections and any
+    # Cloudflare clearance it earned go to the next request instead of being thrown away. Clearance cookies are also
+    # written to cookie_path, so the next run doesn't have to solve the challenge again either.
+    def __init__(self, timeout = 30, delay = 10, pool_size = 8, cookie_path = None) -> None:
+        super().__init__(timeout)
+        self._delay = delay
+        self._pool = SessionPool(self.session, size=pool_size, cookie_path=cookie_path)
+
+    @property
+    def pool(self):
+        return self._pool
+
+    def session(self):
+        # cloudscraper (and requests under it) take a while to import, and scan-only runs never crawl at all
+        import cloudscraper
+        return cloudscraper.create_scraper(delay=self._delay)
+
+    def acquire(self):
+        return self._pool.acquire()
+
+    def release(self, session, status = None) -> None:
+        self._pool.release(session, status)
+
+    def close(self) -> None:
+        self._pool.close()
@@ -0,0 +1,238 @@
+# --------------------------------
+# File      : batch.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Headless batch entry point; scans many mods folders in parallel, crawls every distinct
+#             CurseForge mod only once across all of them and writes the results as JSON or NDJSON.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from crawler import Crawler
+from filetable import parse_file_page
+from mvm import ModVersionMaintainer
+from standin import StandinBackend
+from instrument import TRACER, profiled
+
+
+def read_manifest(path) -> list:
+    # Either a JSON list of folders / {"path": ..., "loader": ..., "mc_version": ...} objects,
+    # or a plain text file with one folder per line (blank lines and # comments ignored)
+    with open(path, 'r') as file:
+        content = file.read()
+
+    if path.lower().endswith('.json'):
+        return [entry if isinstance(entry, dict) else {'path': entry} for entry in json.loads(content)]
+
+    return [{'path': line.strip()} for line in content.splitlines() if line.strip() and not line.strip().startswith('#')]
+
+
+def check_disclaimer(accept) -> bool:
+    # Same file main.py uses; accepting it from the command line is remembered the same way
+    with open('disclaimer.txt', 'r') as file:
+        if "AGREE=YES" in file.read():
+            return True
+
+    if accept:
+        with open('disclaimer.txt', 'a') as file:
+            file.write('\nAGREE=YES')
+        return True
+
+    return False
+
+
+def make_backend(args):
+    # Default (real servers) unless pointed at a stand-in server
+    return StandinBackend(args.standin) if args.standin else None
+
+
+def scan_folder(entry, args, jar_store = None) -> ModVersionMaintainer:
+    mvm = ModVersionMaintainer(offline=args.offline, hash_jars=args.hash_jars, backend=make_backend(args), jar_store=jar_store)
+    mvm.mods_folder = entry['path']
+    mvm.process_mods(mod_type=entry.get('loader') or args.loader, mc_version=entry.get('mc_version') or args.mc_version, interactive=False)
+    return mvm
+
+
+def folder_result(mvm, links, results) -> dict:
+    mods = []
+    for key, jar_file in mvm.mods_dict.items():
+        slug, url = links[key]
+        result = results.get(url)
+        metadata = mvm.mods_metadata.get(key)
+
+        if result is None and mvm.slug_table.is_missing(key, slug):
+            status = 404
+        elif result is None or result.response is None:
+            status = None
+        else:
+            status = result.response.status_code
+
+        mods.append({
+            'name': key,
+            'jar': jar_file,
+            'slug': slug,
+            'url': url,
+            'status': status,
+            'known_outlier': mvm.known_outliers.get(slug),
+            'metadata': metadata._asdict() if metadata else None,
+            'files': [file._asdict() for file in mvm.mod_files.get(key, [])],
+        })
+
+    report = mvm.version_report
+    diff = mvm.scan_diff
+    return {
+        'folder': mvm.mods_folder,
+        'mod_type': mvm.mod_type,
+        'mc_version': mvm.mc_version,
+        'mixed_versions': report.mixed if report else False,
+        'version_histogram': dict(report.histogram) if report else {},
+        'scan': {name: len(jars) for name, jars in diff._asdict().items()} if diff else {},
+        'mods': mods,
+    }
+
+
+def run(entries, args) -> list:
+    # 1. Scan every folder in parallel. Loading the aliases/outliers once up front warms the cache,
+    #    so the instances below don't all go off and fetch the same files at the same time.
+    warm = ModVersionMaintainer(offline=args.offline, backend=make_backend(args), prefetch=False, jar_store=args.jar_store)
+    warm.known_aliases, warm.known_outliers
+    with ThreadPoolExecutor(max_workers=args.folder_workers) as pool:
+        instances = list(pool.map(lambda entry: scan_folder(entry, args, warm.jar_store), entries))
+
+    # Every folder shares one file store, so a mod's files are stored once no matter how many folders have it
+    store = warm.file_store
+    for mvm in instances:
+        mvm.file_store = store
+
+    # 2. Work out every mod's link (the first page of its files, filtered to the folder's game version or loader), then group
+    #    the (folder, mod) pairs by link so each distinct page is fetched once. Links that 404'd recently are left out entirely.
+    links, pages = {}, {}
+    for mvm in instances:
+        mc_version = mvm.mc_version if mvm.mc_version != 'unknown' else None
+        links[id(mvm)] = {}
+        for key in mvm.mods_dict:
+            slug, _ = mvm.build_mod_link(key)
+            links[id(mvm)][key] = (slug, mvm.build_files_link(slug, str(mvm.mod_type).lower(), mc_version))
+        for key, (slug, url) in links[id(mvm)].items():
+            if not mvm.slug_table.is_missing(key, slug):
+                pages.setdefault(url, []).append((mvm, key))
+
+    print(f"{Fore.LIGHTMAGENTA_EX}{sum(len(mvm.mods_dict) for mvm in instances)} mods across {len(instances)} folders, {len(pages)} distinct CurseForge pages to check.{Style.RESET_ALL}")
+
+    # 3. Crawl the distinct pages once, parse each page once, and hand the rows to every folder that has the mod
+    cache = instances[0].cache if instances else None
+    backend = instances[0].backend if instances else None
+    crawler = Crawler(workers=args.workers, rate=args.rate, retries=0 if args.offline else args.retries, backend=backend, cache=cache)
+    results = {}
+    for result in crawler.crawl({url: url for url in pages}):
+        results[result.url] = result
+        if result.response is not None and result.response.ok:
+            # Rows are merged into the mod's files, whichever listing (game version or loader filter) the page was;
+            # each folder then takes the files for its own game version and loader
+            slug = links[id(pages[result.url][0][0])][pages[result.url][0][1]][0]
+            source = hashlib.sha1(result.response.content).hexdigest()
+            if store.source(slug, result.url) != source:
+                with TRACER.span('parse', 'mod', url=result.url):
+                    rows, filters = parse_file_page(result.response.content)
+                    store.extend(slug, rows, result.url, source)
+                    store.learn_filters(filters)
+            for mvm, key in pages[result.url]:
+                mc_version = mvm.mc_version if mvm.mc_version != 'unknown' else None
+                mvm.mod_files[key] = store.files(slug, mc_version, str(mvm.mod_type).lower())
+                mvm.slug_table.record(key, links[id(mvm)][key][0], found=True)
+        elif result.response is not None and result.response.status_code == 404:
+            for mvm, key in pages[result.url]:
+                mvm.slug_table.record(key, links[id(mvm)][key][0], found=False)
+        print(f"{result.response.status_code if result.response is not None else 'ERR'} | {result.url}")
+
+    for mvm in instances:
+        mvm.slug_table.save()
+    store.save()
+
+    return [folder_result(mvm, links[id(mvm)], results) for mvm in instances]
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Check many mods folders at once, without any prompts.")
+    parser.add_argument('folders', nargs='*', help="mods folders to check")
+    parser.add_argument('-m', '--manifest', help="JSON list or text file (one folder per line) of mods folders to check")
+    parser.add_argument('--loader', choices=['fabric', 'forge'], help="mod loader for every folder (skips detection)")
+    parser.add_argument('--mc-version', help="Minecraft version for every folder (skips detection)")
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help="json: one document, ndjson: one line per folder")
+    parser.add_argument('-o', '--output', help="write results here instead of stdout")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent CurseForge requests")
+    parser.add_argument('--folder-workers', type=int, default=4, help="folders scanned at once")
+    parser.add_argument('--rate', type=float, default=2.0, help="max requests per second per host")
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--offline', action='store_true', help="only use cached responses")
+    parser.add_argument('--hash-jars', action='store_true', help="also record SHA-1 and CurseForge fingerprints of jars")
+    parser.add_argument('--jar-store', action='store_true', help="keep every jar in the store shared by all mods folders (see jarstore.py)")
+    parser.add_argument('--standin', metavar='URL', help="send every request to a stand-in server (see standin.py) instead")
+    parser.add_argument('--trace', metavar='FILE', help="write a timing trace of the run to FILE")
+    parser.add_argument('--trace-format', choices=['chrome', 'json'], default='chrome', help="chrome: trace viewer format, json: per stage summary plus spans")
+    parser.add_argument('--profile', metavar='FILE', help="run under cProfile and dump the stats to FILE")
+    parser.add_argument('--accept-disclaimer', action='store_true', help="accept disclaimer.txt without being asked")
+    args = parser.parse_args(argv)
+
+    entries = [{'path': folder} for folder in args.folders]
+    if args.manifest:
+        entries += read_manifest(args.manifest)
+    if not entries:
+        parser.error("no mods folders given")
+
+    if not check_disclaimer(args.accept_disclaimer):
+        print("The disclaimer in disclaimer.txt has not been accepted. Run main.py once or pass --accept-disclaimer.", file=sys.stderr)
+        return 2
+
+    if args.trace:
+        TRACER.enable()
+
+    # Progress messages all go to stderr so stdout stays clean, machine-readable output
+    with contextlib.redirect_stdout(sys.stderr), profiled(args.profile):
+        with TRACER.span('batch', folders=len(entries)):
+            folders = run(entries, args)
+
+    if args.trace:
+        TRACER.save(args.trace, args.trace_format)
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        if args.format == 'ndjson':
+            for folder in folders:
+                out.write(json.dumps(folder) + '\n')
+        else:
+            json.dump(folders, out, indent=2)
+            out.write('\n')
+    finally:
+        if args.output: out.close()
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
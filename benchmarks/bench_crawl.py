@@ -0,0 +1,95 @@
+# --------------------------------
+# File      : benchmarks/bench_crawl.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Measures crawl throughput and retry behaviour of the crawler against the local stand-in
+#             server, with configurable latency and 403/503 rates. Needs no network access.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+# Run straight from a checkout: python benchmarks/bench_crawl.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawler import Crawler
+from filetable import parse_file_table
+from standin import StandinBackend, StandinServer
+
+
+def run(mods, workers, rate, latency, jitter, rate_403, rate_503, delay, retries, seed = 1):
+    with StandinServer(latency=latency, jitter=jitter, rate_403=rate_403, rate_503=rate_503, default_page='sodium', seed=seed) as server:
+        crawler = Crawler(workers=workers, rate=rate, retries=retries, delay=delay, max_delay=delay * 8, backend=StandinBackend(server.address))
+        urls = {f"mod-{i}": f"https://www.curseforge.com/minecraft/mc-mods/mod-{i}/files" for i in range(mods)}
+
+        statuses, attempts, rows = Counter(), Counter(), 0
+        start = time.perf_counter()
+        for result in crawler.crawl(urls):
+            statuses[result.response.status_code if result.response is not None else 'error'] += 1
+            attempts[result.attempts] += 1
+            if result.response is not None and result.response.ok:
+                rows += len(parse_file_table(result.response.content))
+        seconds = time.perf_counter() - start
+
+    return {
+        'mods': mods,
+        'workers': workers,
+        'seconds': seconds,
+        'mods_per_second': mods / seconds if seconds else 0.0,
+        'requests': server.stats['requests'],
+        'rows': rows,
+        'final_statuses': dict(statuses),
+        'attempts': dict(sorted(attempts.items())),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the crawler against the local stand-in server.")
+    parser.add_argument('--mods', type=int, default=200)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4, 8, 16])
+    parser.add_argument('--rate', type=float, default=0, help="max requests per second (0 = unlimited)")
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.02)
+    parser.add_argument('--rate-403', type=float, default=0.05)
+    parser.add_argument('--rate-503', type=float, default=0.02)
+    parser.add_argument('--delay', type=float, default=0.05, help="base backoff delay in seconds")
+    parser.add_argument('--retries', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'workers'.rjust(7)} {'seconds'.rjust(8)} {'mods/s'.rjust(8)} {'requests'.rjust(8)}  attempts / final statuses")
+    for workers in args.workers:
+        result = run(args.mods, workers, args.rate, args.latency, args.jitter, args.rate_403, args.rate_503, args.delay, args.retries)
+        print(f"{workers:7d} {result['seconds']:8.2f} {result['mods_per_second']:8.1f} {result['requests']:8d}  {result['attempts']} / {result['final_statuses']}")
+
+
+if __name__ == '__main__':
+    main()
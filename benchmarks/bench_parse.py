@@ -0,0 +1,116 @@
+# --------------------------------
+# File      : benchmarks/bench_parse.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Compares parse time and peak memory of the streaming files table extractor
+#             against the old BeautifulSoup path, on the synthetic CurseForge pages in benchmarks/fixtures.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+# Run straight from a checkout: python benchmarks/bench_parse.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from filetable import FILE_HEADERS, parse_file_table
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+
+def parse_bs4(page):
+    # The parsing loop process_links used before the streaming extractor, kept here as the baseline
+    from bs4 import BeautifulSoup
+
+    files = []
+    soup = BeautifulSoup(page, "html.parser")
+    for tr in soup.select("tr"):
+        file_attr_dict = {}
+        for counter, td in enumerate(tr.find_all("td")):
+            if '\n' in td.text.strip():
+                file_attr = td.text.strip().split('\n')[0]
+            else:
+                file_attr = td.text.strip()
+            file_attr_dict.update({FILE_HEADERS[counter]: file_attr})
+        files.append(file_attr_dict)
+    return files
+
+
+def measure(parse, page, iterations):
+    # Best of n for time, then one extra traced run for the peak memory so tracing doesn't skew the timing
+    best = float('inf')
+    for _ in range(iterations):
+        start = time.perf_counter()
+        rows = parse(page)
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    parse(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'rows': len(rows), 'seconds': best, 'peak_bytes': peak}
+
+
+def run(fixtures, iterations = 20):
+    try:
+        import bs4
+        parsers = {'bs4': parse_bs4, 'stream': parse_file_table}
+    except ImportError:
+        print("bs4 is not installed, only the streaming extractor will be measured.\n", file=sys.stderr)
+        parsers = {'stream': parse_file_table}
+
+    results = {}
+    for fixture in fixtures:
+        with open(fixture, 'rb') as file:
+            page = file.read().decode('utf-8')
+        results[os.path.basename(fixture)] = {name: measure(parse, page, iterations) for name, parse in parsers.items()}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CurseForge files table parsing.")
+    parser.add_argument('fixtures', nargs='*', help="HTML pages to parse (defaults to every page in benchmarks/fixtures)")
+    parser.add_argument('-n', '--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    fixtures = args.fixtures or sorted(glob.glob(os.path.join(FIXTURES_FOLDER, 'curseforge_files_*.html')))
+    results = run(fixtures, args.iterations)
+
+    print(f"{'fixture'.ljust(34)} {'parser'.ljust(8)} {'rows'.rjust(5)} {'ms'.rjust(9)} {'peak KiB'.rjust(10)}")
+    for fixture, by_parser in results.items():
+        for name, result in by_parser.items():
+            print(f"{fixture.ljust(34)} {name.ljust(8)} {result['rows']:5d} {result['seconds'] * 1000:9.2f} {result['peak_bytes'] / 1024:10.1f}")
+
+
+if __name__ == '__main__':
+    main()
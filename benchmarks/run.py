@@ -0,0 +1,307 @@
+# --------------------------------
+# File      : benchmarks/run.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Reproducible benchmark suite: synthetic mods folders (10 to 10k jars) checked against the stand-in
+#             server's synthetic pages, stage by stage, with results written to JSON for comparing commits.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+# Run straight from a checkout: python benchmarks/run.py
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_FOLDER)
+
+from filetable import parse_file_page
+from standin import FIXTURES_FOLDER
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+
+# Real mod names to start from; the rest are made up out of the word lists below. Each one comes out with a different
+# file naming scheme, the way real mods are all over the place with it.
+KNOWN_MODS = ['sodium', 'lithium', 'phosphor', 'jei', 'MouseTweaks', 'AppleSkin', 'modmenu', 'cloth-config', 'iris',
+              'indium', 'ferritecore', 'krypton', 'lazydfu', 'starlight', 'Xaeros_Minimap', 'journeymap', 'waystones',
+              'Botania', 'create', 'JustEnoughResources', 'travelersbackpack', 'BetterF3', 'ShulkerBoxTooltip', 'architectury']
+WORDS = ['Better', 'Simple', 'Tiny', 'Extra', 'Magic', 'Iron', 'Ender', 'Nether', 'Sky', 'Deep', 'Quick', 'Smart',
+         'Storage', 'Chests', 'Tweaks', 'Armor', 'Tools', 'Biomes', 'Mobs', 'Lights', 'Pipes', 'Maps', 'Boats', 'Trees']
+NAME_FORMATS = ['{name}-fabric-{version}+{mc}.jar', '{name}-{mc}-{version}.jar', '{name}_{version}.jar',
+                '{name}-{loader}-mc{mc}-{version}.jar', '{name}-{version}.jar']
+
+
+def git_commit():
+    # The commit the numbers belong to, and whether the tree had uncommitted changes on top of it
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_FOLDER, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_FOLDER, capture_output=True, text=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return None, None
+
+
+def mod_names(count, rng):
+    names = list(KNOWN_MODS[:count])
+    seen = {name.lower() for name in names}
+    while len(names) < count:
+        name = ''.join(rng.sample(WORDS, rng.choice([1, 2, 2, 3])))
+        if name.lower() in seen:
+            name = f"{name}{len(names)}"
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+def make_jar(path, name, loader, version, mc, rng) -> None:
+    mod_id = name.lower().replace('-', '_')
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as jar:
+        if loader == 'fabric':
+            jar.writestr('fabric.mod.json', json.dumps({
+                'schemaVersion': 1, 'id': mod_id, 'version': version, 'name': name,
+                'depends': {'fabricloader': '>=0.14.0', 'minecraft': f"~{mc}"},
+            }, indent=2))
+        else:
+            jar.writestr('META-INF/MANIFEST.MF', f"Manifest-Version: 1.0\nImplementation-Version: {version}\n")
+            jar.writestr('META-INF/mods.toml', '\n'.join([
+                'modLoader="javafml"', 'loaderVersion="[43,)"', 'license="MIT"', '[[mods]]', f'modId="{mod_id}"',
+                'version="${file.jarVersion}"', f'displayName="{name}"', f'[[dependencies.{mod_id}]]', 'modId="minecraft"',
+                'mandatory=true', f'versionRange="[{mc},1.20)"', 'ordering="NONE"', 'side="BOTH"', '',
+            ]))
+        # Some bytecode-sized filler so opening a jar costs about what a real one does
+        jar.writestr(f"{mod_id}/{name}Mod.class", rng.randbytes(rng.randint(1024, 8192)))
+        jar.writestr(f"assets/{mod_id}/lang/en_us.json", json.dumps({f"item.{mod_id}.thing{i}": f"Thing {i}" for i in range(20)}))
+
+
+def make_folder(work_folder, size, seed = 1) -> str:
+    # <work>/mods-<size>-<seed>; made once and reused, so every run (and every commit) checks the exact same jars.
+    # Mostly fabric on 1.19.2, with a few forge and older jars mixed in like a real pack that's been upgraded a few times.
+    folder = os.path.join(work_folder, f"mods-{size}-{seed}")
+    done_marker = os.path.join(folder, '.complete')
+    if os.path.exists(done_marker):
+        return folder
+
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(f"{size}:{seed}")
+    for name in mod_names(size, rng):
+        loader = 'forge' if rng.random() < 0.05 else 'fabric'
+        mc = '1.18.2' if rng.random() < 0.1 else '1.19.2'
+        version = f"{rng.randint(0, 12)}.{rng.randint(0, 20)}.{rng.randint(0, 9)}"
+        file_name = rng.choice(NAME_FORMATS).format(name=name, version=version, mc=mc, loader=loader)
+        make_jar(os.path.join(folder, file_name), name, loader, version, mc, rng)
+
+    open(done_marker, 'w').close()
+    return folder
+
+
+def peak_rss_bytes():
+    # High-water mark of the (benchmark's own, freshly spawned) process; None where the platform can't tell us
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def stage_ms(summary, name):
+    return round(summary['stages'].get(name, {}).get('total_ms', 0.0), 3)
+
+
+def bench_folder(folder, size, workers, latency):
+    # Runs in its own spawned process so peak memory is this folder's alone, with its own empty ~/.mvm
+    from instrument import TRACER
+    from mvm import ModVersionMaintainer
+    from standin import StandinBackend, StandinServer
+    from update import Updater
+
+    home = tempfile.mkdtemp(prefix='mvm-bench-home-')
+    os.environ['HOME'] = os.environ['USERPROFILE'] = home
+    quiet = contextlib.redirect_stdout(io.StringIO())
+    result = {'size': size}
+
+    with StandinServer(latency=latency, default_page='sodium') as server, quiet:
+        backend = StandinBackend(server.address)
+
+        # Cold scan: every jar opened and inspected, then the loader vote and version detection
+        TRACER.reset()
+        TRACER.enable()
+        mvm = ModVersionMaintainer(backend=backend, prefetch=False)
+        mvm.mods_folder = folder
+        mvm.known_aliases, mvm.known_outliers
+        start = time.perf_counter()
+        mvm.process_mods(interactive=False)
+        result['process_mods_cold_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        summary = TRACER.summary()
+        result['scan_cold_ms'] = stage_ms(summary, 'scan')
+        result['version_detection_ms'] = stage_ms(summary, 'version_detection')
+        result['mods'] = len(mvm.mods_dict)
+        result['detected'] = {'mod_type': mvm.mod_type, 'mc_version': mvm.mc_version}
+
+        # Warm scan: a new instance, same folder, so everything comes out of the scan index
+        TRACER.reset()
+        warm = ModVersionMaintainer(backend=backend, prefetch=False)
+        warm.mods_folder = folder
+        start = time.perf_counter()
+        warm.process_mods(interactive=False)
+        result['process_mods_warm_ms'] = round((time.perf_counter() - start) * 1000, 3)
+        result['scan_warm_ms'] = stage_ms(TRACER.summary(), 'scan')
+
+        # Name -> slug -> link for every mod
+        start = time.perf_counter()
+        for key in mvm.mods_dict:
+            mvm.build_mod_link(key)
+        result['slug_derivation_ms'] = round((time.perf_counter() - start) * 1000, 3)
+
+        # End to end: crawl every mod's page off the stand-in, parse and store it, and plan the updates
+        TRACER.reset()
+        start = time.perf_counter()
+        mvm.process_links(mvm.mod_type, mvm.mc_version, workers=workers, rate=0, retries=0)
+        candidates = Updater(mvm, backend=backend).plan()
+        seconds = time.perf_counter() - start
+        summary = TRACER.summary()
+        TRACER.disable()
+
+        result['crawl_ms'] = stage_ms(summary, 'crawl')
+        result['parse_ms'] = stage_ms(summary, 'parse')
+        result['links_and_plan_ms'] = round(seconds * 1000, 3)
+        result['mods_per_second'] = round(len(mvm.mods_dict) / seconds, 1) if seconds else None
+        result['requests'] = server.stats['requests']
+        result['updates'] = len(candidates)
+
+    result['end_to_end_ms'] = round(result['process_mods_cold_ms'] + result['slug_derivation_ms'] + result['links_and_plan_ms'], 3)
+    result['peak_rss_bytes'] = peak_rss_bytes()
+    return result
+
+
+def bench_parse(iterations = 20):
+    # Size independent, so measured once: every fixture files page, best of n, plus the peak of one traced parse.
+    # The fixtures are hand-built (made-up rows, filler tables for size), so this tracks the parser between commits
+    # rather than predicting what a real CurseForge page costs.
+    results = {}
+    for fixture in sorted(glob.glob(os.path.join(FIXTURES_FOLDER, 'curseforge_files_*.html'))):
+        with open(fixture, 'rb') as file:
+            page = file.read()
+
+        best = float('inf')
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows, filters = parse_file_page(page)
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        parse_file_page(page)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        results[os.path.basename(fixture)] = {
+            'bytes': len(page), 'rows': len(rows), 'best_ms': round(best * 1000, 3),
+            'mb_per_second': round(len(page) / best / 1e6, 1), 'peak_bytes': peak,
+        }
+    return results
+
+
+def compare(old, new) -> None:
+    # Prints every timing that moved, as old -> new and the change in percent
+    old_sizes = {result['size']: result for result in old.get('folders', [])}
+    print(f"\nCompared to {old.get('commit', '?')[:10]}:")
+    for result in new['folders']:
+        before = old_sizes.get(result['size'])
+        if not before:
+            continue
+        for name, value in result.items():
+            if name.endswith('_ms') and before.get(name):
+                change = (value - before[name]) / before[name] * 100
+                print(f"  {str(result['size']).rjust(6)} {name.ljust(24)} {before[name]:10.1f} -> {value:10.1f} ms  {change:+6.1f}%")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and write the results to JSON.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="jars per synthetic mods folder")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=16, help="crawler workers for the end to end run")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds the stand-in adds to every response")
+    parser.add_argument('--iterations', type=int, default=20, help="parse iterations per fixture")
+    parser.add_argument('--work', default=os.path.join(tempfile.gettempdir(), 'mvm-bench'), help="where the synthetic folders are made (and kept)")
+    parser.add_argument('-o', '--output', help="results file (default benchmarks/results/<commit>.json)")
+    parser.add_argument('--compare', metavar='FILE', help="earlier results to compare against")
+    args = parser.parse_args()
+
+    commit, dirty = git_commit()
+    results = {
+        'commit': commit,
+        'dirty': dirty,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'sizes': args.sizes, 'seed': args.seed, 'workers': args.workers, 'latency': args.latency},
+        'parse': bench_parse(args.iterations),
+        'fixtures': 'synthetic',
+        'folders': [],
+    }
+
+    print(f"{'jars'.rjust(6)} {'cold scan'.rjust(10)} {'warm scan'.rjust(10)} {'versions'.rjust(9)} {'slugs'.rjust(8)} {'parse'.rjust(9)} {'e2e ms'.rjust(10)} {'mods/s'.rjust(8)} {'peak MiB'.rjust(9)}")
+    spawn = multiprocessing.get_context('spawn')
+    for size in args.sizes:
+        folder = make_folder(args.work, size, args.seed)
+        with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+            result = pool.submit(bench_folder, folder, size, args.workers, args.latency).result()
+        results['folders'].append(result)
+        peak = f"{result['peak_rss_bytes'] / 2 ** 20:9.1f}" if result['peak_rss_bytes'] else '?'.rjust(9)
+        print(f"{size:6d} {result['scan_cold_ms']:10.1f} {result['scan_warm_ms']:10.1f} {result['version_detection_ms']:9.1f} "
+              f"{result['slug_derivation_ms']:8.1f} {result['parse_ms']:9.1f} {result['end_to_end_ms']:10.1f} {result['mods_per_second']:8.1f} {peak}")
+
+    output = args.output or os.path.join(REPO_FOLDER, 'benchmarks', 'results', f"{(commit or 'unknown')[:10]}{'-dirty' if dirty else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, 'r') as file:
+            compare(json.load(file), results)
+
+
+if __name__ == '__main__':
+    main()
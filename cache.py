@@ -0,0 +1,211 @@
+# --------------------------------
+# File      : cache.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Persistent SQLite-backed HTTP response cache shared by every fetch MVM makes,
+#             with per-source TTLs, ETag/Last-Modified revalidation, LRU eviction and an offline mode.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from instrument import TRACER
+
+
+# Default time-to-live (in seconds) for each kind of source before we revalidate it with the server
+DEFAULT_TTLS = {
+    'aliases': 6 * 60 * 60,
+    'outliers': 6 * 60 * 60,
+    'manifest': 60 * 60,
+    'curseforge': 30 * 60,
+}
+
+# Fallback TTL for any source that isn't listed above
+DEFAULT_TTL = 30 * 60
+
+# 64 MB is a few thousand CurseForge file pages, plenty for dozens of modpacks
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class CachedResponse:
+    # Tiny stand-in for a requests.Response so callers don't need to care where a response came from
+    def __init__(self, url, status_code, content = b'', headers = None, from_cache = False) -> None:
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = from_cache
+
+    @property
+    def ok(self):
+        return 200 <= self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class ResponseCache:
+    def __init__(self, path, ttls = None, max_bytes = DEFAULT_MAX_BYTES, offline = False) -> None:
+        self._path = path
+        self._ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self._max_bytes = max_bytes
+        self._offline = offline
+
+        # The crawler calls into the cache from several worker threads, so we share one connection behind a lock
+        # and only ever hold it for the (fast) database work, never while a request is in flight.
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "url TEXT PRIMARY KEY, source TEXT, status INTEGER, body BLOB, headers TEXT, "
+            "etag TEXT, last_modified TEXT, fetched_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._db.commit()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def offline(self):
+        return self._offline
+
+    @offline.setter
+    def offline(self, offline):
+        self._offline = offline
+
+    @property
+    def ttls(self):
+        return self._ttls
+
+    def ttl(self, source):
+        return self._ttls.get(source, DEFAULT_TTL)
+
+    def _lookup(self, url):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT status, body, headers, etag, last_modified, fetched_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            if row:
+                self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url))
+                self._db.commit()
+        return row
+
+    def _store(self, url, source, res) -> None:
+        headers = {key.lower(): value for key, value in res.headers.items()}
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, source, res.status_code, res.content, json.dumps(headers), headers.get('etag'),
+                 headers.get('last-modified'), now, now, len(res.content)),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _revalidated(self, url) -> None:
+        # Server said 304 so what we have is still good, just restart its TTL
+        with self._lock:
+            self._db.execute("UPDATE responses SET fetched_at = ? WHERE url = ?", (time.time(), url))
+            self._db.commit()
+
+    def _evict(self) -> None:
+        # Least recently used entries go first until we're back under the size limit. Caller holds the lock.
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self._max_bytes:
+            return
+
+        for url, size in self._db.execute("SELECT url, size FROM responses ORDER BY accessed_at").fetchall():
+            self._db.execute("DELETE FROM responses WHERE url = ?", (url,))
+            total -= size
+            if total <= self._max_bytes:
+                break
+
+    def fetch(self, url, source, get, headers = None) -> CachedResponse:
+        # get is any callable taking (url, headers) and returning something that looks like a requests.Response
+        # (status_code, content, headers), e.g. a fetch backend's get.
+        row = self._lookup(url)
+
+        def cached(row):
+            status, body, cached_headers, *_ = row
+            return CachedResponse(url, status, body, json.loads(cached_headers), from_cache=True)
+
+        # Fresh enough, don't even talk to the server
+        if row and time.time() - row[5] < self.ttl(source):
+            TRACER.count('cache.fresh')
+            return cached(row)
+
+        # Offline we serve whatever we have, however stale. Nothing cached is reported the way HTTP does for
+        # "only-if-cached" requests that can't be satisfied: 504.
+        if self._offline:
+            TRACER.count('cache.offline_hit' if row else 'cache.offline_miss')
+            return cached(row) if row else CachedResponse(url, 504, from_cache=True)
+
+        # Stale entry; ask the server if it changed since we last saw it
+        request_headers = dict(headers or {})
+        if row and row[3]: request_headers['If-None-Match'] = row[3]
+        if row and row[4]: request_headers['If-Modified-Since'] = row[4]
+
+        try:
+            res = get(url, request_headers)
+        except Exception:
+            # Network trouble; a stale answer is better than no answer
+            if row:
+                TRACER.count('cache.stale_on_error')
+                return cached(row)
+            raise
+
+        if res.status_code == 304 and row:
+            TRACER.count('cache.revalidated')
+            self._revalidated(url)
+            return cached(row)
+
+        TRACER.count('cache.miss')
+
+        # Only successful responses are worth keeping, anything else is passed straight through
+        if res.status_code == 200:
+            self._store(url, source, res)
+
+        return CachedResponse(url, res.status_code, res.content, dict(res.headers))
+
+    def clear(self, source = None) -> None:
+        with self._lock:
+            if source:
+                self._db.execute("DELETE FROM responses WHERE source = ?", (source,))
+            else:
+                self._db.execute("DELETE FROM responses")
+            self._db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
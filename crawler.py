@@ -0,0 +1,196 @@
+# --------------------------------
+# File      : crawler.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Bounded-concurrency crawl engine used to fetch CurseForge mod pages,
+#             with per-host rate limiting and per-mod exponential backoff retries.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from backends import RequestRefused, ScraperBackend, request_headers
+from instrument import TRACER
+
+
+# Status codes worth retrying; everything else (200, 404, ...) is final for that mod
+RETRY_STATUS_CODES = (403, 429, 503, 504)
+
+# Result of crawling a single mod. response is None if every attempt raised (error holds the last exception)
+CrawlResult = namedtuple('CrawlResult', ['key', 'url', 'response', 'attempts', 'error'])
+
+
+class RateLimiter:
+    def __init__(self, rate = 2.0) -> None:
+        # rate is the max amount of requests per second we allow against any one host
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url) -> None:
+        # Every host gets its own schedule; we reserve the next free slot under the lock and then sleep
+        # outside of it, so workers hitting different hosts never wait on each other.
+        host = urllib.parse.urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self._interval
+
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Crawler:
+    def __init__(self, workers = 8, rate = 2.0, retries = 5, delay = 3, max_delay = 60, backend = None, cache = None) -> None:
+        self._workers = max(1, workers)
+        self._retries = retries
+        self._delay = delay
+        self._max_delay = max_delay
+        self._rate_limiter = RateLimiter(rate)
+
+        # Optional ResponseCache; pages it can answer (or revalidate with a 304) never count against the rate limit
+        self._cache = cache
+
+        # Sessions are borrowed from the backend for each request and handed back with the status code they got, so
+        # connections and solved challenges carry over between requests, workers and crawls, and a session that keeps
+        # getting 403'd is swapped for a fresh one before the retry (see sessions.py).
+        self._backend = backend or ScraperBackend()
+
+        # Hosts whose DNS lookup has been timed already (only used while tracing)
+        self._resolved = set()
+        self._resolved_lock = threading.Lock()
+
+    @property
+    def workers(self):
+        return self._workers
+
+    @workers.setter
+    def workers(self, workers):
+        self._workers = max(1, workers)
+
+    @property
+    def retries(self):
+        return self._retries
+
+    @retries.setter
+    def retries(self, retries):
+        self._retries = retries
+
+    def backoff(self, attempt) -> float:
+        # Exponential backoff with jitter; half of the window is fixed and the other half is random so that
+        # a batch of mods that got 403'd at the same time don't all come back at the exact same moment.
+        window = min(self._max_delay, self._delay * 2 ** attempt)
+        return window / 2 + random.uniform(0, window / 2)
+
+    def _resolve(self, url) -> None:
+        # Requests don't expose their DNS time, so while tracing we time one lookup of each host ourselves
+        if not TRACER.enabled:
+            return
+
+        parts = urllib.parse.urlsplit(url)
+        with self._resolved_lock:
+            if parts.hostname in self._resolved:
+                return
+            self._resolved.add(parts.hostname)
+
+        start = time.perf_counter()
+        try:
+            socket.getaddrinfo(parts.hostname, parts.port or (443 if parts.scheme == 'https' else 80))
+        except OSError:
+            pass
+        TRACER.add_span('http.dns', 'http', start, time.perf_counter(), host=parts.hostname)
+
+    def _get(self, url, headers):
+        start = time.perf_counter()
+        self._rate_limiter.wait(url)
+        TRACER.add_span('rate_limit_wait', 'wait', start, time.perf_counter(), url=url)
+        self._resolve(url)
+
+        # stream=True returns as soon as the headers are in, which splits the request into time to first byte
+        # (connect, TLS and server time included) and time spent reading the body
+        session, res = self._backend.acquire(), None
+        try:
+            with TRACER.span('http.ttfb', 'http', url=url) as span_args:
+                res = session.get(url, headers=request_headers(session, headers), stream=True)
+                span_args['status'] = res.status_code
+            with TRACER.span('http.body', 'http', url=url):
+                body = res.content
+        finally:
+            self._backend.release(session, res.status_code if res is not None else None)
+
+        TRACER.count('http.requests')
+        TRACER.count('http.bytes', len(body))
+        TRACER.count(f"http.status.{res.status_code}")
+        return res
+
+    def _fetch(self, key, url, on_retry = None) -> CrawlResult:
+        with TRACER.span('fetch', 'mod', key=key, url=url) as span_args:
+            result = self._fetch_with_retries(key, url, on_retry)
+            span_args.update(attempts=result.attempts, status=result.response.status_code if result.response is not None else None)
+        return result
+
+    def _fetch_with_retries(self, key, url, on_retry = None) -> CrawlResult:
+        attempt = 0
+        headers = {}
+        while True:
+            res, error = None, None
+
+            try:
+                if self._cache:
+                    res = self._cache.fetch(url, 'curseforge', self._get, headers)
+                else:
+                    res = self._get(url, headers)
+            except RequestRefused as e:
+                # The backend won't send it; the caller has to come back later, not us
+                return CrawlResult(key, url, None, attempt + 1, e)
+            except Exception as e:
+                error = e
+
+            # Anything that isn't a network error or a retryable status code is final, good or bad
+            if error is None and res.status_code not in RETRY_STATUS_CODES:
+                return CrawlResult(key, url, res, attempt + 1, None)
+
+            # Out of retries, hand back whatever we got last so the caller can report it
+            if attempt >= self._retries:
+                return CrawlResult(key, url, res, attempt + 1, error)
+
+            wait = self.backoff(attempt)
+            if on_retry:
+                on_retry(key, url, res, error, attempt + 1, wait)
+
+            with TRACER.span('retry_wait', 'wait', key=key, attempt=attempt + 1):
+                time.sleep(wait)
+            TRACER.count('crawl.retries')
+            attempt += 1
+
+    def crawl(self, urls, on_retry = None):
+        # urls is a dict of key -> url. Results are yielded in the calling thread as soon as each mod is
+        # done (including its retries), so the caller can print/parse without needing any locking.
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            futures = [pool.submit(self._fetch, key, url, on_retry) for key, url in urls.items()]
+            for future in as_completed(futures):
+                yield future.result()
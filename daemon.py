@@ -0,0 +1,515 @@
+# --------------------------------
+# File      : daemon.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Long running mode: watches mods folders, rescans the ones that change and re-checks them for
+#             updates on a schedule, keeping caches and sessions warm between checks.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from backends import FetchBackend, RequestRefused, ScraperBackend
+from batch import check_disclaimer, make_backend, read_manifest
+from crawler import Crawler
+from mvm import ModVersionMaintainer
+from update import Updater
+
+
+CURSEFORGE_HOST = 'www.curseforge.com'
+
+# Full update check of every folder this often (seconds), on top of the checks a change in a folder triggers
+DEFAULT_INTERVAL = 6 * 60 * 60
+
+# Requests per host per hour. Pages the response cache answers never reach the host and don't count.
+DEFAULT_BUDGETS = {CURSEFORGE_HOST: 300}
+
+# After a change, wait for this many quiet seconds before rescanning; copying a jar in takes more than one event
+SETTLE = 2.0
+
+# inotify(7) constants
+_IN_CLOSE_WRITE, _IN_MOVED_FROM, _IN_MOVED_TO, _IN_CREATE, _IN_DELETE = 0x8, 0x40, 0x80, 0x100, 0x200
+_IN_NONBLOCK, _IN_CLOEXEC = 0o4000, 0o2000000
+_IN_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    # Linux only: the kernel tells us when a jar shows up, goes away or is rewritten, so an idle daemon costs nothing
+    def __init__(self, folders) -> None:
+        self._libc = ctypes.CDLL(None, use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self._folders = {}
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+        for folder in folders:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), mask)
+            if wd < 0:
+                os.close(self._fd)
+                raise OSError(ctypes.get_errno(), f"can't watch {folder}")
+            self._folders[wd] = folder
+
+    def _read(self, timeout) -> set:
+        changed = set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = _IN_EVENT.unpack_from(data, offset)
+            name = data[offset + _IN_EVENT.size:offset + _IN_EVENT.size + length].rstrip(b'\0')
+            offset += _IN_EVENT.size + length
+            if name.lower().endswith(b'.jar') and wd in self._folders:
+                changed.add(self._folders[wd])
+        return changed
+
+    def wait(self, timeout) -> set:
+        # Blocks for up to timeout seconds; returns the folders whose jars changed, once they've settled down
+        changed = self._read(timeout)
+        while changed:
+            more = self._read(SETTLE)
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    # Anywhere else: one directory listing per folder every interval seconds. Only names, sizes and mtimes are compared;
+    # the jars themselves are never opened.
+    def __init__(self, folders, interval = 5.0) -> None:
+        self._interval = interval
+        self._snapshots = {folder: self._snapshot(folder) for folder in folders}
+
+    @staticmethod
+    def _snapshot(folder):
+        try:
+            with os.scandir(folder) as entries:
+                return frozenset((entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+                                 for entry in entries if entry.name.lower().endswith('.jar') and entry.is_file())
+        except OSError:
+            return frozenset()
+
+    def _changed(self) -> set:
+        changed = set()
+        for folder, snapshot in self._snapshots.items():
+            current = self._snapshot(folder)
+            if current != snapshot:
+                self._snapshots[folder] = current
+                changed.add(folder)
+        return changed
+
+    def wait(self, timeout) -> set:
+        deadline = time.monotonic() + timeout
+        while True:
+            changed = self._changed()
+            if changed:
+                # Same settling as inotify; keep looking until a listing comes back the same
+                while True:
+                    time.sleep(SETTLE)
+                    more = self._changed()
+                    if not more:
+                        return changed
+                    changed |= more
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return changed
+            time.sleep(min(self._interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+def make_watcher(folders, poll = False, poll_interval = 5.0):
+    # inotify where we can, polling everywhere else (or when asked, e.g. for network drives inotify can't see into)
+    if not poll and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(folders)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(folders, poll_interval)
+
+
+class RequestBudget:
+    def __init__(self, budgets = None, window = 3600) -> None:
+        # budgets maps host -> requests allowed per window (seconds). Hosts without a budget are unlimited.
+        self._budgets = dict(DEFAULT_BUDGETS if budgets is None else budgets)
+        self._window = window
+        self._spent = {}
+        self._lock = threading.Lock()
+
+    def _trim(self, host, now):
+        spent = self._spent.setdefault(host, deque())
+        while spent and spent[0] <= now - self._window:
+            spent.popleft()
+        return spent
+
+    def limit(self, host):
+        return self._budgets.get(host)
+
+    def available(self, host):
+        if host not in self._budgets:
+            return float('inf')
+        with self._lock:
+            return max(0, self._budgets[host] - len(self._trim(host, time.monotonic())))
+
+    def spend(self, host, count = 1) -> None:
+        if host not in self._budgets:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._trim(host, now).extend([now] * count)
+
+    def take(self, host) -> None:
+        # Books one request, or raises RequestRefused if the host's budget for this window is already spent
+        if host not in self._budgets:
+            return
+        now = time.monotonic()
+        with self._lock:
+            spent = self._trim(host, now)
+            if len(spent) >= self._budgets[host]:
+                raise RequestRefused(f"{host}: budget of {self._budgets[host]} requests per {self._window:.0f} seconds is spent")
+            spent.append(now)
+
+    def wait_time(self, host, count = 1) -> float:
+        # Seconds until count more requests fit in the host's budget; never, if count is more than the whole budget
+        if host not in self._budgets:
+            return 0.0
+        if count > self._budgets[host]:
+            return float('inf')
+        now = time.monotonic()
+        with self._lock:
+            spent = self._trim(host, now)
+            over = len(spent) + count - self._budgets[host]
+            return 0.0 if over <= 0 else max(0.0, spent[over - 1] + self._window - now)
+
+    def snapshot(self) -> dict:
+        return {host: {'limit': limit, 'available': self.available(host)} for host, limit in self._budgets.items()}
+
+
+class _BudgetedSession:
+    def __init__(self, session, budget) -> None:
+        self._session = session
+        self._budget = budget
+
+    def get(self, url, headers = None, stream = False):
+        self._budget.take(urllib.parse.urlsplit(url).netloc)
+        return self._session.get(url, headers=headers, stream=stream)
+
+    def __getattr__(self, name):
+        return getattr(self._session, name)
+
+
+class BudgetedBackend(FetchBackend):
+    # Wraps another backend and books every request that actually goes out against the host's budget. Once a host's
+    # budget is spent, requests to it raise RequestRefused instead of going out, retries included.
+    def __init__(self, backend, budget) -> None:
+        self._backend = backend
+        self._budget = budget
+
+    def get(self, url, headers = None, stream = False):
+        self._budget.take(urllib.parse.urlsplit(url).netloc)
+        return self._backend.get(url, headers, stream)
+
+    def session(self):
+        return _BudgetedSession(self._backend.session(), self._budget)
+
+    def acquire(self):
+        return _BudgetedSession(self._backend.acquire(), self._budget)
+
+    def release(self, session, status = None) -> None:
+        self._backend.release(session._session, status)
+
+    def close(self) -> None:
+        self._backend.close()
+
+
+class _RefusalsCrawler:
+    # The daemon's crawler for one check, noting which mods the budget turned away so they can be checked once it refills
+    def __init__(self, crawler) -> None:
+        self._crawler = crawler
+        self.refused = set()
+
+    def crawl(self, urls, on_retry = None):
+        for result in self._crawler.crawl(urls, on_retry):
+            if isinstance(result.error, RequestRefused):
+                self.refused.add(result.key)
+            yield result
+
+    def __getattr__(self, name):
+        return getattr(self._crawler, name)
+
+
+class Daemon:
+    def __init__(self, entries, interval = DEFAULT_INTERVAL, budgets = None, status_path = None, port = None, backend = None,
+                 offline = False, workers = 8, rate = 2.0, retries = 5, pages = 1, poll = False, poll_interval = 5.0, verbose = False,
+                 jar_store = False) -> None:
+        # entries are {'path': ..., 'loader': ..., 'mc_version': ...} like batch.py takes. Every folder keeps its own
+        # ModVersionMaintainer for the daemon's whole life, and all of them share one backend, one file store and one crawler,
+        # so scan indexes, parsed listings and scraper sessions stay in memory between checks instead of starting cold.
+        self._entries = {os.path.abspath(entry['path']): entry for entry in entries}
+        self._interval = interval
+        self._status_path = status_path or os.path.join(os.path.expanduser('~'), '.mvm', 'daemon_status.json')
+        self._port = port
+        self._pages = pages
+        self._poll = poll
+        self._poll_interval = poll_interval
+        self._verbose = verbose
+
+        self._budget = RequestBudget(budgets)
+        self._backend = BudgetedBackend(backend or ScraperBackend(cookie_path=os.path.join(os.path.expanduser('~'), '.mvm', 'cookies.json')), self._budget)
+
+        self._mvms = {}
+        for folder in self._entries:
+            first = next(iter(self._mvms.values()), None)
+            mvm = ModVersionMaintainer(offline=offline, backend=self._backend, prefetch=False, jar_store=first.jar_store if first else jar_store)
+            mvm.mods_folder = folder
+            if first:
+                mvm.file_store = first.file_store
+            self._mvms[folder] = mvm
+
+        first = next(iter(self._mvms.values()), None)
+        self._crawler = Crawler(workers=workers, rate=rate, retries=0 if offline else retries, backend=self._backend, cache=first.cache if first else None)
+
+        self._due = {folder: 0.0 for folder in self._entries}
+        # Mods of a folder still to be checked because the budget ran out partway through its last check
+        self._pending = {}
+        self._status = {folder: {'folder': folder, 'state': 'pending'} for folder in self._entries}
+        self._status_lock = threading.Lock()
+        self._started = time.time()
+        self._stop = threading.Event()
+        self._server = None
+
+    @property
+    def budget(self):
+        return self._budget
+
+    def log(self, message, color = Fore.LIGHTMAGENTA_EX) -> None:
+        print(f"{Style.DIM}{time.strftime('%Y-%m-%d %H:%M:%S')}{Style.RESET_ALL} {color}{message}{Style.RESET_ALL}", flush=True)
+
+    def status(self) -> dict:
+        with self._status_lock:
+            folders = [dict(entry) for entry in self._status.values()]
+        return {'pid': os.getpid(), 'started': self._started, 'budgets': self._budget.snapshot(), 'folders': folders}
+
+    def _write_status(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self._status_path)), exist_ok=True)
+        tmp_path = f"{self._status_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self.status(), file, indent=2)
+        os.replace(tmp_path, self._status_path)
+
+    def _set_status(self, folder, **fields) -> None:
+        with self._status_lock:
+            self._status[folder].update(fields)
+        self._write_status()
+
+    def _quiet(self):
+        # process_mods / process_links talk a lot; in daemon mode only our own log lines make it out unless asked
+        return contextlib.nullcontext() if self._verbose else contextlib.redirect_stdout(io.StringIO())
+
+    def check(self, folder, changed_only = False) -> None:
+        # Rescans the folder (only new or changed jars are read), crawls its mods and works out which have updates.
+        # changed_only is for when the folder changed: only mods whose jar is new or different are looked up again (plus any
+        # an earlier check didn't get to), everything else is already known. Only as many mods as the CurseForge budget has
+        # room for are crawled; the rest, and any the budget turned away partway (retries count too), wait for it to refill.
+        mvm, entry = self._mvms[folder], self._entries[folder]
+        pending = self._pending.pop(folder, set())
+        try:
+            before = dict(mvm.mods_dict)
+            with self._quiet():
+                mvm.process_mods(mod_type=entry.get('loader'), mc_version=entry.get('mc_version'), interactive=False)
+
+            crawl = [key for key, jar_file in mvm.mods_dict.items() if not changed_only or before.get(key) != jar_file or key in pending]
+            crawl = [key for key in crawl if not mvm.slug_table.is_missing(key, mvm.build_mod_link(key)[0])]
+            fits = int(min(self._budget.available(CURSEFORGE_HOST) // self._pages, len(crawl)))
+            batch, rest = crawl[:fits], crawl[fits:]
+            if crawl and not batch:
+                self._pending[folder] = set(crawl)
+                self._due[folder] = time.time() + self._budget.wait_time(CURSEFORGE_HOST, self._pages)
+                self.log(f"{folder}: {len(crawl)} mods to check, the {CURSEFORGE_HOST} budget is spent; trying again in {(self._due[folder] - time.time()) / 60:.0f} minutes.", Fore.LIGHTYELLOW_EX)
+                self._set_status(folder, state='deferred', pending=len(crawl), next_check=self._due[folder])
+                return
+
+            if batch:
+                crawler = _RefusalsCrawler(self._crawler)
+                with self._quiet():
+                    mvm.process_links(mvm.mod_type, mvm.mc_version, pages=self._pages, keys=set(batch), crawler=crawler)
+                rest += [key for key in batch if key in crawler.refused]
+
+            candidates = Updater(mvm, backend=self._backend).plan()
+        except Exception as e:
+            if pending:
+                self._pending[folder] = pending
+            self._due[folder] = time.time() + self._interval
+            self.log(f"{folder}: check failed, {type(e).__name__}: {e}", Fore.LIGHTRED_EX)
+            self._set_status(folder, state='error', error=str(e), checked=time.time(), next_check=self._due[folder])
+            return
+
+        if rest:
+            self._pending[folder] = set(rest)
+            self._due[folder] = time.time() + self._budget.wait_time(CURSEFORGE_HOST, self._pages)
+            self.log(f"{folder}: {len(rest)} mods left for when the {CURSEFORGE_HOST} budget refills.", Fore.LIGHTYELLOW_EX)
+        elif not changed_only or self._due[folder] <= time.time():
+            # A full check, or the last of one the budget split up
+            self._due[folder] = time.time() + self._interval
+
+        diff = mvm.scan_diff
+        self._set_status(
+            folder, state='ok', error=None, checked=time.time(), next_check=self._due[folder],
+            mod_type=mvm.mod_type, mc_version=mvm.mc_version, mods=len(mvm.mods_dict), crawled=len(crawl) - len(rest), pending=len(rest),
+            scan={name: len(jars) for name, jars in diff._asdict().items()} if diff else {},
+            updates=[{'name': candidate.key, 'jar': candidate.current_jar, 'latest': candidate.file.name,
+                      'game_version': candidate.file.game_version, 'url': candidate.url} for candidate in candidates],
+        )
+        color = Fore.LIGHTGREEN_EX if not candidates else Fore.LIGHTCYAN_EX
+        self.log(f"{folder}: {len(mvm.mods_dict)} mods, {len(crawl) - len(rest)} checked, {len(candidates)} update(s) available.", color)
+
+    def _serve_status(self) -> None:
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if urllib.parse.urlsplit(self.path).path not in ('/', '/status'):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.status(), indent=2).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        # Local only; there's nothing here for anyone else
+        self._server = ThreadingHTTPServer(('127.0.0.1', self._port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.log(f"Status at http://127.0.0.1:{self._server.server_address[1]}/status")
+
+    def run(self, once = False) -> None:
+        # Every folder is checked right away, then whenever its jars change or its interval runs out. once checks every
+        # folder a single time and returns, for running from cron like before but with everything above still applying.
+        if self._port is not None and not once:
+            self._serve_status()
+        watcher = None if once else make_watcher(list(self._entries), self._poll, self._poll_interval)
+        self.log(f"Watching {len(self._entries)} folder(s) with {type(watcher).__name__ if watcher else 'nothing (one pass)'}, status in {self._status_path}")
+
+        try:
+            while not self._stop.is_set():
+                for folder, due in sorted(self._due.items(), key=lambda item: item[1]):
+                    if due <= time.time() and not self._stop.is_set():
+                        # A folder with mods left over from a check the budget cut short picks up where it left off
+                        self.check(folder, changed_only=folder in self._pending)
+                if once:
+                    break
+
+                # Sleep until the next folder is due, waking up early for changes (and every few seconds to notice stop())
+                timeout = min(max(0.0, min(self._due.values()) - time.time()), 5.0)
+                for folder in watcher.wait(timeout):
+                    if not self._stop.is_set():
+                        self.log(f"{folder}: jars changed, rescanning.")
+                        self.check(folder, changed_only=True)
+        finally:
+            if watcher: watcher.close()
+            if self._server:
+                self._server.shutdown()
+                self._server.server_close()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def parse_budgets(values) -> dict:
+    # ['www.curseforge.com=300', ...] -> {'www.curseforge.com': 300}
+    budgets = dict(DEFAULT_BUDGETS)
+    for value in values or []:
+        host, _, count = value.partition('=')
+        budgets[host] = int(count)
+    return budgets
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Keep watching mods folders and re-check them for updates when they change and on a schedule.")
+    parser.add_argument('folders', nargs='*', help="mods folders to watch")
+    parser.add_argument('-m', '--manifest', help="JSON list or text file (one folder per line) of mods folders to watch")
+    parser.add_argument('--loader', choices=['fabric', 'forge'], help="mod loader for every folder (skips detection)")
+    parser.add_argument('--mc-version', help="Minecraft version for every folder (skips detection)")
+    parser.add_argument('--interval', type=float, default=DEFAULT_INTERVAL / 60, help="minutes between full update checks of a folder")
+    parser.add_argument('--budget', action='append', metavar='HOST=N', help=f"max requests per hour to HOST (default {CURSEFORGE_HOST}={DEFAULT_BUDGETS[CURSEFORGE_HOST]})")
+    parser.add_argument('--status-file', help="where to keep the status JSON (default ~/.mvm/daemon_status.json)")
+    parser.add_argument('--port', type=int, help="also serve the status at http://127.0.0.1:PORT/status")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent CurseForge requests")
+    parser.add_argument('--rate', type=float, default=2.0, help="max requests per second per host")
+    parser.add_argument('--retries', type=int, default=5)
+    parser.add_argument('--pages', type=int, default=1, help="how many pages of a mod's files to look through at most")
+    parser.add_argument('--poll', action='store_true', help="poll the folders instead of using inotify")
+    parser.add_argument('--poll-interval', type=float, default=5.0, help="seconds between polls")
+    parser.add_argument('--once', action='store_true', help="check every folder once and exit")
+    parser.add_argument('--offline', action='store_true', help="only use cached responses")
+    parser.add_argument('--standin', metavar='URL', help="send every request to a stand-in server (see standin.py) instead")
+    parser.add_argument('--verbose', action='store_true', help="show the full scan and crawl output")
+    parser.add_argument('--jar-store', action='store_true', help="keep every jar in the store shared by all mods folders (see jarstore.py)")
+    parser.add_argument('--accept-disclaimer', action='store_true', help="accept disclaimer.txt without being asked")
+    args = parser.parse_args(argv)
+
+    entries = [{'path': folder, 'loader': args.loader, 'mc_version': args.mc_version} for folder in args.folders]
+    if args.manifest:
+        entries += [{'loader': args.loader, 'mc_version': args.mc_version, **entry} for entry in read_manifest(args.manifest)]
+    if not entries:
+        parser.error("no mods folders given")
+
+    if not check_disclaimer(args.accept_disclaimer):
+        print("The disclaimer in disclaimer.txt has not been accepted. Run main.py once or pass --accept-disclaimer.", file=sys.stderr)
+        return 2
+
+    daemon = Daemon(
+        entries, interval=args.interval * 60, budgets=parse_budgets(args.budget), status_path=args.status_file, port=args.port,
+        backend=make_backend(args), offline=args.offline, workers=args.workers, rate=args.rate, retries=args.retries,
+        pages=args.pages, poll=args.poll, poll_interval=args.poll_interval, verbose=args.verbose, jar_store=args.jar_store,
+    )
+    signal.signal(signal.SIGTERM, lambda signum, frame: daemon.stop())
+    try:
+        daemon.run(once=args.once)
+    except KeyboardInterrupt:
+        daemon.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,374 @@
+# --------------------------------
+# File      : filestore.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Compact, typed, per-mod store of scraped CurseForge file listings with indexed queries
+#             (e.g. latest release for a mod on 1.19.2 fabric), persisted to disk between runs.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+
+
+# Interned codes; the position in each tuple is the code stored in the columns
+RELEASE_TYPES = ('R', 'B', 'A', '')
+LOADERS = ('', 'fabric', 'forge', 'quilt')
+
+_SIZE_UNITS = {'B': 1, 'KB': 1024, 'MB': 1024 ** 2, 'GB': 1024 ** 3}
+
+# A file as the store hands it back, with real types: sizes in bytes, uploaded as an epoch timestamp, downloads as an int.
+# type is the release type letter (R/B/A) and loader is '' when the file name didn't say.
+StoredFile = namedtuple('StoredFile', ['file_id', 'name', 'size', 'uploaded', 'game_version', 'downloads', 'type', 'loader'])
+
+# ModFiles' columns as they're saved: name -> array typecode, or None for the plain lists of strings
+_COLUMNS = {
+    'names': None, 'file_ids': 'q', 'sizes': 'q', 'uploaded': 'q', 'downloads': 'q',
+    'types': 'b', 'loaders': 'b', 'versions': None, 'version_codes': 'h',
+}
+
+# Bumped whenever what's saved changes shape; a store saved in another format is simply started over
+STORE_FORMAT = 1
+
+
+def parse_size(size) -> int:
+    # "1.02 MB" -> 1069547
+    try:
+        number, unit = size.replace(',', '').split()
+        return int(float(number) * _SIZE_UNITS.get(unit.upper(), 1))
+    except ValueError:
+        return 0
+
+
+def parse_uploaded(uploaded) -> int:
+    # "Aug 28, 2022" -> epoch seconds (midnight UTC)
+    try:
+        return calendar.timegm(datetime.datetime.strptime(uploaded.strip(), '%b %d, %Y').timetuple())
+    except ValueError:
+        return 0
+
+
+def parse_int(value) -> int:
+    # "1,234,567" -> 1234567
+    try:
+        return int(str(value).replace(',', '').strip() or 0)
+    except ValueError:
+        return 0
+
+
+def guess_loader(name) -> str:
+    # The files table has no loader column; the file name is the only hint
+    name = name.lower()
+    for loader in LOADERS[1:]:
+        if loader in name:
+            return loader
+    return ''
+
+
+class ModFiles:
+    # Column store for one mod's files, in the order they were seen. Game versions are interned per mod since
+    # a mod rarely has more than a couple dozen of them, which keeps each mod self-contained on disk.
+    # Rows from every listing of the mod (each game version or loader filter) end up here together; sources remembers
+    # what each listing's first page looked like (listing -> digest) so an unchanged page isn't parsed again.
+    # The Game Version column only shows a file's first version (the rest hide behind a "+3" badge), so listed keeps
+    # which files each game version's own listing returned (game version -> file ids, or names for rows without one).
+    __slots__ = ('sources', 'listed', 'names', 'file_ids', 'sizes', 'uploaded', 'downloads', 'types', 'loaders', 'versions', 'version_codes', '_index')
+
+    def __init__(self, rows = ()) -> None:
+        self.sources = {}
+        self.listed = {}
+        self.names = []
+        self.file_ids, self.sizes, self.uploaded, self.downloads = array('q'), array('q'), array('q'), array('q')
+        self.types, self.loaders, self.version_codes = array('b'), array('b'), array('h')
+        self.versions = []
+        self._index = None
+        self.extend(rows)
+
+    def _intern_version(self, game_version, version_lookup) -> int:
+        if game_version not in version_lookup:
+            version_lookup[game_version] = len(self.versions)
+            self.versions.append(sys.intern(game_version))
+        return version_lookup[game_version]
+
+    def extend(self, rows, game_version = None) -> int:
+        # Appends rows from any page of any listing; files we already have are skipped. Returns how many were new.
+        # Files are told apart by id, or by name for the odd row whose id couldn't be read.
+        # game_version is the version the listing was filtered to, if it was; every row on it is for that version.
+        known = {file_id or self.names[position] for position, file_id in enumerate(self.file_ids)}
+        version_lookup = {version: code for code, version in enumerate(self.versions)}
+        listed = None
+        if game_version:
+            self._intern_version(game_version, version_lookup)
+            listed = self.listed.setdefault(game_version, set())
+        added = 0
+        for row in rows:
+            file_id = parse_int(row.file_id)
+            if listed is not None and (file_id or row.name) not in listed:
+                listed.add(file_id or row.name)
+                self._index = None
+            if (file_id or row.name) in known:
+                continue
+            known.add(file_id or row.name)
+            added += 1
+
+            self.names.append(row.name)
+            self.file_ids.append(file_id)
+            self.sizes.append(parse_size(row.size))
+            self.uploaded.append(parse_uploaded(row.uploaded))
+            self.downloads.append(parse_int(row.downloads))
+            self.types.append(RELEASE_TYPES.index(row.type) if row.type in RELEASE_TYPES else len(RELEASE_TYPES) - 1)
+            self.loaders.append(LOADERS.index(guess_loader(row.name)))
+
+            self.version_codes.append(self._intern_version(row.game_version, version_lookup))
+
+        if added:
+            self._index = None
+        return added
+
+    def merge(self, other) -> int:
+        # Takes in the files (and listing digests) of another copy of the same mod, e.g. the one another process saved
+        known = {file_id or self.names[position] for position, file_id in enumerate(self.file_ids)}
+        version_lookup = {version: code for code, version in enumerate(self.versions)}
+        added = 0
+        for position in range(len(other)):
+            if (other.file_ids[position] or other.names[position]) in known:
+                continue
+            known.add(other.file_ids[position] or other.names[position])
+            added += 1
+
+            for column in ('names', 'file_ids', 'sizes', 'uploaded', 'downloads', 'types', 'loaders'):
+                getattr(self, column).append(getattr(other, column)[position])
+            self.version_codes.append(self._intern_version(other.versions[other.version_codes[position]], version_lookup))
+
+        for listing, source in other.sources.items():
+            self.sources.setdefault(listing, source)
+        for game_version, files in other.listed.items():
+            self._intern_version(game_version, version_lookup)
+            if not files <= self.listed.setdefault(game_version, set()):
+                self.listed[game_version] |= files
+                self._index = None
+        if added:
+            self._index = None
+        return added
+
+    def __len__(self):
+        return len(self.names)
+
+    def to_json(self) -> dict:
+        # Plain lists for the columns; the index is cheap to rebuild, so it isn't written to disk
+        data = {column: list(getattr(self, column)) for column in _COLUMNS}
+        data['sources'] = dict(self.sources)
+        data['listed'] = {game_version: sorted(files, key=str) for game_version, files in self.listed.items()}
+        return data
+
+    @classmethod
+    def from_json(cls, data):
+        # Raises ValueError/TypeError/KeyError on anything that isn't what to_json wrote
+        mod = cls()
+        for column, typecode in _COLUMNS.items():
+            setattr(mod, column, array(typecode, data[column]) if typecode else [str(value) for value in data[column]])
+        if len({len(getattr(mod, column)) for column in _COLUMNS if column != 'versions'}) != 1:
+            raise ValueError("columns of different lengths")
+        if any(not 0 <= code < len(mod.versions) for code in mod.version_codes):
+            raise ValueError("game version code out of range")
+        mod.versions = [sys.intern(version) for version in mod.versions]
+        mod.sources = {str(listing): str(source) for listing, source in data.get('sources', {}).items()}
+        mod.listed = {str(game_version): set(files) for game_version, files in data.get('listed', {}).items()}
+        for game_version in mod.listed:
+            if game_version not in mod.versions:
+                mod.versions.append(sys.intern(game_version))
+        return mod
+
+    def file(self, position) -> StoredFile:
+        return StoredFile(
+            self.file_ids[position], self.names[position], self.sizes[position], self.uploaded[position],
+            self.versions[self.version_codes[position]], self.downloads[position],
+            RELEASE_TYPES[self.types[position]], LOADERS[self.loaders[position]],
+        )
+
+    def version_codes_of(self, position) -> set:
+        # Every game version a file is known to be for: the one its row shows, plus those whose listing had it
+        codes = {self.version_codes[position]}
+        key = self.file_ids[position] or self.names[position]
+        for game_version, files in self.listed.items():
+            if key in files:
+                codes.add(self.versions.index(game_version))
+        return codes
+
+    def index(self) -> dict:
+        # (version code, loader code, type code) -> (upload times ascending, matching row positions). Built on first query.
+        if self._index is None:
+            index = {}
+            for position in sorted(range(len(self)), key=lambda position: (self.uploaded[position], self.file_ids[position])):
+                for version_code in self.version_codes_of(position):
+                    times, positions = index.setdefault((version_code, self.loaders[position], self.types[position]), (array('q'), array('l')))
+                    times.append(self.uploaded[position])
+                    positions.append(position)
+            self._index = index
+        return self._index
+
+
+class FileStore:
+    def __init__(self, path = None) -> None:
+        # Keyed by CurseForge slug, so packs sharing a mod share its files whatever game version each pack is on: rows from
+        # every listing of a mod are merged, never replaced, and queries pick out the version and loader they're after.
+        # No path keeps it in memory only.
+        # Alongside the files it keeps the filter-game-version values learned from the pages (game version -> value).
+        self._path = path
+        self._lock = threading.Lock()
+        self._mods, self._filters = self._load()
+        self._dirty = set()
+        self._filters_dirty = False
+
+    def _load(self) -> tuple:
+        if not self._path:
+            return {}, {}
+        # JSON like every other file MVM keeps; nothing in it is ever run, whoever wrote it
+        try:
+            with open(self._path, 'r') as file:
+                data = json.load(file)
+            if data.get('format') != STORE_FORMAT:
+                return {}, {}
+            mods = {str(slug): ModFiles.from_json(mod) for slug, mod in data['mods'].items()}
+            return mods, {str(label): str(value) for label, value in data.get('filters', {}).items()}
+        except (OSError, ValueError, TypeError, KeyError, AttributeError, OverflowError):
+            return {}, {}
+
+    def __contains__(self, slug):
+        return slug in self._mods
+
+    def source(self, slug, listing = None):
+        # What a listing's first page looked like last time (a digest of the page); if it hasn't changed there's nothing to re-parse.
+        # listing is whatever tells the mod's listings apart, e.g. the first page's URL with its filter.
+        mod = self._mods.get(slug)
+        return mod.sources.get(listing) if mod else None
+
+    def listing_version(self, listing):
+        # The game version a listing (a files page URL) is filtered to, or None for a loader filter or no filter at all
+        value = urllib.parse.parse_qs(urllib.parse.urlsplit(listing or '').query).get('filter-game-version', [None])[0]
+        if not value:
+            return None
+        return next((label for label, filter_value in self._filters.items() if filter_value == value and label not in LOADERS), None)
+
+    def extend(self, slug, rows, listing = None, source = None) -> int:
+        # Adds the rows of a page to a mod's files, and with source, remembers it as the listing's first page.
+        # A listing filtered to a game version also records its rows as being for that version, whatever their first one is.
+        with self._lock:
+            mod = self._mods.setdefault(slug, ModFiles())
+            listed = sum(len(files) for files in mod.listed.values())
+            added = mod.extend(rows, self.listing_version(listing))
+            if added or sum(len(files) for files in mod.listed.values()) != listed:
+                self._dirty.add(slug)
+            if source is not None and mod.sources.get(listing) != source:
+                mod.sources[listing] = source
+                self._dirty.add(slug)
+        return added
+
+    def game_version_filter(self, game_version):
+        return self._filters.get(game_version)
+
+    def learn_filters(self, filters) -> None:
+        # Game version values are the same on every mod's page, so any page teaches us all of them
+        with self._lock:
+            for label, value in filters.items():
+                if self._filters.get(label) != value:
+                    self._filters[label] = value
+                    self._filters_dirty = True
+
+    def files(self, slug, game_version = None, loader = None) -> list:
+        # A mod's files, newest first, optionally only those for a game version and loader (same rules as latest)
+        mod = self._mods.get(slug)
+        if not mod:
+            return []
+
+        positions = range(len(mod))
+        if game_version and game_version != 'unknown':
+            version_code = mod.versions.index(game_version) if game_version in mod.versions else -1
+            positions = [position for position in positions if version_code in mod.version_codes_of(position)]
+        if loader in LOADERS[1:]:
+            loader_codes = (LOADERS.index(loader), 0)
+            positions = [position for position in positions if mod.loaders[position] in loader_codes]
+        positions = sorted(positions, key=lambda position: (mod.uploaded[position], mod.file_ids[position]), reverse=True)
+        return [mod.file(position) for position in positions]
+
+    def latest(self, slug, game_version = None, loader = None, release_types = ('R',), before = None):
+        # Newest file of a mod for a game version and loader among the given release types, optionally uploaded before
+        # a timestamp. One dict lookup per (version, loader, type) combination and a bisect in each; O(log n).
+        # Files without a loader in their name count for every loader.
+        mod = self._mods.get(slug)
+        if not mod:
+            return None
+
+        if game_version and game_version != 'unknown':
+            version_codes = [mod.versions.index(game_version)] if game_version in mod.versions else []
+        else:
+            version_codes = range(len(mod.versions))
+        loader_codes = [LOADERS.index(loader), 0] if loader in LOADERS[1:] else range(len(LOADERS))
+        index = mod.index()
+
+        # The first release type with any match wins, so a release always beats a newer beta
+        for release_type in release_types:
+            best = None
+            for version_code in version_codes:
+                for loader_code in loader_codes:
+                    entry = index.get((version_code, loader_code, RELEASE_TYPES.index(release_type)))
+                    if not entry:
+                        continue
+                    times, positions = entry
+                    end = bisect.bisect_left(times, before) if before is not None else len(times)
+                    if end and (best is None or (times[end - 1], mod.file_ids[positions[end - 1]]) > (mod.uploaded[best], mod.file_ids[best])):
+                        best = positions[end - 1]
+            if best is not None:
+                return mod.file(best)
+        return None
+
+    def save(self) -> None:
+        # Merge our changes into whatever is on disk now (other instances may have saved other mods), then swap atomically
+        if not self._path:
+            return
+
+        with self._lock:
+            if not self._dirty and not self._filters_dirty:
+                return
+
+            # A mod someone else saved in the meantime keeps their rows too; ours (and our listing digests) go on top
+            mods, filters = self._load()
+            for slug in self._dirty:
+                mod = self._mods[slug]
+                if slug in mods and mods[slug] is not mod:
+                    mod.merge(mods[slug])
+                mods[slug] = mod
+            filters.update(self._filters)
+
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            tmp_path = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump({'format': STORE_FORMAT, 'filters': filters, 'mods': {slug: mod.to_json() for slug, mod in mods.items()}}, file, separators=(',', ':'))
+            os.replace(tmp_path, self._path)
+
+            self._mods, self._filters = mods, filters
+            self._dirty, self._filters_dirty = set(), False
@@ -0,0 +1,179 @@
+# --------------------------------
+# File      : filetable.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Single pass, streaming extractor for the CurseForge files table. Replaces building
+#             a full BeautifulSoup tree for every mod page we crawl.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+
+
+# Column headers of the CurseForge files table, in the order they appear on the page
+FILE_HEADERS = ['Type', 'Name', 'Size', 'Uploaded', 'Game Version', 'Downloads', 'Actions']
+
+# One compact record per file row. Fields are the headers above in snake case, so row.game_version is 'Game Version',
+# followed by the CurseForge file id taken from the file's link ('' if the row had none).
+# namedtuples are __slots__ based, so there is no per-row dict like there used to be.
+FileRow = namedtuple('FileRow', [header.lower().replace(' ', '_') for header in FILE_HEADERS] + ['file_id'])
+
+
+# The files page lists this many files at most; a full page means there may be an older one after it
+FILES_PER_PAGE = 25
+
+# filter-game-version values CurseForge uses for the loaders themselves. Game versions have their own values too,
+# but those are learned from the filter dropdown on any files page (see FileTableParser.filters).
+LOADER_FILTERS = {'fabric': '1738749986:4', 'forge': '1738749986:1'}
+
+
+def row_as_dict(row) -> dict:
+    # The old {'Type': ..., 'Name': ...} shape (plus the file id), for anything that still wants it
+    return dict(zip(FILE_HEADERS + ['File ID'], row))
+
+
+class FileTableParser(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.rows = []
+        self.done = False
+
+        # Option label -> value of the filter-game-version dropdown above the table, e.g. {'1.19.2': '2020709689:8875'}
+        self.filters = {}
+        self._in_filter = False
+        self._option = None
+
+        # How deep inside the files table we are (tables can be nested), the cells of the row being built
+        # and the text pieces of the cell being built. None means we're not inside one.
+        self._table_depth = 0
+        self._headings = False
+        self._cells = None
+        self._text = None
+        self._file_id = ''
+
+    def _end_cell(self) -> None:
+        # Same rule the BeautifulSoup version used: strip the cell and only keep its first line,
+        # which drops things like the "+2" extra game versions badge
+        text = ''.join(self._text).strip()
+        self._cells.append(text.split('\n')[0] if '\n' in text else text)
+        self._text = None
+
+    def _end_row(self) -> None:
+        if self._text is not None:
+            self._end_cell()
+
+        # Header rows only have <th>'s, so they end up empty and are skipped
+        if self._cells:
+            cells = self._cells[:len(FILE_HEADERS)]
+            self.rows.append(FileRow(*cells, *[''] * (len(FILE_HEADERS) - len(cells)), self._file_id))
+        self._cells = None
+        self._file_id = ''
+
+    def handle_starttag(self, tag, attrs) -> None:
+        if self.done:
+            return
+
+        if tag == 'select':
+            self._in_filter = dict(attrs).get('id') == 'filter-game-version'
+        elif tag == 'option' and self._in_filter:
+            self._option = [dict(attrs).get('value') or '', []]
+        elif tag == 'table':
+            self._table_depth += 1
+        elif tag == 'tr' and self._table_depth:
+            if self._cells is not None: self._end_row()
+            self._cells = []
+        elif tag == 'td' and self._cells is not None:
+            if self._text is not None: self._end_cell()
+            self._text = []
+        elif tag == 'th' and self._table_depth:
+            self._headings = True
+        elif tag == 'a' and self._text is not None and not self._file_id:
+            # The file name links to /minecraft/mc-mods/<slug>/files/<file id>
+            attrs = dict(attrs)
+            if attrs.get('data-action') == 'file-link':
+                self._file_id = attrs.get('data-id') or (attrs.get('href') or '').rstrip('/').split('/')[-1]
+
+    def handle_endtag(self, tag) -> None:
+        if self.done:
+            return
+
+        if tag == 'option' and self._option is not None:
+            value, text = self._option
+            label = ''.join(text).strip().lower()
+            if value and label:
+                self.filters[label] = value
+            self._option = None
+        elif tag == 'select':
+            self._in_filter = False
+        elif tag == 'td' and self._text is not None:
+            self._end_cell()
+        elif tag == 'tr' and self._cells is not None:
+            self._end_row()
+        elif tag == 'table' and self._table_depth:
+            if self._cells is not None: self._end_row()
+            self._table_depth -= 1
+
+            # The first table that actually had file rows (or at least the column headings, when a filter left nothing to list)
+            # in it is the files table, nothing after it matters
+            if not self._table_depth and (self.rows or self._headings):
+                self.done = True
+
+    def handle_data(self, data) -> None:
+        if self._text is not None:
+            self._text.append(data)
+        elif self._option is not None:
+            self._option[1].append(data)
+
+
+def parse_file_page(page, chunk_size = 16384) -> tuple:
+    # page can be the whole page (str or bytes) or any iterable of chunks, like response.iter_content().
+    # We feed it to the parser a chunk at a time and bail out as soon as the files table has ended,
+    # so the rest of the page (footer, scripts, ...) is never even looked at.
+    parser = FileTableParser()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+    if isinstance(page, (str, bytes)):
+        chunks = (page[i:i + chunk_size] for i in range(0, len(page), chunk_size))
+    else:
+        chunks = page
+
+    for chunk in chunks:
+        # Incremental decoding so a multi-byte character split across two chunks still comes out right
+        if isinstance(chunk, bytes):
+            chunk = decoder.decode(chunk)
+        parser.feed(chunk)
+        if parser.done:
+            break
+
+    parser.close()
+    return parser.rows, parser.filters
+
+
+def parse_file_table(page, chunk_size = 16384) -> list:
+    # Just the rows, for when the filter values aren't wanted
+    return parse_file_page(page, chunk_size)[0]
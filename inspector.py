@@ -0,0 +1,144 @@
+# --------------------------------
+# File      : inspector.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Reads a mod's own metadata (fabric.mod.json, META-INF/mods.toml or mcmod.info) straight
+#             out of its jar via the zip central directory, without extracting the archive.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+
+
+# What a jar says about itself. game_versions is the raw Minecraft dependency as the mod declares it,
+# e.g. "~1.19.2" (fabric), "[1.19.2,1.20)" (forge) or "1.12.2" (mcmod.info). Fields the jar doesn't provide are None.
+JarMetadata = namedtuple('JarMetadata', ['mod_id', 'name', 'version', 'loader', 'game_versions'])
+
+# Below this many jars it's faster to inspect them in-process than to spin up a process pool
+PROCESS_POOL_THRESHOLD = 64
+
+# key = "value" / key = 'value' lines in a mods.toml; good enough for the handful of keys we care about
+_TOML_KEY_VALUE = re.compile(r'''^\s*([A-Za-z0-9_]+)\s*=\s*(?:"([^"]*)"|'([^']*)')''')
+_TOML_TABLE = re.compile(r'^\s*\[\[?\s*([^\]]+?)\s*\]\]?\s*$')
+
+
+def _from_fabric(jar):
+    # strict=False since plenty of mods ship literal tabs/newlines inside their description strings
+    info = json.loads(jar.read('fabric.mod.json').decode('utf-8-sig'), strict=False)
+    minecraft = info.get('depends', {}).get('minecraft')
+    if isinstance(minecraft, list):
+        minecraft = ' || '.join(minecraft)
+    return JarMetadata(info.get('id'), info.get('name'), info.get('version'), 'fabric', minecraft)
+
+
+def _from_mods_toml(jar):
+    mod, minecraft, table = {}, None, None
+    dependency = {}
+
+    for line in jar.read('META-INF/mods.toml').decode('utf-8-sig', errors='replace').splitlines():
+        header = _TOML_TABLE.match(line)
+        if header:
+            # Moving on from a dependency table, remember it if it was the one on minecraft
+            if dependency.get('modId') == 'minecraft' and minecraft is None:
+                minecraft = dependency.get('versionRange')
+            table, dependency = header.group(1), {}
+            continue
+
+        key_value = _TOML_KEY_VALUE.match(line)
+        if not key_value:
+            continue
+        key, value = key_value.group(1), key_value.group(2) if key_value.group(2) is not None else key_value.group(3)
+
+        # Only the first [[mods]] entry counts, that's the mod the jar is named after
+        if table == 'mods' and key not in mod:
+            mod[key] = value
+        elif table and table.startswith('dependencies'):
+            dependency[key] = value
+
+    if dependency.get('modId') == 'minecraft' and minecraft is None:
+        minecraft = dependency.get('versionRange')
+
+    # Forge fills this in from the jar manifest at runtime, so we do the same
+    version = mod.get('version')
+    if version == '${file.jarVersion}':
+        version = _manifest_version(jar)
+
+    return JarMetadata(mod.get('modId'), mod.get('displayName'), version, 'forge', minecraft)
+
+
+def _from_mcmod_info(jar):
+    # Old (pre 1.13) forge mods; either a plain list or {"modListVersion": 2, "modList": [...]}
+    info = json.loads(jar.read('mcmod.info').decode('utf-8-sig', errors='replace'), strict=False)
+    if isinstance(info, dict):
+        info = info.get('modList', [])
+    if not info:
+        return None
+
+    mod = info[0]
+    return JarMetadata(mod.get('modid'), mod.get('name'), mod.get('version'), 'forge', mod.get('mcversion'))
+
+
+def _manifest_version(jar):
+    try:
+        manifest = jar.read('META-INF/MANIFEST.MF').decode('utf-8', errors='replace')
+    except KeyError:
+        return None
+
+    for line in manifest.splitlines():
+        if line.startswith('Implementation-Version:'):
+            return line.split(':', 1)[1].strip()
+    return None
+
+
+def inspect_jar(path):
+    # ZipFile only reads the central directory at the end of the file when opened; jar.read() then seeks straight
+    # to the one entry we ask for. Nothing else in the archive is read, let alone extracted.
+    try:
+        with zipfile.ZipFile(path) as jar:
+            names = set(jar.namelist())
+            if 'fabric.mod.json' in names:
+                return _from_fabric(jar)
+            if 'META-INF/mods.toml' in names:
+                return _from_mods_toml(jar)
+            if 'mcmod.info' in names:
+                return _from_mcmod_info(jar)
+    except (zipfile.BadZipFile, OSError, ValueError, KeyError, AttributeError, TypeError):
+        # A broken jar or broken metadata shouldn't stop the scan; the file name guessing still applies
+        pass
+
+    return None
+
+
+def inspect_jars(paths, workers = None) -> dict:
+    # path -> JarMetadata (or None). Big folders are spread over a process pool since parsing is CPU bound.
+    paths = list(paths)
+    if len(paths) < PROCESS_POOL_THRESHOLD:
+        return {path: inspect_jar(path) for path in paths}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(paths, pool.map(inspect_jar, paths, chunksize=16)))
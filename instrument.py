@@ -0,0 +1,155 @@
+# --------------------------------
+# File      : instrument.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Timing and counter instrumentation for every pipeline stage. Spans and counters are written
+#             out as a JSON summary or a Chrome trace (chrome://tracing / Perfetto), plus an optional cProfile hook.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+
+
+class Tracer:
+    def __init__(self) -> None:
+        # Disabled by default; every span/count is then a cheap no-op so the instrumentation can stay in place for good
+        self.enabled = False
+        self._events = []
+        self._counters = Counter()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    def enable(self) -> None:
+        self.reset()
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._events, self._counters = [], Counter()
+            self._origin = time.perf_counter()
+
+    @property
+    def counters(self):
+        with self._lock:
+            return Counter(self._counters)
+
+    @property
+    def events(self):
+        with self._lock:
+            return list(self._events)
+
+    def add_span(self, name, category, start, end, **args) -> None:
+        # For spans measured by hand; start/end are time.perf_counter() values
+        if not self.enabled:
+            return
+
+        event = {
+            'name': name,
+            'cat': category,
+            'ts': (start - self._origin) * 1e6,
+            'dur': (end - start) * 1e6,
+            'tid': threading.get_ident(),
+            'args': args,
+        }
+        with self._lock:
+            self._events.append(event)
+
+    @contextlib.contextmanager
+    def span(self, name, category = 'stage', **args):
+        # with TRACER.span('scan', folder=...) as span_args: ... ; span_args can be filled in with results along the way
+        if not self.enabled:
+            yield args
+            return
+
+        start = time.perf_counter()
+        try:
+            yield args
+        finally:
+            self.add_span(name, category, start, time.perf_counter(), **args)
+
+    def count(self, name, value = 1) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] += value
+
+    def summary(self) -> dict:
+        # Totals per span name; the quickest way to see where a run's time went
+        stages = {}
+        for event in self.events:
+            stage = stages.setdefault(event['name'], {'category': event['cat'], 'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+            stage['count'] += 1
+            stage['total_ms'] += event['dur'] / 1000
+            stage['max_ms'] = max(stage['max_ms'], event['dur'] / 1000)
+        return {'stages': stages, 'counters': dict(self.counters)}
+
+    def chrome_trace(self) -> dict:
+        # Chrome's trace event format: complete ("X") events for spans, one counter ("C") event per counter at the end
+        pid = os.getpid()
+        events = [dict(event, ph='X', pid=pid) for event in self.events]
+        end = (time.perf_counter() - self._origin) * 1e6
+        events += [{'name': name, 'ph': 'C', 'ts': end, 'pid': pid, 'tid': 0, 'args': {'value': value}} for name, value in self.counters.items()]
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def save(self, path, format = 'chrome') -> None:
+        # format chrome: load the file in chrome://tracing or ui.perfetto.dev. format json: summary plus every span.
+        data = self.chrome_trace() if format == 'chrome' else dict(self.summary(), spans=self.events)
+        with open(path, 'w') as file:
+            json.dump(data, file)
+
+
+# The one tracer every module reports to
+TRACER = Tracer()
+
+
+@contextlib.contextmanager
+def profiled(path = None):
+    # Runs the block under cProfile and dumps the stats to path (open with pstats or snakeviz). No path, no profiling.
+    if not path:
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+
+
+def from_environment():
+    # For the interactive flow: MVM_TRACE=<file> turns tracing on (MVM_TRACE_FORMAT=json for the summary format),
+    # MVM_PROFILE=<file> turns on cProfile. Returns (trace path, trace format, profile path).
+    trace_path = os.environ.get('MVM_TRACE')
+    if trace_path:
+        TRACER.enable()
+    return trace_path, os.environ.get('MVM_TRACE_FORMAT', 'chrome'), os.environ.get('MVM_PROFILE')
@@ -0,0 +1,287 @@
+# --------------------------------
+# File      : jarstore.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Content addressed store of mod jars shared by every mods folder on the machine: jars are
+#             hardlinked (or reflinked) into place instead of downloaded again, plus which packs use what.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from instrument import TRACER
+from scanindex import sha1_file
+
+
+DEFAULT_ROOT = os.path.join(os.path.expanduser('~'), '.mvm', 'store')
+
+
+# FICLONE ioctl (linux/fs.h): a copy-on-write clone of the whole file, for filesystems (btrfs, xfs) that support it
+_FICLONE = 0x40049409
+
+
+def _reflink(source, destination) -> bool:
+    try:
+        import fcntl
+    except ImportError:
+        return False
+
+    try:
+        with open(source, 'rb') as src, open(destination, 'wb') as dst:
+            fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+        return True
+    except OSError:
+        if os.path.exists(destination): os.remove(destination)
+        return False
+
+
+def link_or_copy(source, destination) -> str:
+    # Puts source at destination as cheaply as the filesystem allows, replacing whatever was there atomically:
+    # a hardlink (no extra space at all), a reflink (extra space only once either side changes) or a plain copy.
+    # Returns which one it was. Jars are never written to in place (updates replace them), so sharing the data is safe.
+    tmp_path = f"{destination}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.link(source, tmp_path)
+        how = 'hardlink'
+    except OSError:
+        if _reflink(source, tmp_path):
+            how = 'reflink'
+        else:
+            shutil.copyfile(source, tmp_path)
+            how = 'copy'
+    os.replace(tmp_path, destination)
+    return how
+
+
+class JarStore:
+    def __init__(self, root) -> None:
+        # <root>/<sha1[:2]>/<sha1>.jar, plus <root>/index.json:
+        #   files:  CurseForge file id -> sha1 of what it downloaded as
+        #   uses:   mods folder -> {jar file name: sha1}, as of its last scan
+        #   info:   sha1 -> {'name', 'mod_id', 'version', 'loader', 'size'}
+        #   inodes: 'device:inode' -> sha1, so a jar that's a hardlink of a stored one never has to be hashed
+        self._root = root
+        self._index_path = os.path.join(root, 'index.json')
+        self._lock = threading.Lock()
+        self._index = self._load()
+        self._dirty = {section: set() for section in self._index}
+
+    @property
+    def root(self):
+        return self._root
+
+    def _load(self) -> dict:
+        try:
+            with open(self._index_path, 'r') as file:
+                index = json.load(file)
+        except (OSError, ValueError):
+            index = {}
+        return {section: index.get(section, {}) for section in ('files', 'uses', 'info', 'inodes')}
+
+    def path(self, sha1) -> str:
+        return os.path.join(self._root, sha1[:2], f"{sha1}.jar")
+
+    def has(self, sha1) -> bool:
+        return bool(sha1) and os.path.exists(self.path(sha1))
+
+    def _set(self, section, key, value) -> None:
+        with self._lock:
+            self._index[section][key] = value
+            self._dirty[section].add(key)
+
+    def known_sha1(self, stat):
+        # The sha1 of a jar that is a hardlink of a stored jar (same device and inode), without reading it; None otherwise.
+        # The stored jar is checked to still be that very inode, so a recycled inode number can't fool us.
+        sha1 = self._index['inodes'].get(f"{stat.st_dev}:{stat.st_ino}")
+        if not sha1:
+            return None
+        try:
+            stored = os.stat(self.path(sha1))
+        except OSError:
+            return None
+        return sha1 if (stored.st_dev, stored.st_ino) == (stat.st_dev, stat.st_ino) else None
+
+    def add(self, path, sha1 = None, metadata = None, name = None) -> str:
+        # Takes a jar into the store (as a hardlink where possible, so it costs no space) unless we have it already.
+        # name is the jar's file name when path doesn't end in it (e.g. a finished download still called <file id>.part).
+        sha1 = sha1 or sha1_file(path)
+        stored_path = self.path(sha1)
+        if not os.path.exists(stored_path):
+            os.makedirs(os.path.dirname(stored_path), exist_ok=True)
+            link_or_copy(path, stored_path)
+            stat = os.stat(stored_path)
+            self._set('inodes', f"{stat.st_dev}:{stat.st_ino}", sha1)
+            TRACER.count('store.added')
+
+        if sha1 not in self._index['info'] or (metadata and not self._index['info'][sha1].get('mod_id')):
+            info = {'name': name or os.path.basename(path), 'size': os.path.getsize(stored_path)}
+            if metadata:
+                info.update(mod_id=metadata.mod_id, version=metadata.version, loader=metadata.loader)
+            self._set('info', sha1, info)
+        return sha1
+
+    def place(self, sha1, destination) -> str:
+        # Puts a stored jar at destination (see link_or_copy); returns how
+        how = link_or_copy(self.path(sha1), destination)
+        TRACER.count(f"store.{how}")
+        return how
+
+    def sha1_for_file(self, file_id):
+        # What a CurseForge file downloaded as before, if we still have it
+        sha1 = self._index['files'].get(str(file_id))
+        return sha1 if self.has(sha1) else None
+
+    def sha1_for_name(self, name):
+        # A stored jar by file name (with or without .jar), for files no one downloaded through us but some pack has.
+        # Only if exactly one stored jar goes by that name; two different jars with one name can't be told apart.
+        names = {name, name if name.endswith('.jar') else f"{name}.jar"}
+        found = {sha1 for sha1, info in self._index['info'].items() if info.get('name') in names and self.has(sha1)}
+        return found.pop() if len(found) == 1 else None
+
+    def name(self, sha1):
+        return self._index['info'].get(sha1, {}).get('name')
+
+    def record_file(self, file_id, sha1) -> None:
+        if file_id:
+            self._set('files', str(file_id), sha1)
+
+    def record_folder(self, folder, entries) -> None:
+        # After a (hashed) scan: every jar of the folder goes into the store, and the folder's jar -> sha1 list is replaced.
+        # Jars without a sha1 (hashing off) are left out.
+        uses = {}
+        for jar_file, entry in entries.items():
+            if entry.sha1:
+                self.add(entry.path, entry.sha1, entry.metadata)
+                uses[jar_file] = entry.sha1
+        self._set('uses', os.path.abspath(folder), uses)
+
+    def dedupe(self, folder) -> tuple:
+        # Swaps every jar of folder that isn't already a link of its stored copy for one. Returns (jars swapped, bytes freed).
+        swapped, freed = 0, 0
+        for jar_file, sha1 in self._index['uses'].get(os.path.abspath(folder), {}).items():
+            path = os.path.join(folder, jar_file)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if not self.has(sha1) or self.known_sha1(stat) == sha1:
+                continue
+            if self.place(sha1, path) == 'hardlink':
+                swapped += 1
+                freed += stat.st_size
+        return swapped, freed
+
+    def usage(self) -> dict:
+        # mod -> version -> folders using it. Mods are named by their mod id when the jar had metadata, file name otherwise.
+        usage = {}
+        for folder, jars in self._index['uses'].items():
+            for jar_file, sha1 in jars.items():
+                info = self._index['info'].get(sha1, {})
+                mod = info.get('mod_id') or jar_file
+                version = info.get('version') or sha1[:10]
+                usage.setdefault(mod, {}).setdefault(version, []).append(folder)
+        return {mod: {version: sorted(folders) for version, folders in sorted(versions.items())} for mod, versions in sorted(usage.items())}
+
+    def stats(self) -> dict:
+        # How much the store holds, and how much all the folders using it would take up as separate copies
+        used = [sha1 for jars in self._index['uses'].values() for sha1 in jars.values()]
+        size = lambda sha1: self._index['info'].get(sha1, {}).get('size', 0)
+        stored = {sha1 for sha1 in self._index['info'] if self.has(sha1)}
+        return {
+            'jars': len(stored),
+            'bytes': sum(size(sha1) for sha1 in stored),
+            'folders': sum(1 for jars in self._index['uses'].values() if jars),
+            'jars_in_folders': len(used),
+            'bytes_in_folders': sum(size(sha1) for sha1 in used),
+        }
+
+    def gc(self) -> int:
+        # Removes stored jars no folder uses anymore (and that aren't linked from anywhere else). Returns how many went.
+        # Folders that are gone altogether stop counting as users first.
+        for folder in [folder for folder, jars in self._index['uses'].items() if jars and not os.path.isdir(folder)]:
+            self._set('uses', folder, {})
+        used = {sha1 for jars in self._index['uses'].values() for sha1 in jars.values()}
+        removed = 0
+        for path in glob.glob(os.path.join(self._root, '??', '*.jar')):
+            sha1 = os.path.basename(path)[:-len('.jar')]
+            if sha1 not in used and os.stat(path).st_nlink == 1:
+                os.remove(path)
+                removed += 1
+        return removed
+
+    def save(self) -> None:
+        # Merge our changes into whatever is on disk by now (other folders/processes share the store), then swap atomically
+        with self._lock:
+            if not any(self._dirty.values()):
+                return
+
+            index = self._load()
+            for section, keys in self._dirty.items():
+                for key in keys:
+                    index[section][key] = self._index[section][key]
+
+            os.makedirs(self._root, exist_ok=True)
+            tmp_path = f"{self._index_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump(index, file)
+            os.replace(tmp_path, self._index_path)
+
+            self._index = index
+            self._dirty = {section: set() for section in index}
+
+
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Look after the jar store shared by all mods folders.")
+    parser.add_argument('--root', default=DEFAULT_ROOT, help="where the store lives (default ~/.mvm/store)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('usage', help="which mods folders use which version of every mod")
+    commands.add_parser('stats', help="how much the store holds and saves")
+    dedupe = commands.add_parser('dedupe', help="swap jars in mods folders for links to their stored copies")
+    dedupe.add_argument('folders', nargs='+')
+    commands.add_parser('gc', help="remove stored jars no mods folder uses anymore")
+    args = parser.parse_args(argv)
+
+    store = JarStore(args.root)
+    if args.command == 'usage':
+        for mod, versions in store.usage().items():
+            print(Fore.LIGHTGREEN_EX + mod + Style.RESET_ALL)
+            for version, folders in versions.items():
+                print(f"    {version}: {', '.join(folders)}")
+    elif args.command == 'stats':
+        print(json.dumps(store.stats(), indent=2))
+    elif args.command == 'dedupe':
+        for folder in args.folders:
+            swapped, freed = store.dedupe(folder)
+            print(f"{folder}: {swapped} jars linked to the store, {freed / 1024 / 1024:.1f} MiB freed")
+    elif args.command == 'gc':
+        print(f"{store.gc()} unused jars removed")
+    store.save()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
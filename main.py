@@ -34,11 +34,17 @@
 
 from __init__ import *
 from mvm import ModVersionMaintainer
+from update import Updater
+from instrument import TRACER, from_environment, profiled
 
 __version__ = "0.1.0"
 
 
-def main():
+def main(argv = None):
+    parser = argparse.ArgumentParser(description="Check a mods folder for updates and install them.")
+    parser.add_argument('--jar-store', action='store_true', help="take updates from (and keep jars in) the store shared by all mods folders (see jarstore.py)")
+    args = parser.parse_args(argv)
+
     os.system(f"title Mod Version Maintainer")
     print(f"{Fore.LIGHTMAGENTA_EX}Welcome to {Fore.LIGHTCYAN_EX}Mod Version Maintainer (MVM){Fore.LIGHTMAGENTA_EX} v{__version__} - Copyright 2022 Doomlad{Style.RESET_ALL}")
 
@@ -61,7 +67,7 @@ def main():
             exit()
     
     # Instantiate MVM object
-    mvm = ModVersionMaintainer()
+    mvm = ModVersionMaintainer(jar_store=args.jar_store)
 
     # Prompt user for %appdata% roaming .minecraft/mods folder
     # TODO: Store this in a config file and just read from it instead of asking everytime.
@@ -77,9 +83,35 @@ def main():
     # Process links based on game version and mod type
     mvm.process_links(mvm.mod_type, mvm.mc_version)
 
-    
+    # Work out which mods have a newer release for this game version and mod type
+    updater = Updater(mvm)
+    candidates = updater.plan()
+
+    if candidates:
+        print(f"\n{Fore.LIGHTMAGENTA_EX}Updates available for {len(candidates)} mods:{Style.RESET_ALL}")
+        for candidate in candidates:
+            print(f"{candidate.key.ljust(33)} | {candidate.current_jar} -> {Fore.LIGHTGREEN_EX}{candidate.file.name}{Style.RESET_ALL}")
+
+        yn_update = input(f"\n{Fore.LIGHTMAGENTA_EX}Download and install these updates? (Y)es/(N)o: {Style.RESET_ALL}")
+        if yn_update.lower() in ["y", "yes"]:
+            for result in updater.install(candidates):
+                if result.status == 'installed':
+                    print(f"{Fore.LIGHTGREEN_EX}Installed {result.jar}{Style.RESET_ALL}")
+                else:
+                    print(f"{Fore.LIGHTRED_EX}Could not update {result.key}: {result.error}{Style.RESET_ALL}")
+            print(f"\nReplaced jars were backed up to {updater.backups_folder}")
+    else:
+        print(f"\n{Fore.LIGHTGREEN_EX}All mods are up to date.{Style.RESET_ALL}")
+
     os.system('pause')
 
 
 if __name__ == '__main__':
-    main()
+    # MVM_TRACE=trace.json / MVM_PROFILE=run.prof turn on tracing / profiling for this run
+    trace_path, trace_format, profile_path = from_environment()
+    try:
+        with profiled(profile_path):
+            main()
+    finally:
+        if trace_path:
+            TRACER.save(trace_path, trace_format)
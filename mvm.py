@@ -33,30 +33,123 @@
 # EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
 from __init__ import *
+from backends import ScraperBackend
+from cache import ResponseCache
+from crawler import Crawler
+from filetable import FILES_PER_PAGE, LOADER_FILTERS, parse_file_page
+from filestore import FileStore
+from versions import VersionIndex
+from scanindex import ScanIndex
+from jarstore import JarStore
+from slugs import SlugTable
+from instrument import TRACER
+
+
+# Copies of known_aliases.json / known_outliers.json ship with MVM, for when GitHub can't be reached
+_BUNDLED_FOLDER = os.path.dirname(os.path.abspath(__file__))
+
+# Splits a CamelCase mod name into its words, e.g. MouseTweaks -> ['Mouse', 'Tweaks']
+_MULTI_WORD = re.compile('[A-Z][^A-Z]*')
 
 
 class ModVersionMaintainer:
-    def __init__(self) -> None:
+    def __init__(self, offline = False, cache_ttls = None, hash_jars = False, backend = None, prefetch = True, jar_store = False) -> None:
         # Constants
         self._CURSEFORGE_URL = r"https://www.curseforge.com/minecraft/mc-mods/"
         self._MINECRAFT_VERSIONS_API = r"https://launchermeta.mojang.com/mc/game/version_manifest.json"
         self._KNOWN_ALIASES_GITHUB_LINK = r"https://raw.githubusercontent.com/ShoobyDoo/ModVersionMaintainer/main/known_aliases.json"
         self._KNOWN_OUTLIERS_GITHUB_LINK = r"https://raw.githubusercontent.com/ShoobyDoo/ModVersionMaintainer/main/known_outliers.json"
+        self._CACHE_DIR = os.path.join(os.path.expanduser('~'), '.mvm')
         
         # Instance variables
         self._mods_folder = r"C:\Users\shoai\AppData\Roaming\.minecraft\mods"
         self._mods_dict = {}
         self._all_minecraft_versions = []
-        self._all_files = []
+        self._version_report = None
+        self._mod_files = {}
         self._mods = []
+        self._mods_metadata = {}
+        self._scan_diff = None
 
         self._mod_type = 'unknown'
         self._mc_version = 'unknown'
 
-        # List of known aliases, for when some mod name urls dont resolve after auto split
-        # Will be most likely moved to a publicly accessible file and regularly updated once further testing is performed.
-        with urllib.request.urlopen(self._KNOWN_ALIASES_GITHUB_LINK) as api: self._known_aliases = json.loads(api.read().decode())
-        with urllib.request.urlopen(self._KNOWN_OUTLIERS_GITHUB_LINK) as api: self._known_outliers = json.loads(api.read().decode())
+        # Where requests actually go; swap it out to point MVM at something other than the real internet (see standin.py)
+        self._backend = backend or ScraperBackend(cookie_path=os.path.join(self._CACHE_DIR, 'cookies.json'))
+
+        # Every fetch (aliases, outliers, the Mojang manifest and CurseForge pages) goes through this cache.
+        # In offline mode nothing is requested at all and only what was cached by earlier runs is used.
+        self._cache = ResponseCache(os.path.join(self._CACHE_DIR, 'cache.sqlite3'), ttls=cache_ttls, offline=offline)
+
+        # Remembers every jar we've seen per mods folder so rescans only touch what changed. With hash_jars each jar also
+        # gets a SHA-1 and a CurseForge fingerprint, which costs a full read of every new or changed jar.
+        #
+        # With jar_store (True, or a JarStore to share with other instances) every jar also goes into the store shared by all
+        # mods folders (see jarstore.py), which needs its SHA-1; jars that are hardlinks of stored ones are recognized without reading them.
+        if isinstance(jar_store, JarStore):
+            self._jar_store = jar_store
+        else:
+            self._jar_store = JarStore(os.path.join(self._CACHE_DIR, 'store')) if jar_store else None
+        self._scan_index = ScanIndex(
+            os.path.join(self._CACHE_DIR, 'scan_index.json'), hash_jars=hash_jars or bool(self._jar_store), fingerprint=hash_jars,
+            known_sha1=self._jar_store.known_sha1 if self._jar_store else None,
+        )
+
+        # Mod name -> CurseForge slug as confirmed (200) or ruled out (404) by earlier runs
+        self._slug_table = SlugTable(os.path.join(self._CACHE_DIR, 'slugs.json'))
+
+        # Every scraped files listing, by slug, in typed columns so "newest release for this version" is a lookup instead of a scan
+        self._file_store = FileStore(os.path.join(self._CACHE_DIR, 'files.json'))
+
+        # List of known aliases, for when some mod name urls dont resolve after auto split, and known outliers (mods not on CurseForge).
+        # Both are only loaded when first needed. With prefetch on, they're fetched in the background right away, so the
+        # fetch overlaps with the user confirming the mods folder and the folder scan instead of holding up startup.
+        self._known = {}
+        self._known_sources = {
+            'aliases': (self._KNOWN_ALIASES_GITHUB_LINK, 'known_aliases.json'),
+            'outliers': (self._KNOWN_OUTLIERS_GITHUB_LINK, 'known_outliers.json'),
+        }
+        self._known_futures = {}
+        self._known_lock = threading.Lock()
+
+        if prefetch:
+            pool = ThreadPoolExecutor(max_workers=len(self._known_sources))
+            self._known_futures = {source: pool.submit(self._load_known, source) for source in self._known_sources}
+            pool.shutdown(wait=False)
+
+    def _load_known(self, source):
+        url, bundled_file = self._known_sources[source]
+        try:
+            return self._fetch_json(url, source)
+        except (OSError, ValueError):
+            # GitHub unreachable (or offline with nothing cached); the copy bundled with MVM will do
+            with open(os.path.join(_BUNDLED_FOLDER, bundled_file), 'r') as file:
+                return json.load(file)
+
+    def _known_data(self, source):
+        # First access either waits on the background fetch or, if there wasn't one, does the fetch right here
+        with self._known_lock:
+            if source not in self._known:
+                future = self._known_futures.pop(source, None)
+                self._known[source] = future.result() if future else self._load_known(source)
+            return self._known[source]
+
+    def _fetch_json(self, url, source):
+        # Same behaviour as a plain urlopen (raises on a bad status code), except it's served from the cache when possible
+        with TRACER.span('fetch_json', 'http', source=source, url=url) as span_args:
+            res = self._cache.fetch(url, source, self._backend.get)
+            span_args.update(status=res.status_code, from_cache=getattr(res, 'from_cache', False), bytes=len(res.content))
+        if not res.ok:
+            raise urllib.error.HTTPError(url, res.status_code, f"Could not fetch {source}", res.headers, None)
+        return res.json()
+
+    @property
+    def backend(self):
+        return self._backend
+
+    @property
+    def cache(self):
+        return self._cache
 
     @property
     def mods_folder(self):
@@ -82,17 +175,30 @@ class ModVersionMaintainer:
     def all_minecraft_versions(self, new_url):
         self._curseforge_url = new_url
     
+    @property
+    def version_report(self):
+        return self._version_report
+
+    @property
+    def mod_files(self):
+        return self._mod_files
+
+    @mod_files.setter
+    def mod_files(self, mod_files):
+        self._mod_files = mod_files
+
+    @property
+    def file_store(self):
+        return self._file_store
+
+    @file_store.setter
+    def file_store(self, file_store):
+        self._file_store = file_store
+
     @property
     def all_files(self):
-        return self._all_files
-    
-    @all_minecraft_versions.setter
-    def all_files(self, *args, mode = 'a'):
-        if mode == 'a': 
-            for arg in args: 
-                self._all_files.append(arg)
-        else:
-            self._all_files = args[0]
+        # Flattened view over every scraped file row, kept around for anything still expecting the old flat list
+        return [file_attrs for files in self._mod_files.values() for file_attrs in files]
 
     @property
     def mod_type(self):
@@ -118,9 +224,29 @@ class ModVersionMaintainer:
     def mods(self, mods):
         self._mods = mods
 
+    @property
+    def slug_table(self):
+        return self._slug_table
+
+    @property
+    def scan_index(self):
+        return self._scan_index
+
+    @property
+    def jar_store(self):
+        return self._jar_store
+
+    @property
+    def scan_diff(self):
+        return self._scan_diff
+
+    @property
+    def mods_metadata(self):
+        return self._mods_metadata
+
     @property
     def known_aliases(self):
-        return self._known_aliases
+        return self._known_data('aliases')
     
     @known_aliases.setter
     def known_aliases(self, *args, mode = 'a', **kwargs):
@@ -128,14 +254,14 @@ class ModVersionMaintainer:
         # mode r = remove
         if mode == 'a':
             for key, value in kwargs.items():
-                self._known_aliases.update({key: value})
+                self.known_aliases.update({key: value})
         elif mode == 'r':
             for alias in args:
-                self._known_aliases.pop(alias)
+                self.known_aliases.pop(alias)
 
     @property
     def known_outliers(self):
-        return self._known_outliers
+        return self._known_data('outliers')
 
     @known_outliers.setter
     def known_outliers(self, *args, mode = 'a', **kwargs):
@@ -143,16 +269,73 @@ class ModVersionMaintainer:
         # mode r = remove
         if mode == 'a':
             for key, value in kwargs.items():
-                self._known_outliers.update({key: value})
+                self.known_outliers.update({key: value})
         elif mode == 'r':
             for alias in args:
-                self._known_outliers.pop(alias)
+                self.known_outliers.pop(alias)
+
 
+    def build_mod_link(self, key):
+        # If an earlier run already got a 200 for this mod, there's nothing left to guess
+        key_fmtd = self.slug_table.confirmed(key)
+        if key_fmtd:
+            return key_fmtd, f"{self._CURSEFORGE_URL}{key_fmtd}/files"
 
-    def process_links(self, mod_type = 1, mc_version = "latest", delay=3) -> None:
-        # mod_type 1: fabric
-        # mod_type 2: forge
-        # TODO: IMPLEMENT MC_VERSION ABOVE
+        # We try to determine if there's a mod name that got taken in but it's two words. for example MouseTweaks.
+        multi_word = _MULTI_WORD.findall(key)
+        
+        # We instantiate a variable to store the formatted mod name which will be used to pull the respective mod page
+        key_fmtd = key
+
+        # If multi_word was true, meaning there were perhaps two words (which has been split by the findall method),
+        # we join the lower cased words with dashes; most links use it. example: curseforge.com/minecraft/mc-mods/mouse-tweaks
+        if multi_word:
+            key_fmtd = "-".join(word.lower() for word in multi_word)
+
+        # Now we want to see if there were any outliers, so we take the formatted mod name and try running it through any known aliases
+        # If there are no errors, it means that mod name had an alias which has been set to the formatted mod name, otherwise we continue
+        try: key_fmtd = self.known_aliases[key_fmtd]
+        except KeyError: pass
+
+        # Now we just build the final mod url using all the previously processed bits and pieces
+        return key_fmtd, f"{self._CURSEFORGE_URL}{key_fmtd}/files"
+
+    def build_download_link(self, key_fmtd, file_id):
+        # Direct download of one file of a mod; CurseForge redirects this to its CDN
+        return f"{self._CURSEFORGE_URL}{key_fmtd}/download/{file_id}/file"
+
+    def build_files_link(self, key_fmtd, loader = None, mc_version = None, page = 1):
+        # The files listing narrowed down as far as CurseForge lets us. It takes a single filter-game-version value: the
+        # game version's when we've learned it from an earlier page (much smaller listing), otherwise the loader's.
+        query = {}
+        version_filter = self.file_store.game_version_filter(mc_version) if mc_version else None
+        if version_filter or loader in LOADER_FILTERS:
+            query['filter-game-version'] = version_filter or LOADER_FILTERS[loader]
+        if page > 1:
+            query['page'] = page
+
+        if not query:
+            return f"{self._CURSEFORGE_URL}{key_fmtd}/files"
+        return f"{self._CURSEFORGE_URL}{key_fmtd}/files/all?{urllib.parse.urlencode(query, safe=':')}"
+
+    def process_links(self, mod_type = 1, mc_version = "latest", delay = 3, workers = 8, rate = 2.0, retries = 5, pages = 1, keys = None, crawler = None) -> None:
+        # mod_type 1 (or 'fabric'): fabric
+        # mod_type 2 (or 'forge'): forge
+        # mc_version "latest" (or 'unknown') uses whatever process_mods detected.
+        # Only the listing filtered to that game version (or loader) is requested.
+        #
+        # delay is the base (in seconds) of the exponential backoff used when a mod has to be retried,
+        # workers is how many mod pages are fetched at once and rate is the max requests per second per host.
+        # pages is how deep into a mod's files we're willing to go; a further page is only fetched for mods
+        # whose last page was full and still had no file for this version and loader.
+        #
+        # keys limits the crawl to those mods (default: every mod in the folder). A crawler can be passed in to reuse it,
+        # and its warm sessions and rate limit schedule, across calls; delay/workers/rate/retries are ignored then.
+        loader = {1: 'fabric', 2: 'forge'}.get(mod_type, str(mod_type).lower())
+        if loader not in LOADER_FILTERS:
+            loader = str(self.mod_type).lower()
+        if not mc_version or mc_version in ('latest', 'unknown'):
+            mc_version = self.mc_version if self.mc_version != 'unknown' else None
 
         RESPONSE_PADDING = 37
         RESPONSE_MESSAGE_PADDING = 25
@@ -161,74 +344,81 @@ class ModVersionMaintainer:
         # Now we let the user know that we need to build the mod links that correspond to the curse forge website
         print(f"\n{Fore.LIGHTMAGENTA_EX}Attempting to build mod links to CurseForge...{Style.RESET_ALL}")
 
-        while True:
-            is_403 = False
-
-            # We initialize a CloudFare bypass scraper (works the exact same as requests library)
-            scraper = cloudscraper.create_scraper(delay=10)
-            print(f"{Fore.LIGHTGREEN_EX}CloudFare bypass web-scraper initialized, starting to build and crawl mod links.{Style.RESET_ALL}\n")
-
-            # We loop through all the mods
-            for key in self.mods_dict:
-                # We try to determine if there's a mod name that got taken in but it's two words. for example MouseTweaks.
-                multi_word = re.findall('[A-Z][^A-Z]*', key)
-                
-                # We instantiate a variable to store the formatted mod name which will be used to pull the respective mod page
-                key_fmtd = key
-
-                # If multi_word was true, meaning there were perhaps two words (which has been split by the re.findall method)
-                if multi_word:
-                    # We want to reset the formatted mod name variable so as to build it up ourselves
-                    key_fmtd = ""
-                    # We loop through each word that was found, for example ['Mouse', 'Tweaks']
-                    for word in multi_word:
-                        # if the word in multi is the last word, dont include the spacer dash
-                        if word == multi_word[-1]:
-                            key_fmtd += word.lower()
-                        # otherwise include it, most links use it. example: curseforge.com/minecraft/mc-mods/mouse-tweaks
-                        else:
-                            key_fmtd += word.lower() + "-"
-
-                # Now we want to see if there were any outliers, so we take the formatted mod name and try running it through any known aliases
-                # If there are no errors, it means that mod name had an alias which has been set to the formatted mod name, otherwise we continue
-                try: key_fmtd = self.known_aliases[key_fmtd]
-                except KeyError: pass
-
-                # Now we just build the final mod url using all the previously processed bits and pieces and let the user know
-                mod_url = f"{self._CURSEFORGE_URL}{key_fmtd}/files"
-                print(f"Processing mod {Fore.LIGHTCYAN_EX}{key_fmtd}{Style.RESET_ALL}: ".ljust(46) + f"{Style.RESET_ALL}| {Fore.LIGHTCYAN_EX}{mod_url}{Style.RESET_ALL}")
-
-                # And here we begin scraping the webpages. We give a generic user agent and let cloudscraper hopefuly bypass cloudfare.
-                # Please note that during my very limited testing (ie. like a few hours) it's kind of inconsistent. Sometimes the requests will go
-                # through, and sometimes we're met with a 403 error because of captcha.
-                # 
-                # Just please do not abuse the update checks; requesting too frequently and you will likely get captcha blocked.
-                # TODO: The actual request portion has been commented out while I work on the rest of functionality so as not to constantly send reqs.
-
-                res = scraper.get(mod_url, headers={'User-Agent': 'Mozilla/5.0'})
-                
-                counter = 0
-                file_headers = ['Type', 'Name', 'Size', 'Uploaded', 'Game Version', 'Downloads', 'Actions']
-                file_attr_dict = {}
-
-                # TODO: MAKE LIST IN BETTER MORE ORGANIZED FASHION (BASED ON MOD_TYPE, )
-                if res.ok:
-                    soup = BeautifulSoup(res.text, "html.parser")
-                    for tr in soup.select("tr"):
-                        counter = 0
-                        for td in tr.find_all("td"):
-                            if '\n' in td.text.strip():
-                                file_attr = td.text.strip().split('\n')[0]
-                            else:
-                                file_attr = td.text.strip()
-                            file_attr_dict.update({file_headers[counter]: file_attr})
-                            counter += 1
-
-                        self.all_files.append(file_attr_dict)
-
+        # Build every link up front so the crawler can hand them out to its workers. Links that 404'd recently aren't worth asking about again.
+        mod_links = {key: self.build_mod_link(key) for key in self.mods_dict if keys is None or key in keys}
+        known_missing = {key for key, (key_fmtd, mod_url) in mod_links.items() if self.slug_table.is_missing(key, key_fmtd)}
+
+        # We initialize the crawler; workers borrow CloudFare bypass scrapers (works the exact same as requests library) from a shared pool
+        # Offline there's nothing to retry, a page is either in the cache or it isn't
+        crawler = crawler or Crawler(workers=workers, rate=rate, retries=0 if self.cache.offline else retries, delay=delay, backend=self.backend, cache=self.cache)
+        print(f"{Fore.LIGHTGREEN_EX}CloudFare bypass web-scraper initialized, crawling mod links with {crawler.workers} workers.{Style.RESET_ALL}\n")
+
+        # Only the mod that got a 403 (or similar) is retried, and it waits on its own backoff instead of restarting the whole crawl
+        def on_retry(key, url, res, error, attempt, wait):
+            reason = f"{res.status_code}" if res is not None else type(error).__name__
+            print(f"{Fore.LIGHTYELLOW_EX}Mod {mod_links[key][0]} returned {reason}. Retrying in {wait:.1f} seconds (attempt {attempt}/{crawler.retries})...{Style.RESET_ALL}")
+
+        # And here we begin scraping the webpages. We give a generic user agent and let cloudscraper hopefuly bypass cloudfare.
+        # Please note that during my very limited testing (ie. like a few hours) it's kind of inconsistent. Sometimes the requests will go
+        # through, and sometimes we're met with a 403 error because of captcha.
+        # 
+        # Just please do not abuse the update checks; requesting too frequently and you will likely get captcha blocked.
+        failed = 0
+
+        for key in known_missing:
+            key_fmtd, mod_url = mod_links[key]
+            print(f"Processing mod {Fore.LIGHTCYAN_EX}{key_fmtd}{Style.RESET_ALL}: ".ljust(46) + f"{Style.RESET_ALL}| {Fore.LIGHTCYAN_EX}{mod_url}{Style.RESET_ALL}")
+            if key_fmtd in self.known_outliers.keys():
+                print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTYELLOW_EX}404: KNOWN MOD.".ljust(RESPONSE_MESSAGE_PADDING) + f"(*) -> SEE: {self.known_outliers[key_fmtd]}{Style.RESET_ALL}\n")
+            else:
+                print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTYELLOW_EX}404: NOT FOUND.".ljust(RESPONSE_MESSAGE_PADDING) + f"(*) -> CHECK URL MANUALLY. (REMEMBERED FROM AN EARLIER RUN){Style.RESET_ALL}\n")
+
+        # Every page of a mod has to come from the same filtered listing, so whether we filter by game version is settled
+        # now, even if this crawl teaches us the version's filter value halfway through
+        link_version = mc_version if self.file_store.game_version_filter(mc_version) else None
+
+        crawl_start = time.perf_counter()
+        pending = {key: self.build_files_link(link[0], loader, link_version) for key, link in mod_links.items() if key not in known_missing}
+        first_links = dict(pending)
+        page = 1
+        while pending:
+            next_pending = {}
+            for result in crawler.crawl(pending, on_retry=on_retry):
+                key_fmtd = mod_links[result.key][0]
+                res = result.response
+                print(f"Processing mod {Fore.LIGHTCYAN_EX}{key_fmtd}{Style.RESET_ALL}: ".ljust(46) + f"{Style.RESET_ALL}| {Fore.LIGHTCYAN_EX}{result.url}{Style.RESET_ALL}")
+
+                if res is None:
+                    print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTRED_EX}ERROR.".ljust(RESPONSE_MESSAGE_PADDING) + f"(X) -> {result.error}{Style.RESET_ALL}\n")
+                    failed += 1
+
+                elif res.ok:
+                    # One row per file on the page, merged into the mod's files by slug (other packs may have stored rows
+                    # of other listings of it). A first page identical to the one this listing had last time (e.g. served
+                    # from the cache) isn't parsed again; further pages are added to what page 1 gave us.
+                    source = hashlib.sha1(res.content).hexdigest()
+                    listing = first_links[result.key]
+                    rows = None
+                    if page > 1 or self.file_store.source(key_fmtd, listing) != source:
+                        with TRACER.span('parse', 'mod', key=result.key, page=page) as span_args:
+                            rows, filters = parse_file_page(res.content)
+                            self.file_store.learn_filters(filters)
+                            self.file_store.extend(key_fmtd, rows, listing, source if page == 1 else None)
+                            span_args['rows'] = len(rows)
+                    self.mod_files[result.key] = self.file_store.files(key_fmtd, mc_version, loader)
+                    if page == 1:
+                        self.slug_table.record(result.key, key_fmtd, found=True)
+
+                    # Stop as soon as there's a file for us; only a full page can have older files after it
+                    page_rows = len(rows) if rows is not None else len(self.mod_files[result.key])
+                    if page < pages and page_rows >= FILES_PER_PAGE and not self.file_store.latest(key_fmtd, mc_version, loader, ('R', 'B', 'A')):
+                        next_pending[result.key] = self.build_files_link(key_fmtd, loader, link_version, page + 1)
                     print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTGREEN_EX}{res.status_code}: OK.".ljust(RESPONSE_MESSAGE_PADDING) + f"(✓){Style.RESET_ALL}\n")
 
                 elif res.status_code == 404:
+                    # A missing later page says nothing about the mod itself
+                    if page == 1:
+                        self.slug_table.record(result.key, key_fmtd, found=False)
                     if key_fmtd in self.known_outliers.keys():
                         print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTYELLOW_EX}{res.status_code}: KNOWN MOD.".ljust(RESPONSE_MESSAGE_PADDING) + f"(*) -> SEE: {self.known_outliers[key_fmtd]}{Style.RESET_ALL}\n")
                     else:
@@ -236,47 +426,73 @@ class ModVersionMaintainer:
 
                 elif res.status_code == 403:
                     print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTRED_EX}{res.status_code}: FORBIDDEN.".ljust(RESPONSE_MESSAGE_PADDING) + f"(X) -> LIKELY REQUEST IS CAPTCHA BLOCKED.{Style.RESET_ALL}\n")
-                    is_403 = True
+                    failed += 1
 
                 elif res.status_code == 503:
                     print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTRED_EX}{res.status_code}: UNAVAILABLE.".ljust(RESPONSE_MESSAGE_PADDING) + f"(X) -> SERVER IS OVERLOADED OR IN MAINTENANCE.{Style.RESET_ALL}\n")
+                    failed += 1
 
                 elif res.status_code == 504:
                     print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTRED_EX}{res.status_code}: TIMED OUT.".ljust(RESPONSE_MESSAGE_PADDING) + f"(X) -> REQUEST WAS TIMED OUT. IS CURSEFORGE DOWN?{Style.RESET_ALL}\n")
+                    failed += 1
 
                 else:
                     print("Response: ".ljust(RESPONSE_PADDING) + f"| {Fore.LIGHTYELLOW_EX}{res.status_code}: UNKNOWN.".ljust(RESPONSE_MESSAGE_PADDING) + f"(?) -> SEE: {STATUS_CODE_GOOGLE_LINK}{res.status_code}{Style.RESET_ALL}\n")
 
-            if is_403:
-                print(f"{Fore.LIGHTYELLOW_EX}Some if not all links returned status code: 403 (forbidden). Waiting 3 seconds to retry...{Style.RESET_ALL}\n")
-                time.sleep(delay)
-                continue
-            else:
-                break
-            
-        print(f"All links resolved, successfully returned {Fore.LIGHTGREEN_EX}{len(self.all_files)}{Style.RESET_ALL} attributes for {Fore.LIGHTCYAN_EX}{len(self.mods)}{Style.RESET_ALL} mods.")
-        
-        # TODO: Now we need to build the links to each of those mods
+            pending = next_pending
+            page += 1
+
+        TRACER.add_span('crawl', 'stage', crawl_start, time.perf_counter(), mods=len(mod_links) - len(known_missing), workers=crawler.workers)
+
+        # Remember what we learned about these slugs (and their files) for next time
+        self.slug_table.save()
+        self.file_store.save()
+
+        if failed:
+            print(f"{Fore.LIGHTYELLOW_EX}{failed} mod(s) could not be resolved after {crawler.retries} retries.{Style.RESET_ALL}")
+
+        print(f"All links resolved, successfully returned {Fore.LIGHTGREEN_EX}{len(self.all_files)}{Style.RESET_ALL} attributes for {Fore.LIGHTCYAN_EX}{len(self.mod_files)}{Style.RESET_ALL} mods.")
 
     
-    def process_mods(self):
+    def process_mods(self, mod_type = None, mc_version = None, interactive = True):
         # Set mod type to unknown for now, will be updated if keywords fabric or forge are found in jars
         # mod_type = "unknown"
+        #
+        # mod_type / mc_version skip their respective detection when given. With interactive off we never prompt;
+        # whatever couldn't be detected is left as 'unknown' instead.
         print(f"\n{Fore.LIGHTMAGENTA_EX}Scanning your mods folder...\n{Style.RESET_ALL}")
 
-        # Search for all .jar files in the mods folder
-        self.mods = glob.glob(f"{self._mods_folder}/*.jar")
+        # Search for all .jar files in the mods folder. The scan index hands back what it remembers for jars that haven't changed
+        # since the last scan, and only reads (hashes, inspects) the new or changed ones.
+        with TRACER.span('scan', folder=self._mods_folder) as span_args:
+            scan_entries, self._scan_diff = self.scan_index.scan(self._mods_folder)
+            span_args.update({name: len(jars) for name, jars in self._scan_diff._asdict().items()})
+
+        # The store learns about every jar in the folder, and which jars this folder uses now
+        if self.jar_store:
+            self.jar_store.record_folder(self._mods_folder, scan_entries)
+            self.jar_store.save()
+        self.mods = sorted(entry.path for entry in scan_entries.values())
+        self.mods_dict = {}
+        self._mods_metadata = {}
+
+        # Each jar's own fabric.mod.json / mods.toml / mcmod.info, which tells us its loader and game version for certain
+        jars_metadata = {entry.path: entry.metadata for entry in scan_entries.values()}
+        loader_votes = Counter()
 
         # Master loop; most processing will happen here; loop through each mod in the mods folder
-        for mod in self.mods: 
+        for number, mod in enumerate(self.mods, start=1):
             # Split at path folders to extract just the .jar file name
-            jar_file = mod.split('\\')[-1]
-
-            # Search for those keywords in the jar file name and update the mod_type variable to respective value
-            if "fabric" in jar_file.lower():
-                self.mod_type = "fabric"
+            jar_file = os.path.basename(mod)
+            metadata = jars_metadata.get(mod)
+
+            # The jar's metadata is authoritative. Otherwise search for those keywords in the jar file name and count it towards that loader.
+            if metadata:
+                loader_votes[metadata.loader] += 1
+            elif "fabric" in jar_file.lower():
+                loader_votes["fabric"] += 1
             elif "forge" in jar_file.lower():
-                self.mod_type = "forge"
+                loader_votes["forge"] += 1
 
             # Most mod jar file names are delimited by either a dash or an underscore.
             # If the delimiter is found in the file name, split at it and extract the very first index,
@@ -288,51 +504,85 @@ class ModVersionMaintainer:
                 mod_name = jar_file.split('-')[0]
             elif '_' in jar_file:
                 mod_name = jar_file.split('_')[0]
+            # No delimiter at all; fall back on the mod id from the metadata, or failing that the bare file name
+            elif metadata and metadata.mod_id:
+                mod_name = metadata.mod_id
+            else:
+                mod_name = jar_file[:-len('.jar')]
 
             self.mods_dict.update({mod_name: jar_file})
+            if metadata:
+                self.mods_metadata.update({mod_name: metadata})
 
-            # Get index of current mod + 1 since zero indexed to get the mod in the list and print the mod and file name
-            print(f"{self.mods.index(mod) + 1}. {mod_name.ljust(33)} | {jar_file}")
+            # Print the mod's number (1 based) along with the mod and file name
+            print(f"{number}. {mod_name.ljust(33)} | {jar_file}")
 
         # Let user know how many total mods were parsed, then let user know that we're checking for the mod type
         # This will be later used to determine the filter that needs to be applied when scraping the webpage for download links
-        print(f"\n{Fore.LIGHTGREEN_EX}Total mods parsed: {len(self.mods)}{Style.RESET_ALL}\n\n{Fore.LIGHTMAGENTA_EX}Determining mods type (forge/fabric)...{Style.RESET_ALL}")
-
+        diff = self._scan_diff
+        print(f"\n{Fore.LIGHTGREEN_EX}Total mods parsed: {len(self.mods)} ({len(diff.added)} added, {len(diff.changed)} changed, {len(diff.removed)} removed since last scan){Style.RESET_ALL}\n\n{Fore.LIGHTMAGENTA_EX}Determining mods type (forge/fabric)...{Style.RESET_ALL}")
+
+        # Whichever loader most of the jars belong to wins
+        if loader_votes:
+            self.mod_type = loader_votes.most_common(1)[0][0]
+
+        # An explicit mod type always wins over detection
+        if mod_type:
+            self.mod_type = mod_type
+            print(f"{Fore.LIGHTGREEN_EX}{self.mod_type.capitalize()} given as mod type.{Style.RESET_ALL}")
+        # Unknown and nobody to ask; leave it unknown
+        elif self.mod_type == "unknown" and not interactive:
+            print(f"{Fore.LIGHTYELLOW_EX}Unable to determine your mod type.{Style.RESET_ALL}")
         # If the mod type remained unknown, it means none of the mods gave an indication of what type they were. We need to prompt the user instead
-        if self.mod_type == "unknown":
+        elif self.mod_type == "unknown":
             self.mod_type = input(f"Unable to determine your mod type. Please provide your mod type by entering either forge or fabric.\n{Fore.LIGHTMAGENTA_EX}Mod type: {Style.RESET_ALL}")
             print(f"{Fore.LIGHTGREEN_EX}{self.mod_type.capitalize()} selected as mod type.{Style.RESET_ALL}") if self.mod_type.lower() == "fabric" else print(f"{Fore.LIGHTGREEN_EX}{self.mod_type.capitalize()} selected as mod type.{Style.RESET_ALL}")
-        # If the mod type isn't unknown, likely forge or fabric, then we print a positive message to the user letting them know the mod type was automatically determined
-        else:
+        # If the mod type isn't unknown, likely forge or fabric, then we print a positive message to the user letting them know the mod type was automatically determined.
+        # With only file names to go on it's the keyword that decided, otherwise it's the jars' metadata.
+        elif not any(jars_metadata.values()):
             print(f"{Fore.LIGHTGREEN_EX}Mods containing keyword {self.mod_type.lower()} were found; {self.mod_type.lower()} selected.{Style.RESET_ALL}")
+        else:
+            print(f"{Fore.LIGHTGREEN_EX}{loader_votes[self.mod_type]} of {len(self.mods)} mods are {self.mod_type.lower()} mods; {self.mod_type.lower()} selected.{Style.RESET_ALL}")
         
         # Let user know we are trying to determine the appropriate minecraft version
         print(f"\n{Fore.LIGHTMAGENTA_EX}Trying to automatically determine Minecraft version...\nQuerying Minecraft versions API...{Style.RESET_ALL}")
 
         # Query the minecraft versions api and extract list of minecraft versions
-        with urllib.request.urlopen(self._MINECRAFT_VERSIONS_API) as api:
-            json_obj = json.loads(api.read().decode())
-            for _versions in json_obj['versions']:
-                if _versions['type'] == 'release':
-                    self.all_minecraft_versions.append(_versions)
+        with TRACER.span('manifest'):
+            json_obj = self._fetch_json(self._MINECRAFT_VERSIONS_API, 'manifest')
+        self._all_minecraft_versions = []
+        for _versions in json_obj['versions']:
+            if _versions['type'] == 'release':
+                self.all_minecraft_versions.append(_versions)
 
         print(f"{Fore.LIGHTGREEN_EX}Latest 'release' version of MC: {json_obj['latest']['release']} was successfully pulled, along with {len(self.all_minecraft_versions) - 1} others.{Style.RESET_ALL}")
         del json_obj # Discord giant json obj since we dont need it anymore
 
-        is_match = False
-        # Loop through and find a match by looping thru modfiles
-        for mc_ver in self.all_minecraft_versions:
-            if is_match: break
-            for mod in self.mods:
-                if str(mc_ver['id']).strip() in mod:
-                    guessed_mc_version = mc_ver['id']
-                    is_match = True
-                    break
-                else:
-                    guessed_mc_version = None
-        
-        # TODO: FINISH UP
-        if guessed_mc_version:
+        # Build an index of every release id once, then let it tokenize each jar name a single time.
+        # Only the jar file names are looked at, so a version in the folder path can't be picked up by mistake.
+        with TRACER.span('version_detection', mods=len(self.mods)):
+            version_index = VersionIndex(mc_ver['id'] for mc_ver in self.all_minecraft_versions)
+            constraints = {os.path.basename(mod): metadata.game_versions for mod, metadata in jars_metadata.items() if metadata and metadata.game_versions}
+            self._version_report = version_index.detect((os.path.basename(mod) for mod in self.mods), constraints)
+        guessed_mc_version = self._version_report.version
+
+        # Mods made for different minor versions won't load together, so point out which jars disagree
+        if self._version_report.mixed:
+            print(f"{Fore.LIGHTYELLOW_EX}Your mods folder looks like it contains mods for more than one Minecraft version:{Style.RESET_ALL}")
+            for mc_ver, count in self._version_report.histogram.most_common():
+                print(f"  {mc_ver.ljust(10)} | {count} mod(s)")
+
+        # An explicit version always wins, and without anyone to ask we go with the guess (or leave it unknown)
+        if mc_version:
+            self.mc_version = mc_version
+        elif not interactive:
+            self.mc_version = guessed_mc_version or 'unknown'
+            print(f"{Fore.LIGHTGREEN_EX}Minecraft version: {self.mc_version}{Style.RESET_ALL}")
+        elif guessed_mc_version:
             is_correct = input(f"{Fore.LIGHTGREEN_EX}Auto detection found a potential match on the Minecraft version.\n{Fore.LIGHTMAGENTA_EX}Is {guessed_mc_version} correct? (Y)es/(N)o: {Style.RESET_ALL}")
+            if is_correct.lower() in ['y', 'yes']:
+                self.mc_version = guessed_mc_version
+            else:
+                self.mc_version = input(f"{Fore.LIGHTMAGENTA_EX}Please enter your desired Minecraft version: {Style.RESET_ALL}").strip()
         else:
-            is_correct = input(f"{Fore.LIGHTYELLOW_EX}Auto detection could not detect the Minecraft version.\n{Fore.LIGHTMAGENTA_EX}Please enter your desired Minecraft version: {Style.RESET_ALL}")
+            self.mc_version = input(f"{Fore.LIGHTYELLOW_EX}Auto detection could not detect the Minecraft version.\n{Fore.LIGHTMAGENTA_EX}Please enter your desired Minecraft version: {Style.RESET_ALL}").strip()
@@ -0,0 +1,203 @@
+# --------------------------------
+# File      : scanindex.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Persistent index of every scanned mods folder, keyed by jar path, size and mtime (plus
+#             optional SHA-1 / CurseForge fingerprint), so later scans only reprocess jars that changed.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from inspector import JarMetadata, inspect_jars
+from instrument import TRACER
+
+
+# What we remember about each jar. sha1 and fingerprint are None unless hashing was turned on.
+ScanEntry = namedtuple('ScanEntry', ['path', 'size', 'mtime_ns', 'sha1', 'fingerprint', 'metadata'])
+
+# Jar file names (not paths) grouped by what happened to them since the last scan of the folder
+ScanDiff = namedtuple('ScanDiff', ['added', 'changed', 'removed', 'unchanged'])
+
+# Several ModVersionMaintainer instances may share one index file (batch mode), so saves are serialized
+_SAVE_LOCK = threading.Lock()
+
+# Bytes CurseForge strips out before fingerprinting a file: tab, line feed, carriage return and space
+_FINGERPRINT_WHITESPACE = b'\t\n\r '
+
+
+def hash_file(path, name = 'sha1', chunk_size = 1024 * 1024) -> str:
+    digest = hashlib.new(name)
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def sha1_file(path, chunk_size = 1024 * 1024) -> str:
+    return hash_file(path, 'sha1', chunk_size)
+
+
+def curseforge_fingerprint(path) -> int:
+    # 32 bit MurmurHash2 (seed 1) over the file with all whitespace bytes removed; it's what CurseForge
+    # uses to match a local file to a project file regardless of what the file was renamed to.
+    with open(path, 'rb') as file:
+        data = file.read().translate(None, _FINGERPRINT_WHITESPACE)
+
+    m, mask = 0x5bd1e995, 0xffffffff
+    length = len(data)
+    h = (1 ^ length) & mask
+
+    words = length // 4
+    for (k,) in struct.iter_unpack('<I', data[:words * 4]):
+        k = (k * m) & mask
+        k ^= k >> 24
+        k = (k * m) & mask
+        h = ((h * m) & mask) ^ k
+
+    tail = data[words * 4:]
+    if len(tail) == 3: h ^= tail[2] << 16
+    if len(tail) >= 2: h ^= tail[1] << 8
+    if len(tail) >= 1:
+        h ^= tail[0]
+        h = (h * m) & mask
+
+    h ^= h >> 13
+    h = (h * m) & mask
+    h ^= h >> 15
+    return h
+
+
+class ScanIndex:
+    def __init__(self, path, hash_jars = False, fingerprint = False, known_sha1 = None) -> None:
+        # known_sha1 optionally takes a jar's os.stat() result and returns its sha1 if that's known without reading it
+        # (e.g. the jar store recognizing one of its own hardlinks), or None.
+        self._path = path
+        self._hash_jars = hash_jars
+        self._fingerprint = fingerprint
+        self._known_sha1 = known_sha1
+
+    @property
+    def path(self):
+        return self._path
+
+    def _load(self) -> dict:
+        try:
+            with open(self._path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, index) -> None:
+        # Every folder shares this file, so it's never written in place: a crash mid-write must not cost the other folders theirs
+        os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+        tmp_path = f"{self._path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(index, file)
+        os.replace(tmp_path, self._path)
+
+    def _save(self, folder, entries) -> None:
+        # Re-read right before writing so we only ever replace our own folder's entries, then swap the file in atomically
+        with _SAVE_LOCK:
+            index = self._load()
+            index[folder] = {jar_file: entry._asdict() for jar_file, entry in entries.items()}
+            self._write(index)
+
+    def entries(self, folder) -> dict:
+        # jar file name -> ScanEntry from the last scan of folder
+        entries = {}
+        for jar_file, entry in self._load().get(os.path.abspath(folder), {}).items():
+            metadata = JarMetadata(*entry['metadata']) if entry.get('metadata') else None
+            entries[jar_file] = ScanEntry(**dict(entry, metadata=metadata))
+        return entries
+
+    def forget(self, folder) -> None:
+        with _SAVE_LOCK:
+            index = self._load()
+            if index.pop(os.path.abspath(folder), None) is not None:
+                self._write(index)
+
+    def scan(self, folder):
+        # Returns (entries, diff). Only jars that are new, or whose size/mtime moved, get hashed and inspected again.
+        folder = os.path.abspath(folder)
+        previous = self.entries(folder)
+
+        current, stale, unhashed, stats = {}, [], [], {}
+        with os.scandir(folder) as it:
+            for dir_entry in it:
+                if not dir_entry.name.endswith('.jar') or not dir_entry.is_file():
+                    continue
+
+                stat = dir_entry.stat()
+                entry = previous.get(dir_entry.name)
+                if entry and entry.size == stat.st_size and entry.mtime_ns == stat.st_mtime_ns:
+                    current[dir_entry.name] = entry._replace(path=dir_entry.path)
+
+                    # Hashing got turned on since this jar was last seen; hash it without counting it as changed
+                    if (self._hash_jars and entry.sha1 is None) or (self._fingerprint and entry.fingerprint is None):
+                        unhashed.append(dir_entry.name)
+                else:
+                    current[dir_entry.name] = ScanEntry(dir_entry.path, stat.st_size, stat.st_mtime_ns, None, None, None)
+                    stale.append(dir_entry.name)
+                    stats[dir_entry.name] = stat
+
+        # Only the stale jars are opened at all
+        with TRACER.span('inspect', jars=len(stale)):
+            jars_metadata = inspect_jars(current[jar_file].path for jar_file in stale)
+
+        hash_start = time.perf_counter()
+        for jar_file in stale:
+            entry = current[jar_file]
+            known = self._known_sha1(stats[jar_file]) if self._hash_jars and self._known_sha1 else None
+            current[jar_file] = entry._replace(
+                sha1=known or (sha1_file(entry.path) if self._hash_jars else None),
+                fingerprint=curseforge_fingerprint(entry.path) if self._fingerprint else None,
+                metadata=jars_metadata.get(entry.path),
+            )
+
+        for jar_file in unhashed:
+            entry = current[jar_file]
+            current[jar_file] = entry._replace(
+                sha1=entry.sha1 or (sha1_file(entry.path) if self._hash_jars else None),
+                fingerprint=entry.fingerprint or (curseforge_fingerprint(entry.path) if self._fingerprint else None),
+            )
+
+        if self._hash_jars or self._fingerprint:
+            TRACER.add_span('hash', 'stage', hash_start, time.perf_counter(), jars=len(stale) + len(unhashed))
+
+        diff = ScanDiff(
+            added=sorted(jar_file for jar_file in stale if jar_file not in previous),
+            changed=sorted(jar_file for jar_file in stale if jar_file in previous),
+            removed=sorted(jar_file for jar_file in previous if jar_file not in current),
+            unchanged=sorted(jar_file for jar_file in current if jar_file not in stale),
+        )
+
+        # Nothing to write if nothing moved, which is the common case
+        if stale or unhashed or diff.removed or not previous:
+            self._save(folder, current)
+
+        return current, diff
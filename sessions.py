@@ -0,0 +1,214 @@
+# --------------------------------
+# File      : sessions.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Pool of reusable scraper sessions, kept alive between requests, with Cloudflare clearance
+#             cookies persisted to disk and sessions that keep getting blocked rotated out.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+
+
+# Cookies that prove a Cloudflare challenge was solved; worth keeping across sessions and runs until they expire
+CLEARANCE_COOKIES = ('cf_clearance', '__cf_bm')
+
+# For clearance cookies that came without an expiry
+DEFAULT_COOKIE_TTL = 30 * 60
+
+# Clearance only holds for the user agent that solved the challenge, so that's kept along with the cookie
+ClearanceCookie = namedtuple('ClearanceCookie', ['name', 'value', 'domain', 'path', 'expires', 'user_agent'])
+
+
+class SessionPool:
+    def __init__(self, factory, size = 8, cookie_path = None, max_failures = 2, cookie_names = CLEARANCE_COOKIES) -> None:
+        # factory makes a new session. Up to size idle sessions are kept (with their open connections) for whoever asks next.
+        # A session that gets max_failures 403's in a row is closed and replaced by a fresh one, and the clearance
+        # it was using is forgotten. cookie_path is where clearance cookies are kept between runs (None: memory only).
+        self._factory = factory
+        self._size = size
+        self._cookie_path = cookie_path
+        self._max_failures = max_failures
+        self._cookie_names = cookie_names
+        self._lock = threading.Lock()
+
+        self._idle = []
+        self._failures = {}
+        self._stats = Counter()
+        self._cookies = self._load()
+        self._cookies_dirty = False
+        self._rejected = set()
+
+    @property
+    def stats(self):
+        # Counter of sessions 'created', 'reused' and 'rotated' (thrown out after repeated 403's)
+        with self._lock:
+            return Counter(self._stats)
+
+    def _load(self) -> dict:
+        if not self._cookie_path:
+            return {}
+        try:
+            with open(self._cookie_path, 'r') as file:
+                cookies = [ClearanceCookie(*cookie) for cookie in json.load(file)]
+        except (OSError, ValueError, TypeError):
+            return {}
+        now = time.time()
+        return {(cookie.domain, cookie.name): cookie for cookie in cookies if cookie.expires > now}
+
+    def _restore(self, session) -> None:
+        # A new session starts out with every clearance cookie that's still good, and the user agent they were issued to
+        jar = getattr(session, 'cookies', None)
+        if jar is None:
+            return
+
+        now = time.time()
+        with self._lock:
+            cookies = [cookie for cookie in self._cookies.values() if cookie.expires > now]
+        for cookie in cookies:
+            jar.set(cookie.name, cookie.value, domain=cookie.domain, path=cookie.path, expires=int(cookie.expires))
+            if cookie.user_agent and hasattr(session, 'headers'):
+                session.headers['User-Agent'] = cookie.user_agent
+
+    def _harvest(self, session) -> None:
+        # Picks up any clearance cookie the session earned (or had renewed) since it was handed out
+        jar = getattr(session, 'cookies', None)
+        if jar is None:
+            return
+
+        user_agent = session.headers.get('User-Agent') if hasattr(session, 'headers') else None
+        now = time.time()
+        with self._lock:
+            for cookie in jar:
+                if cookie.name not in self._cookie_names:
+                    continue
+                expires = cookie.expires or now + DEFAULT_COOKIE_TTL
+                known = self._cookies.get((cookie.domain, cookie.name))
+                if expires > now and (known is None or known.value != cookie.value):
+                    self._cookies[(cookie.domain, cookie.name)] = ClearanceCookie(cookie.name, cookie.value, cookie.domain, cookie.path, expires, user_agent)
+                    self._cookies_dirty = True
+
+    def _forget(self, session) -> None:
+        # The clearance this session was using evidently doesn't work anymore
+        jar = getattr(session, 'cookies', None)
+        if jar is None:
+            return
+
+        values = {cookie.value for cookie in jar if cookie.name in self._cookie_names}
+        with self._lock:
+            self._rejected |= values
+            for key, cookie in list(self._cookies.items()):
+                if cookie.value in values:
+                    del self._cookies[key]
+                    self._cookies_dirty = True
+
+    def acquire(self):
+        # The most recently used idle session (the one most likely to still have live connections), or a new one
+        with self._lock:
+            session = self._idle.pop() if self._idle else None
+            self._stats['reused' if session is not None else 'created'] += 1
+        if session is None:
+            session = self._factory()
+            self._restore(session)
+        return session
+
+    def release(self, session, status = None) -> None:
+        # Hand a session back, along with the status code of the last response it got (None if the request raised)
+        if status == 403:
+            with self._lock:
+                failures = self._failures[id(session)] = self._failures.get(id(session), 0) + 1
+            if failures >= self._max_failures:
+                self._forget(session)
+                with self._lock:
+                    self._failures.pop(id(session), None)
+                    self._stats['rotated'] += 1
+                self._close(session)
+                self.save()
+                return
+        elif status is not None:
+            with self._lock:
+                self._failures.pop(id(session), None)
+
+        self._harvest(session)
+        if self._cookies_dirty:
+            self.save()
+
+        with self._lock:
+            if len(self._idle) < self._size:
+                self._idle.append(session)
+                return
+            self._failures.pop(id(session), None)
+        self._close(session)
+
+    @contextlib.contextmanager
+    def session(self):
+        # For callers that don't report status codes: with pool.session() as session: ...
+        session = self.acquire()
+        try:
+            yield session
+        finally:
+            self.release(session)
+
+    @staticmethod
+    def _close(session) -> None:
+        close = getattr(session, 'close', None)
+        if close:
+            close()
+
+    def save(self) -> None:
+        # Merge into whatever is on disk now (another process may have earned cookies of its own), dropping expired ones
+        if not self._cookie_path:
+            return
+
+        with self._lock:
+            if not self._cookies_dirty:
+                return
+
+            now = time.time()
+            cookies = self._load()
+            for key in set(cookies) - set(self._cookies):
+                # Keep cookies another process saved, unless that exact value was rejected here
+                if cookies[key].value not in self._rejected:
+                    self._cookies[key] = cookies[key]
+            cookies = {key: cookie for key, cookie in self._cookies.items() if cookie.expires > now}
+
+            os.makedirs(os.path.dirname(os.path.abspath(self._cookie_path)), exist_ok=True)
+            tmp_path = f"{self._cookie_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump([list(cookie) for cookie in cookies.values()], file)
+            os.replace(tmp_path, self._cookie_path)
+
+            self._cookies, self._cookies_dirty = cookies, False
+
+    def close(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for session in idle:
+            self._harvest(session)
+            self._close(session)
+        self.save()
@@ -0,0 +1,108 @@
+# --------------------------------
+# File      : slugs.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Persistent table of jar derived mod names -> confirmed CurseForge slugs, including
+#             negative (404) results, so later runs can skip guessing slugs and re-requesting dead links.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+
+
+# How long a slug CurseForge answered with 200 is trusted, and how long a 404 keeps us from asking again
+CONFIRMED_TTL = 30 * 24 * 60 * 60
+MISSING_TTL = 24 * 60 * 60
+
+# found is True for a confirmed slug and False for one that 404'd; expires is an epoch timestamp
+SlugEntry = namedtuple('SlugEntry', ['slug', 'found', 'expires'])
+
+
+class SlugTable:
+    def __init__(self, path, confirmed_ttl = CONFIRMED_TTL, missing_ttl = MISSING_TTL) -> None:
+        self._path = path
+        self._confirmed_ttl = confirmed_ttl
+        self._missing_ttl = missing_ttl
+        self._lock = threading.Lock()
+
+        # Changes since the last save; on save they're merged into whatever is on disk by then, so separate
+        # instances (batch mode runs one per folder) don't throw away each other's results.
+        self._dirty = {}
+        self._entries = self._load()
+
+    @property
+    def path(self):
+        return self._path
+
+    def _load(self) -> dict:
+        try:
+            with open(self._path, 'r') as file:
+                return {name: SlugEntry(*entry) for name, entry in json.load(file).items()}
+        except (OSError, ValueError, TypeError):
+            return {}
+
+    def lookup(self, name):
+        # Entry for name, or None if we have nothing (or nothing that's still valid)
+        entry = self._entries.get(name)
+        if entry and entry.expires > time.time():
+            return entry
+        return None
+
+    def confirmed(self, name):
+        # The slug CurseForge already answered with a 200 for this name, if any
+        entry = self.lookup(name)
+        return entry.slug if entry and entry.found else None
+
+    def is_missing(self, name, slug) -> bool:
+        # True if this exact slug 404'd recently. A different slug (e.g. a new alias was added since) is always worth a try.
+        entry = self.lookup(name)
+        return bool(entry and not entry.found and entry.slug == slug)
+
+    def record(self, name, slug, found) -> None:
+        entry = SlugEntry(slug, found, time.time() + (self._confirmed_ttl if found else self._missing_ttl))
+        with self._lock:
+            self._entries[name] = entry
+            self._dirty[name] = entry
+
+    def save(self) -> None:
+        with self._lock:
+            if not self._dirty:
+                return
+
+            entries = self._load()
+            entries.update(self._dirty)
+            now = time.time()
+            entries = {name: entry for name, entry in entries.items() if entry.expires > now}
+
+            os.makedirs(os.path.dirname(os.path.abspath(self._path)), exist_ok=True)
+            tmp_path = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w') as file:
+                json.dump({name: list(entry) for name, entry in entries.items()}, file)
+            os.replace(tmp_path, self._path)
+
+            self._entries, self._dirty = entries, {}
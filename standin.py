@@ -0,0 +1,288 @@
+# --------------------------------
+# File      : standin.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Local stand-in for every server MVM talks to (GitHub raw, Mojang, CurseForge). Serves hand-built
+#             fixtures with configurable latency and 403/503 rates, for offline benchmarking of the crawler.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+from backends import UrllibBackend
+from filetable import FILES_PER_PAGE, LOADER_FILTERS
+
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks', 'fixtures')
+
+# /minecraft/mc-mods/<slug>/files (and /files/all), with or without a query string
+_CURSEFORGE_FILES_PATH = re.compile(r'^/minecraft/mc-mods/([^/]+)/files(?:/all)?/?$')
+
+# Pieces of a fixture page needed to filter and paginate it like CurseForge would
+_FILTER_OPTION = '<option value="{}">(.*?)</option>'
+_FILE_ROW = re.compile(r'<tr>\s*<td>.*?</tr>', re.S)
+_FILE_NAME = re.compile(r'data-action="file-link"[^>]*>([^<]*)<')
+_EXTRA_VERSIONS = re.compile(r'class="extra-versions" title="([^"]*)"')
+
+# /minecraft/mc-mods/<slug>/download/<file id>(/file)
+_CURSEFORGE_DOWNLOAD_PATH = re.compile(r'^/minecraft/mc-mods/([^/]+)/download/(\d+)(?:/file)?/?$')
+
+
+class StandinServer:
+    def __init__(self, fixtures_folder = FIXTURES_FOLDER, host = '127.0.0.1', port = 0, latency = 0.0, jitter = 0.0,
+                 rate_403 = 0.0, rate_503 = 0.0, default_page = None, seed = None) -> None:
+        # latency (+ up to jitter more) seconds is added to every response. rate_403 / rate_503 are the odds of a
+        # CurseForge page being answered with a captcha block / overloaded error instead; the JSON files always work,
+        # since nothing retries those. default_page is a fixture slug served for any mod we don't have a page for,
+        # handy to crawl a thousand mods off a couple of fixtures. Without it unknown mods 404 like they would live.
+        self._fixtures_folder = fixtures_folder
+        self._latency = latency
+        self._jitter = jitter
+        self._rate_403 = rate_403
+        self._rate_503 = rate_503
+        self._default_page = default_page
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+        self._pages = {}
+        self._stats = Counter()
+        self._stats_lock = threading.Lock()
+
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                standin._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def address(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def stats(self):
+        # Counter of 'requests' plus one entry per status code served
+        with self._stats_lock:
+            return Counter(self._stats)
+
+    def _roll(self):
+        with self._random_lock:
+            return self._random.random(), self._random.uniform(0, self._jitter)
+
+    def _read_fixture(self, name):
+        # Fixture files are read once and kept in memory so disk speed never shows up in a benchmark
+        if name not in self._pages:
+            path = os.path.join(self._fixtures_folder, name)
+            # Fall back on the aliases/outliers files shipped in the repo root
+            if not os.path.exists(path):
+                path = os.path.join(os.path.dirname(os.path.abspath(__file__)), name)
+            try:
+                with open(path, 'rb') as file:
+                    self._pages[name] = file.read()
+            except OSError:
+                self._pages[name] = None
+        return self._pages[name]
+
+    def _route(self, path):
+        # -> (status, content type, body, is_curseforge)
+        parts = urllib.parse.urlsplit(path)
+        path = parts.path
+
+        for name in ['known_aliases.json', 'known_outliers.json', 'version_manifest.json']:
+            if path.endswith(f"/{name}"):
+                body = self._read_fixture(name)
+                return (200, 'application/json', body, False) if body is not None else (404, 'text/plain', b'Not Found', False)
+
+        match = _CURSEFORGE_FILES_PATH.match(path)
+        if match:
+            body = self._read_fixture(f"curseforge_files_{match.group(1)}.html")
+            if body is None and self._default_page:
+                body = self._read_fixture(f"curseforge_files_{self._default_page}.html")
+            if body is not None:
+                query = urllib.parse.parse_qs(parts.query)
+                if 'filter-game-version' in query or 'page' in query:
+                    body = self._filtered(body, query.get('filter-game-version', [''])[0], int(query.get('page', ['1'])[0] or 1))
+                return 200, 'text/html; charset=utf-8', body, True
+            return 404, 'text/html', b'<html><body>Not Found</body></html>', True
+
+        match = _CURSEFORGE_DOWNLOAD_PATH.match(path)
+        if match:
+            return 200, 'application/java-archive', self._jar(*match.groups()), True
+
+        return 404, 'text/plain', b'Not Found', False
+
+    def _filtered(self, body, value, page):
+        # The fixture page cut down to the rows for one filter-game-version value, FILES_PER_PAGE rows at a time.
+        # The value's label comes from the page's own dropdown: a loader keeps every file not named after the other loader,
+        # a game version keeps the files listed under it, whether it's the version the row shows or one behind its "+N" badge.
+        name = f"filtered:{hashlib.sha1(body).hexdigest()}:{value}:{page}"
+        if name not in self._pages:
+            page_text = body.decode('utf-8')
+            label = re.search(_FILTER_OPTION.format(re.escape(value)), page_text) if value else None
+            label = label.group(1).replace('&nbsp;', '').strip().lower() if label else ''
+
+            head, rest = page_text.split('<tbody>', 1)
+            table, tail = rest.split('</tbody>', 1)
+            rows = _FILE_ROW.findall(table)
+            if value and not label:
+                # A version this mod has never had a file for
+                rows = []
+            elif label in LOADER_FILTERS:
+                others = [loader for loader in LOADER_FILTERS if loader != label]
+                rows = [row for row in rows if not any(other in _FILE_NAME.search(row).group(1).lower() for other in others)]
+            elif label:
+                rows = [row for row in rows if f">{label}</span>" in row or label in self._extra_versions(row)]
+
+            rows = rows[(page - 1) * FILES_PER_PAGE:page * FILES_PER_PAGE]
+            self._pages[name] = f"{head}<tbody>\n{''.join(rows)}\n</tbody>{tail}".encode('utf-8')
+        return self._pages[name]
+
+    @staticmethod
+    def _extra_versions(row):
+        # The fixtures keep the versions hidden behind the badge in its title; CurseForge's page doesn't show them either
+        match = _EXTRA_VERSIONS.search(row)
+        return [version.strip().lower() for version in match.group(1).split(',')] if match else []
+
+    def _jar(self, slug, file_id):
+        # Downloads are made up on the spot: a small valid jar with a fabric.mod.json, the same bytes every time
+        name = f"jar:{slug}:{file_id}"
+        if name not in self._pages:
+            buffer = io.BytesIO()
+            with zipfile.ZipFile(buffer, 'w') as jar:
+                jar.writestr(zipfile.ZipInfo('fabric.mod.json', (2022, 1, 1, 0, 0, 0)), json.dumps({'id': slug, 'version': file_id, 'depends': {'minecraft': '~1.19.2'}}))
+                jar.writestr(zipfile.ZipInfo(f"{slug}/Mod.class", (2022, 1, 1, 0, 0, 0)), random.Random(f"{slug}{file_id}").randbytes(256 * 1024))
+            self._pages[name] = buffer.getvalue()
+        return self._pages[name]
+
+    def _handle(self, handler) -> None:
+        status, content_type, body, is_curseforge = self._route(handler.path)
+        roll, jitter = self._roll()
+        if self._latency or jitter:
+            time.sleep(self._latency + jitter)
+
+        if is_curseforge and roll < self._rate_403:
+            status, body = 403, b'<html><body>Please complete the security check to access www.curseforge.com</body></html>'
+        elif is_curseforge and roll < self._rate_403 + self._rate_503:
+            status, body = 503, b'<html><body>Service Unavailable</body></html>'
+
+        # Real ETags so revalidation through the response cache can be exercised as well
+        etag = None
+        if status == 200:
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            if handler.headers.get('If-None-Match') == etag:
+                status, body = 304, b''
+
+        # Single open ended ranges (bytes=N-) are enough to resume a download
+        content_range = None
+        range_header = handler.headers.get('Range', '')
+        if status == 200 and range_header.startswith('bytes=') and range_header.endswith('-'):
+            start = int(range_header[len('bytes='):-1] or 0)
+            if start < len(body):
+                content_range = f"bytes {start}-{len(body) - 1}/{len(body)}"
+                status, body = 206, body[start:]
+
+        with self._stats_lock:
+            self._stats['requests'] += 1
+            self._stats[status] += 1
+
+        handler.send_response(status)
+        handler.send_header('Content-Type', content_type)
+        handler.send_header('Content-Length', str(len(body)))
+        handler.send_header('Accept-Ranges', 'bytes')
+        if content_range: handler.send_header('Content-Range', content_range)
+        if etag: handler.send_header('ETag', etag)
+        # Downloads are named unlike the listing's display names, which plenty of real files are too
+        download = _CURSEFORGE_DOWNLOAD_PATH.match(urllib.parse.urlsplit(handler.path).path)
+        if download and status in (200, 206):
+            handler.send_header('Content-Disposition', f'attachment; filename="{download.group(1)}-{download.group(2)}.jar"')
+        handler.end_headers()
+        handler.wfile.write(body)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        # Blocking version of start(), for running the stand-in on its own
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class StandinBackend(UrllibBackend):
+    # Sends every request to the stand-in instead of wherever it was headed, keeping the path and query,
+    # so ModVersionMaintainer can run completely unchanged against it.
+    def __init__(self, address, timeout = 30) -> None:
+        super().__init__(timeout)
+        self._address = urllib.parse.urlsplit(address)
+
+    def get(self, url, headers = None, stream = False):
+        parts = urllib.parse.urlsplit(url)
+        return super().get(urllib.parse.urlunsplit((self._address.scheme, self._address.netloc, parts.path, parts.query, '')), headers, stream)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve hand-built stand-ins for GitHub/Mojang/CurseForge responses locally.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=FIXTURES_FOLDER, help="folder with version_manifest.json and curseforge_files_<slug>.html pages")
+    parser.add_argument('--latency', type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument('--jitter', type=float, default=0.0, help="up to this many extra seconds, at random")
+    parser.add_argument('--rate-403', type=float, default=0.0, help="odds (0-1) of a CurseForge page being captcha blocked")
+    parser.add_argument('--rate-503', type=float, default=0.0, help="odds (0-1) of a CurseForge page being unavailable")
+    parser.add_argument('--default-page', help="fixture slug served for mods without their own page (otherwise 404)")
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    server = StandinServer(args.fixtures, args.host, args.port, args.latency, args.jitter, args.rate_403, args.rate_503, args.default_page, args.seed)
+    print(f"{Fore.LIGHTGREEN_EX}Stand-in server listening on {server.address}{Style.RESET_ALL}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n{dict(server.stats)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# --------------------------------
+# File      : conftest.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Shared pytest fixtures: a throwaway home folder, the stand-in server
+#             and jar builders
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+import sys
+import zipfile
+
+import pytest
+
+# The modules live flat at the repo root and import each other (and __init__) by plain name
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from standin import StandinBackend, StandinServer
+
+
+def make_jar(folder, file_name, mod_id, version, minecraft = '1.19.2', loader = 'fabric', filler = b'') -> str:
+    # A jar with just enough metadata for the inspector: fabric.mod.json, or mods.toml with a MANIFEST.
+    # minecraft is written as given, so it can be a version range.
+    path = os.path.join(folder, file_name)
+    with zipfile.ZipFile(path, 'w') as jar:
+        if loader == 'fabric':
+            jar.writestr('fabric.mod.json', json.dumps({'schemaVersion': 1, 'id': mod_id, 'version': version, 'depends': {'minecraft': minecraft}}))
+        else:
+            jar.writestr('META-INF/MANIFEST.MF', f"Manifest-Version: 1.0\nImplementation-Version: {version}\n")
+            jar.writestr('META-INF/mods.toml', '\n'.join([
+                'modLoader="javafml"', '[[mods]]', f'modId="{mod_id}"', 'version="${file.jarVersion}"',
+                f'[[dependencies.{mod_id}]]', 'modId="minecraft"', 'mandatory=true', f'versionRange="{minecraft}"', '',
+            ]))
+        jar.writestr(f"{mod_id}/Filler.class", filler or mod_id.encode() * 64)
+    return path
+
+
+@pytest.fixture
+def home(tmp_path, monkeypatch):
+    # Everything MVM keeps under ~/.mvm goes to a fresh folder per test
+    path = tmp_path / 'home'
+    path.mkdir()
+    monkeypatch.setenv('HOME', str(path))
+    return path
+
+
+@pytest.fixture
+def standin():
+    with StandinServer(port=0) as server:
+        yield server
+
+
+@pytest.fixture
+def backend(standin):
+    return StandinBackend(standin.address)
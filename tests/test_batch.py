@@ -0,0 +1,113 @@
+# --------------------------------
+# File      : test_batch.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for batch mode: several folders checked in one run against the
+#             stand-in server, and the disclaimer check
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import json
+import os
+import shutil
+
+import pytest
+
+import batch
+from conftest import make_jar
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def workdir(home, tmp_path, monkeypatch):
+    # batch.py reads (and on --accept-disclaimer, writes) disclaimer.txt in the working folder
+    path = tmp_path / 'work'
+    path.mkdir()
+    shutil.copy(os.path.join(REPO_FOLDER, 'disclaimer.txt'), path / 'disclaimer.txt')
+    monkeypatch.chdir(path)
+    return path
+
+
+def test_two_folders_in_one_run(workdir, tmp_path, standin):
+    folder_a, folder_b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    os.makedirs(folder_a), os.makedirs(folder_b)
+    make_jar(folder_a, 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+    make_jar(folder_b, 'sodium-mc-0.4.7+1.18.2.jar', 'sodium', '0.4.7', '1.18.2')
+    output = str(tmp_path / 'results.json')
+
+    assert batch.main([folder_a, folder_b, '--standin', standin.address, '--accept-disclaimer', '--loader', 'fabric', '-o', output]) == 0
+
+    with open(output, 'r') as file:
+        folders = {folder['folder']: folder for folder in json.load(file)}
+    assert folders[folder_a]['mc_version'] == '1.19.2'
+    assert folders[folder_b]['mc_version'] == '1.18.2'
+    for folder in folders.values():
+        [mod] = folder['mods']
+        assert mod['slug'] == 'sodium' and mod['status'] == 200
+        assert mod['files']
+
+    # Each folder only gets the files for its own game version
+    assert all(row['game_version'] == '1.19.2' for row in folders[folder_a]['mods'][0]['files'])
+    assert all(row['game_version'] == '1.18.2' for row in folders[folder_b]['mods'][0]['files'])
+
+
+def test_ndjson_writes_one_line_per_folder(workdir, tmp_path, standin):
+    folder = str(tmp_path / 'a')
+    os.makedirs(folder)
+    make_jar(folder, 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+    output = str(tmp_path / 'results.ndjson')
+
+    assert batch.main([folder, '--standin', standin.address, '--accept-disclaimer', '--format', 'ndjson', '-o', output]) == 0
+    with open(output, 'r') as file:
+        lines = file.read().splitlines()
+    assert len(lines) == 1 and json.loads(lines[0])['folder'] == folder
+
+
+def test_refuses_to_run_without_the_disclaimer(workdir, tmp_path, standin):
+    folder = str(tmp_path / 'a')
+    os.makedirs(folder)
+    assert batch.main([folder, '--standin', standin.address]) == 2
+    assert standin.stats['requests'] == 0
+
+
+def test_accepting_the_disclaimer_is_remembered(workdir):
+    assert not batch.check_disclaimer(False)
+    assert batch.check_disclaimer(True)
+    assert batch.check_disclaimer(False)
+
+
+def test_manifest_files(tmp_path):
+    text = tmp_path / 'folders.txt'
+    text.write_text("# servers\n/srv/a\n\n/srv/b\n")
+    assert batch.read_manifest(str(text)) == [{'path': '/srv/a'}, {'path': '/srv/b'}]
+
+    listing = tmp_path / 'folders.json'
+    listing.write_text(json.dumps(['/srv/a', {'path': '/srv/b', 'loader': 'forge'}]))
+    assert batch.read_manifest(str(listing)) == [{'path': '/srv/a'}, {'path': '/srv/b', 'loader': 'forge'}]
@@ -0,0 +1,107 @@
+# --------------------------------
+# File      : test_cache.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the persistent response cache: freshness, revalidation, offline use and eviction
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+
+from cache import CachedResponse, ResponseCache
+
+URL = 'https://launchermeta.mojang.com/mc/game/version_manifest.json'
+
+
+class Server:
+    # A get() for the cache that answers with a fixed body and ETag, and 304 when asked about that ETag
+    def __init__(self, body = b'{"versions": []}', etag = '"v1"') -> None:
+        self.body, self.etag, self.requests, self.down = body, etag, [], False
+
+    def __call__(self, url, headers):
+        self.requests.append(dict(headers))
+        if self.down:
+            raise OSError('connection refused')
+        if headers.get('If-None-Match') == self.etag:
+            return CachedResponse(url, 304, b'', {'ETag': self.etag})
+        return CachedResponse(url, 200, self.body, {'ETag': self.etag})
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'))
+    yield cache
+    cache.close()
+
+
+def test_fresh_responses_never_reach_the_server(cache):
+    server = Server()
+    assert cache.fetch(URL, 'manifest', server).content == server.body
+    response = cache.fetch(URL, 'manifest', server)
+    assert response.from_cache and response.content == server.body
+    assert len(server.requests) == 1
+
+
+def test_stale_responses_are_revalidated_with_their_etag(tmp_path):
+    cache, server = ResponseCache(str(tmp_path / 'cache.db'), ttls={'manifest': 0}), Server()
+    cache.fetch(URL, 'manifest', server)
+    response = cache.fetch(URL, 'manifest', server)
+    assert server.requests[-1]['If-None-Match'] == '"v1"'
+    assert response.status_code == 200 and response.content == server.body
+
+    # A stale answer beats none when the server can't be reached
+    server.down = True
+    assert cache.fetch(URL, 'manifest', server).content == server.body
+    cache.close()
+
+
+def test_offline_serves_what_it_has_and_504_otherwise(cache):
+    cache.fetch(URL, 'manifest', Server())
+    cache.offline = True
+    assert cache.fetch(URL, 'manifest', Server(b'new')).content == b'{"versions": []}'
+    assert cache.fetch(URL + '?other', 'manifest', Server()).status_code == 504
+
+
+def test_only_successful_responses_are_kept(cache):
+    missing = lambda url, headers: CachedResponse(url, 404, b'Not Found')
+    assert cache.fetch(URL, 'curseforge', missing).status_code == 404
+    server = Server()
+    cache.fetch(URL, 'curseforge', server)
+    assert len(server.requests) == 1
+
+
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = ResponseCache(str(tmp_path / 'cache.db'), max_bytes=25)
+    for page in ('a', 'b', 'c'):
+        cache.fetch(f"{URL}?{page}", 'manifest', Server(b'x' * 10))
+    server = Server(b'x' * 10)
+    cache.fetch(f"{URL}?a", 'manifest', server)
+    cache.fetch(f"{URL}?c", 'manifest', server)
+    # a was evicted to make room for c, c is still there
+    assert len(server.requests) == 1
+    cache.close()
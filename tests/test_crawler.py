@@ -0,0 +1,81 @@
+# --------------------------------
+# File      : test_crawler.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the concurrent crawler: per-mod retries and per-host rate limiting
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import time
+
+import pytest
+
+from crawler import Crawler, RateLimiter
+from standin import StandinBackend, StandinServer
+
+FILES_URL = 'https://www.curseforge.com/minecraft/mc-mods/{}/files'
+
+
+def test_every_mod_comes_back_once(backend):
+    results = list(Crawler(workers=4, rate=100, backend=backend).crawl({slug: FILES_URL.format(slug) for slug in ('sodium', 'jei', 'nope')}))
+    assert sorted((result.key, result.response.status_code, result.attempts) for result in results) == [
+        ('jei', 200, 1), ('nope', 404, 1), ('sodium', 200, 1),
+    ]
+
+
+def test_blocked_mods_are_retried_on_their_own_then_given_up_on():
+    with StandinServer(port=0, rate_403=1.0) as server:
+        retried = []
+        crawler = Crawler(workers=2, rate=100, retries=2, delay=0, backend=StandinBackend(server.address))
+        [result] = crawler.crawl({'sodium': FILES_URL.format('sodium')}, on_retry=lambda key, *args: retried.append(key))
+
+    assert (result.response.status_code, result.attempts) == (403, 3)
+    assert retried == ['sodium', 'sodium']
+
+
+@pytest.mark.parametrize('attempt', [0, 3, 10])
+def test_backoff_stays_within_its_window(attempt):
+    crawler = Crawler(delay=2, max_delay=30, backend=object())
+    window = min(30, 2 * 2 ** attempt)
+    assert window / 2 <= crawler.backoff(attempt) <= window
+
+
+def test_rate_limit_is_per_host():
+    limiter = RateLimiter(rate=20)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait('https://www.curseforge.com/a')
+    # Two intervals for the third request to the same host
+    assert time.monotonic() - start >= 2 / 20
+
+    # Another host has a schedule of its own and doesn't queue behind those
+    other = RateLimiter(rate=20)
+    other.wait('https://www.curseforge.com/a')
+    start = time.monotonic()
+    other.wait('https://example.com/b')
+    assert time.monotonic() - start < 1 / 20
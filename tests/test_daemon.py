@@ -0,0 +1,181 @@
+# --------------------------------
+# File      : test_daemon.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the watch daemon: request budgets and checks of several folders
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+import time
+
+import daemon as daemon_module
+from conftest import make_jar
+import pytest
+
+from backends import RequestRefused
+from crawler import Crawler
+from daemon import CURSEFORGE_HOST, BudgetedBackend, Daemon, PollingWatcher, RequestBudget, parse_budgets
+from standin import StandinBackend, StandinServer
+
+
+def updates(daemon, folder) -> list:
+    return next(status for status in daemon.status()['folders'] if status['folder'] == folder).get('updates')
+
+
+def test_folders_on_different_versions_share_the_file_store(home, tmp_path, backend):
+    # Both folders have sodium, on different game versions; each one's listing must not hide the other's
+    folder_a, folder_b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    os.makedirs(folder_a), os.makedirs(folder_b)
+    make_jar(folder_a, 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+    make_jar(folder_b, 'sodium-mc-0.4.7+1.18.2.jar', 'sodium', '0.4.7', '1.18.2')
+
+    daemon = Daemon(
+        [{'path': folder_a, 'loader': 'fabric', 'mc_version': '1.19.2'}, {'path': folder_b, 'loader': 'fabric', 'mc_version': '1.18.2'}],
+        status_path=str(home / 'status.json'), backend=backend, rate=100,
+    )
+    # The first round learns the game version filters, the second uses them
+    for folder in (folder_a, folder_b, folder_a, folder_b):
+        daemon.check(folder)
+
+    # An unrelated change in a only looks up the new mod; sodium's update has to be planned from a's own listing
+    make_jar(folder_a, 'other-1.0.jar', 'other', '1.0', '1.19.2')
+    daemon.check(folder_a, changed_only=True)
+
+    assert [update['latest'] for update in updates(daemon, folder_a) if update['name'] == 'sodium'] == ['sodium-fabric-0.6.5+1.19.2.jar']
+    assert [update['latest'] for update in updates(daemon, folder_b)] == ['sodium-mc-0.4.9+1.18.2.jar']
+
+
+def test_budget_spends_and_refills():
+    budget = RequestBudget({CURSEFORGE_HOST: 3}, window=0.2)
+    assert budget.available(CURSEFORGE_HOST) == 3
+    budget.spend(CURSEFORGE_HOST, 2)
+    assert budget.available(CURSEFORGE_HOST) == 1
+    assert budget.wait_time(CURSEFORGE_HOST) == 0.0
+
+    budget.spend(CURSEFORGE_HOST)
+    assert budget.available(CURSEFORGE_HOST) == 0
+    wait = budget.wait_time(CURSEFORGE_HOST)
+    assert 0.0 < wait <= 0.2
+    # More than the whole budget never fits
+    assert budget.wait_time(CURSEFORGE_HOST, 10) == float('inf')
+
+    time.sleep(wait + 0.01)
+    assert budget.available(CURSEFORGE_HOST) == 3
+    assert budget.snapshot() == {CURSEFORGE_HOST: {'limit': 3, 'available': 3}}
+
+
+def test_hosts_without_a_budget_are_unlimited():
+    budget = RequestBudget({CURSEFORGE_HOST: 1})
+    budget.spend('raw.githubusercontent.com', 1000)
+    assert budget.available('raw.githubusercontent.com') == float('inf')
+    assert budget.wait_time('raw.githubusercontent.com') == 0.0
+    assert budget.limit('raw.githubusercontent.com') is None
+
+
+def test_parse_budgets():
+    assert parse_budgets(None) == {CURSEFORGE_HOST: 300}
+    assert parse_budgets([f"{CURSEFORGE_HOST}=10", 'api.modrinth.com=50']) == {CURSEFORGE_HOST: 10, 'api.modrinth.com': 50}
+
+
+def test_only_requests_that_go_out_are_booked(standin, backend):
+    budget = RequestBudget({CURSEFORGE_HOST: 10})
+    budgeted = BudgetedBackend(backend, budget)
+    budgeted.get('https://www.curseforge.com/minecraft/mc-mods/sodium/files/all')
+    session = budgeted.acquire()
+    session.get('https://www.curseforge.com/minecraft/mc-mods/jei/files/all')
+    budgeted.release(session)
+    budgeted.get('https://raw.githubusercontent.com/x/y/main/known_aliases.json')
+
+    assert budget.available(CURSEFORGE_HOST) == 8
+    assert standin.stats['requests'] == 3
+
+
+def test_polling_watcher(tmp_path, monkeypatch):
+    monkeypatch.setattr(daemon_module, 'SETTLE', 0.01)
+    folder_a, folder_b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    os.makedirs(folder_a), os.makedirs(folder_b)
+    watcher = PollingWatcher([folder_a, folder_b], interval=0.01)
+    assert watcher.wait(0.05) == set()
+
+    make_jar(folder_b, 'sodium-mc-0.4.7+1.18.2.jar', 'sodium', '0.4.7', '1.18.2')
+    # Anything that isn't a jar is none of our business
+    with open(os.path.join(folder_a, 'notes.txt'), 'w') as file:
+        file.write('hello')
+    assert watcher.wait(1.0) == {folder_b}
+    assert watcher.wait(0.05) == set()
+
+    os.remove(os.path.join(folder_b, 'sodium-mc-0.4.7+1.18.2.jar'))
+    assert watcher.wait(1.0) == {folder_b}
+
+
+def test_spent_budgets_refuse_requests(standin, backend):
+    budget = RequestBudget({CURSEFORGE_HOST: 2})
+    budgeted = BudgetedBackend(backend, budget)
+    budgeted.get('https://www.curseforge.com/minecraft/mc-mods/sodium/files/all')
+    session = budgeted.acquire()
+    session.get('https://www.curseforge.com/minecraft/mc-mods/jei/files/all')
+    with pytest.raises(RequestRefused):
+        session.get('https://www.curseforge.com/minecraft/mc-mods/jei/files/all')
+    budgeted.release(session)
+    with pytest.raises(RequestRefused):
+        budgeted.get('https://www.curseforge.com/minecraft/mc-mods/sodium/files/all')
+    assert standin.stats['requests'] == 2
+
+
+def test_refused_requests_are_not_retried(standin, backend):
+    budgeted = BudgetedBackend(backend, RequestBudget({CURSEFORGE_HOST: 0}))
+    crawler = Crawler(retries=5, delay=60, backend=budgeted)
+    [result] = crawler.crawl({'sodium': 'https://www.curseforge.com/minecraft/mc-mods/sodium/files/all'})
+    assert result.response is None and isinstance(result.error, RequestRefused)
+    assert result.attempts == 1
+    assert standin.stats['requests'] == 0
+
+
+def test_a_check_bigger_than_the_budget_is_split_up(home, tmp_path):
+    folder = str(tmp_path / 'mods')
+    os.makedirs(folder)
+    for name in ['alpha', 'beta', 'gamma', 'delta', 'epsilon']:
+        make_jar(folder, f"{name}-1.0+1.19.2.jar", name, '1.0', '1.19.2')
+
+    with StandinServer(port=0, default_page='sodium') as server:
+        daemon = Daemon([{'path': folder, 'loader': 'fabric', 'mc_version': '1.19.2'}], budgets={CURSEFORGE_HOST: 2},
+                        status_path=str(home / 'status.json'), backend=StandinBackend(server.address), rate=100)
+        checked = []
+        for _ in range(3):
+            daemon.check(folder, changed_only=folder in daemon._pending)
+            status = next(status for status in daemon.status()['folders'] if status['folder'] == folder)
+            checked.append((status['crawled'], status['pending'], daemon.budget.available(CURSEFORGE_HOST)))
+            # The budget refilling, an hour early
+            daemon.budget._spent.clear()
+
+        assert checked == [(2, 3, 0), (2, 1, 0), (1, 0, 1)]
+        # Done with the split up check, the next full one is an interval away
+        assert daemon._due[folder] > time.time() + 60
+        # Each mod's listing was asked for once, plus the aliases and outliers
+        assert server.stats['requests'] == 5 + 2
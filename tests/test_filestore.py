@@ -0,0 +1,183 @@
+# --------------------------------
+# File      : test_filestore.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the columnar file store: merging listings, queries and saving
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+
+from conftest import make_jar
+from filestore import FileStore
+from filetable import FileRow, parse_file_page
+from mvm import ModVersionMaintainer
+from standin import FIXTURES_FOLDER
+
+
+def row(file_id, name, game_version, uploaded, type = 'R'):
+    return FileRow(type, name, '1.00 MB', uploaded, game_version, '1,000', 'Download', str(file_id))
+
+
+NEW_1192 = [
+    row(30, 'sodium-fabric-0.6.5+1.19.2.jar', '1.19.2', 'Sep 1, 2022'),
+    row(29, 'sodium-fabric-0.6.4+1.19.2.jar', '1.19.2', 'Aug 27, 2022', 'B'),
+    row(28, 'sodium-forge-0.6.3+1.19.2.jar', '1.19.2', 'Aug 16, 2022'),
+]
+OLD_1182 = [
+    row(20, 'sodium-mc-0.4.9+1.18.2.jar', '1.18.2', 'Apr 14, 2022'),
+    row(19, 'sodium-mc-0.4.8+1.18.2.jar', '1.18.2', 'Apr 1, 2022'),
+]
+
+
+def test_listings_of_one_mod_are_merged_not_replaced():
+    store = FileStore()
+    store.extend('sodium', NEW_1192, 'listing-1.19.2', 'digest-a')
+    store.extend('sodium', OLD_1182, 'listing-1.18.2', 'digest-b')
+    # The same page again adds nothing
+    assert store.extend('sodium', NEW_1192, 'listing-1.19.2', 'digest-a') == 0
+
+    assert store.latest('sodium', '1.19.2', 'fabric').file_id == 30
+    assert store.latest('sodium', '1.18.2', 'fabric').file_id == 20
+    assert store.source('sodium', 'listing-1.19.2') == 'digest-a'
+    assert store.source('sodium', 'listing-1.18.2') == 'digest-b'
+    assert store.source('sodium', 'listing-1.17.1') is None
+
+
+def test_files_picks_out_version_and_loader_newest_first():
+    store = FileStore()
+    store.extend('sodium', OLD_1182 + NEW_1192)
+    assert [file.file_id for file in store.files('sodium')] == [30, 29, 28, 20, 19]
+    assert [file.file_id for file in store.files('sodium', '1.19.2', 'fabric')] == [30, 29]
+    # No loader in the name counts for every loader
+    assert [file.file_id for file in store.files('sodium', '1.18.2', 'forge')] == [20, 19]
+    assert store.files('sodium', '1.16.5') == []
+    assert store.files('iris') == []
+
+
+def test_latest_prefers_release_types_in_order_and_respects_before():
+    store = FileStore()
+    store.extend('sodium', NEW_1192)
+    assert store.latest('sodium', '1.19.2', 'fabric', ('B', 'R')).file_id == 29
+    assert store.latest('sodium', '1.19.2', 'forge').file_id == 28
+
+    newest = store.files('sodium')[0].uploaded
+    assert store.latest('sodium', '1.19.2', 'fabric', ('R',), before=newest) is None
+    assert store.latest('sodium', '1.19.2', 'fabric', ('R', 'B'), before=newest).file_id == 29
+
+
+def test_save_merges_with_what_another_instance_saved(tmp_path):
+    path = str(tmp_path / 'files.json')
+    first, second = FileStore(path), FileStore(path)
+    first.extend('sodium', NEW_1192, 'listing-1.19.2', 'digest-a')
+    second.extend('sodium', OLD_1182, 'listing-1.18.2', 'digest-b')
+    first.save()
+    second.save()
+
+    store = FileStore(path)
+    assert {file.file_id for file in store.files('sodium')} == {30, 29, 28, 20, 19}
+    assert store.source('sodium', 'listing-1.19.2') == 'digest-a'
+    assert store.source('sodium', 'listing-1.18.2') == 'digest-b'
+
+
+def test_files_in_a_version_listing_count_for_that_version_whatever_they_show_first():
+    # Row 3963227 shows "1.19.2 +3"; the badge hides 1.19.3, so only the 1.19.3 listing tells us it's for 1.19.3 too
+    with open(os.path.join(FIXTURES_FOLDER, 'curseforge_files_sodium.html'), 'rb') as file:
+        rows, filters = parse_file_page(file.read())
+    [file_row] = [row for row in rows if row.file_id == '3963227']
+    assert file_row.game_version == '1.19.2'
+
+    listing = f"https://www.curseforge.com/minecraft/mc-mods/sodium/files/all?filter-game-version={filters['1.19.3']}"
+    store = FileStore()
+    store.learn_filters(filters)
+    assert store.listing_version(listing) == '1.19.3'
+    store.extend('sodium', [file_row], listing, 'digest')
+
+    assert store.latest('sodium', '1.19.3', 'fabric').file_id == 3963227
+    assert [file.file_id for file in store.files('sodium', '1.19.3', 'fabric')] == [3963227]
+    # It still counts for the version it shows, and a loader listing says nothing about versions
+    assert store.latest('sodium', '1.19.2', 'fabric').file_id == 3963227
+    assert store.listing_version(f"{listing.split('=')[0]}=1738749986:4") is None
+
+
+def test_listed_versions_are_saved_and_merged(tmp_path):
+    path = str(tmp_path / 'files.json')
+    filters = {'1.19.3': '2020709689:9900', '1.19.2': '2020709689:8875'}
+    first, second = FileStore(path), FileStore(path)
+    for store in (first, second):
+        store.learn_filters(filters)
+    first.extend('sodium', NEW_1192[:1], 'files/all?filter-game-version=2020709689:9900')
+    second.extend('sodium', NEW_1192[1:], 'files/all?filter-game-version=2020709689:9900')
+    first.save()
+    second.save()
+
+    assert [file.file_id for file in FileStore(path).files('sodium', '1.19.3')] == [30, 29, 28]
+
+
+def test_a_pack_on_a_version_no_row_shows_first_still_gets_its_files(home, tmp_path, backend):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    make_jar(str(folder), 'sodium-mc-0.6.1+1.19.3.jar', 'sodium', '0.6.1', '1.19.3')
+    mvm = ModVersionMaintainer(backend=backend, prefetch=False)
+    mvm.mods_folder = str(folder)
+    mvm.process_mods(mod_type='fabric', mc_version='1.19.3', interactive=False)
+    # The first crawl learns the game version filters from the loader listing, the second asks for the 1.19.3 listing
+    for _ in range(2):
+        mvm.process_links(mvm.mod_type, mvm.mc_version)
+
+    assert [file.file_id for file in mvm.mod_files['sodium']][:1] == [3963227]
+    assert mvm.file_store.latest('sodium', '1.19.3', 'fabric').file_id == 3963227
+
+
+def test_the_store_is_saved_as_json(tmp_path):
+    path = str(tmp_path / 'files.json')
+    store = FileStore(path)
+    store.learn_filters({'1.19.2': '2020709689:8875'})
+    store.extend('sodium', NEW_1192, 'files/all?filter-game-version=2020709689:8875', 'digest-a')
+    store.save()
+
+    with open(path, 'r') as file:
+        data = json.load(file)
+    assert data['filters'] == {'1.19.2': '2020709689:8875'}
+    assert data['mods']['sodium']['file_ids'] == [30, 29, 28]
+    assert data['mods']['sodium']['listed'] == {'1.19.2': [28, 29, 30]}
+
+    loaded = FileStore(path)
+    assert loaded.files('sodium') == store.files('sodium')
+    assert loaded.latest('sodium', '1.19.2', 'fabric', ('B',)).file_id == 29
+    assert loaded.source('sodium', 'files/all?filter-game-version=2020709689:8875') == 'digest-a'
+
+
+def test_anything_else_on_disk_is_started_over(tmp_path):
+    path = tmp_path / 'files.json'
+    for content in [b'\x80\x04\x95 not json', b'{"format": 0, "mods": {}}', b'{"format": 1, "mods": {"sodium": {"names": ["a"]}}}',
+                    b'{"format": 1, "mods": {"sodium": {"names": ["a"], "file_ids": [1, 2], "sizes": [], "uploaded": [], "downloads": [],'
+                    b' "types": [], "loaders": [], "versions": [], "version_codes": []}}}']:
+        path.write_bytes(content)
+        assert 'sodium' not in FileStore(str(path))
@@ -0,0 +1,101 @@
+# --------------------------------
+# File      : test_filetable.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the streaming CurseForge files table parser
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from filetable import FileRow, parse_file_page, parse_file_table, row_as_dict
+
+FIXTURES_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'fixtures')
+
+PAGE = """<html><body>
+<table class="listing"><thead><tr><th>Type</th><th>Name</th><th>Size</th><th>Uploaded</th><th>Game Version</th><th>Downloads</th><th>Actions</th></tr></thead>
+<tbody>
+<tr><td>R</td><td><a data-action="file-link" data-id="3990000" href="/minecraft/mc-mods/sodium/files/3990000">sodium-fabric-0.6.5+1.19.2.jar</a></td>
+<td>4.23 MB</td><td>Sep 1, 2022</td><td>1.19.2
++2</td><td>3,094,400</td><td>Download</td></tr>
+<tr><td>B</td><td><a data-action="file-link" href="/minecraft/mc-mods/sodium/files/3963227/">Sodium &amp; friends 0.6.4</a></td>
+<td>8.55 MB</td><td>Aug 27, 2022</td><td>1.19.2</td><td>287,332</td><td>Download</td></tr>
+</tbody></table>
+<table><tr><td>footer</td><td>not a file</td></tr></table>
+</body></html>"""
+
+
+def test_rows_come_out_typed_with_their_file_ids():
+    rows = parse_file_table(PAGE)
+    assert rows == [
+        FileRow('R', 'sodium-fabric-0.6.5+1.19.2.jar', '4.23 MB', 'Sep 1, 2022', '1.19.2', '3,094,400', 'Download', '3990000'),
+        FileRow('B', 'Sodium & friends 0.6.4', '8.55 MB', 'Aug 27, 2022', '1.19.2', '287,332', 'Download', '3963227'),
+    ]
+    assert row_as_dict(rows[0])['Game Version'] == '1.19.2'
+    assert row_as_dict(rows[0])['File ID'] == '3990000'
+
+
+def test_chunk_boundaries_and_multibyte_characters_dont_matter():
+    page = PAGE.replace('friends', 'frïends').encode('utf-8')
+    expected = parse_file_table(page)
+    assert expected[1].name == 'Sodium & frïends 0.6.4'
+    assert parse_file_table(page, chunk_size=7) == expected
+    assert parse_file_table(page[i:i + 5] for i in range(0, len(page), 5)) == expected
+
+
+def test_fixture_pages_parse():
+    with open(os.path.join(FIXTURES_FOLDER, 'curseforge_files_sodium.html'), 'rb') as file:
+        rows, filters = parse_file_page(file.read())
+    assert rows and all(row.file_id.isdigit() for row in rows)
+    assert rows[0].name == 'sodium-fabric-0.6.5+1.19.2.jar'
+    assert filters['1.19.2'] == '2020709689:8875'
+
+
+FILTERED_EMPTY = """<html><body>
+<select id="filter-game-version"><option value="">All</option><option value="1738749986:4">Fabric</option>
+<option value="2020709689:8875">1.19.2</option></select>
+<table class="listing"><thead><tr><th>Type</th><th>Name</th></tr></thead><tbody></tbody></table>
+<table><tr><td>footer</td><td>not a file</td></tr></table>
+</body></html>"""
+
+
+def test_filters_are_learned_and_an_empty_filtered_listing_has_no_rows():
+    rows, filters = parse_file_page(FILTERED_EMPTY)
+    assert rows == []
+    assert filters == {'fabric': '1738749986:4', '1.19.2': '2020709689:8875'}
+
+
+def test_files_links_use_the_learned_version_filter_over_the_loader(home):
+    from mvm import ModVersionMaintainer
+    mvm = ModVersionMaintainer(offline=True, prefetch=False)
+    base = 'https://www.curseforge.com/minecraft/mc-mods/sodium/files'
+    assert mvm.build_files_link('sodium', 'fabric', '1.19.2') == f"{base}/all?filter-game-version=1738749986:4"
+
+    mvm.file_store.learn_filters({'1.19.2': '2020709689:8875'})
+    assert mvm.build_files_link('sodium', 'fabric', '1.19.2', page=2) == f"{base}/all?filter-game-version=2020709689:8875&page=2"
+    assert mvm.build_files_link('sodium') == base
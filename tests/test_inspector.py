@@ -0,0 +1,70 @@
+# --------------------------------
+# File      : test_inspector.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for reading loader, mod id, version and game versions from jar metadata
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import zipfile
+
+from conftest import make_jar
+from inspector import JarMetadata, inspect_jar, inspect_jars
+
+
+def test_fabric_mod_json(tmp_path):
+    path = make_jar(str(tmp_path), 'sodium.jar', 'sodium', '0.4.4', '~1.19.2')
+    assert inspect_jar(path) == JarMetadata('sodium', None, '0.4.4', 'fabric', '~1.19.2')
+
+
+def test_fabric_lists_of_game_versions_become_alternatives(tmp_path):
+    path = str(tmp_path / 'lithium.jar')
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('fabric.mod.json', json.dumps({'id': 'lithium', 'version': '0.8.3', 'depends': {'minecraft': ['1.19.1', '1.19.2']}}))
+    assert inspect_jar(path).game_versions == '1.19.1 || 1.19.2'
+
+
+def test_mods_toml_takes_its_version_from_the_manifest(tmp_path):
+    path = make_jar(str(tmp_path), 'jei.jar', 'jei', '11.2.0.256', '[1.19.2,1.20)', loader='forge')
+    assert inspect_jar(path) == JarMetadata('jei', None, '11.2.0.256', 'forge', '[1.19.2,1.20)')
+
+
+def test_mcmod_info(tmp_path):
+    path = str(tmp_path / 'old.jar')
+    with zipfile.ZipFile(path, 'w') as jar:
+        jar.writestr('mcmod.info', json.dumps({'modListVersion': 2, 'modList': [{'modid': 'old', 'name': 'Old', 'version': '1.0', 'mcversion': '1.12.2'}]}))
+    assert inspect_jar(path) == JarMetadata('old', 'Old', '1.0', 'forge', '1.12.2')
+
+
+def test_broken_or_bare_jars_have_no_metadata(tmp_path):
+    (tmp_path / 'broken.jar').write_bytes(b'not a zip')
+    with zipfile.ZipFile(tmp_path / 'bare.jar', 'w') as jar:
+        jar.writestr('Thing.class', b'')
+    paths = [str(tmp_path / 'broken.jar'), str(tmp_path / 'bare.jar')]
+    assert inspect_jars(paths) == {path: None for path in paths}
@@ -0,0 +1,125 @@
+# --------------------------------
+# File      : test_instrument.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the tracer: spans, counters, summaries, saved traces and
+#             turning tracing and profiling on from the environment
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import json
+import pstats
+
+from instrument import TRACER, Tracer, from_environment, profiled
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer()
+    with tracer.span('scan', folder='mods') as args:
+        args['jars'] = 3
+    tracer.count('requests')
+    assert tracer.events == [] and tracer.counters == {}
+
+
+def test_spans_keep_their_arguments():
+    tracer = Tracer()
+    tracer.enable()
+    with tracer.span('scan', folder='mods') as args:
+        args['jars'] = 3
+    [event] = tracer.events
+    assert event['name'] == 'scan' and event['cat'] == 'stage'
+    assert event['args'] == {'folder': 'mods', 'jars': 3}
+    assert event['dur'] >= 0
+
+
+def test_summary_totals_spans_and_counters():
+    tracer = Tracer()
+    tracer.enable()
+    start = 100.0
+    tracer.add_span('fetch', 'request', start, start + 0.010)
+    tracer.add_span('fetch', 'request', start, start + 0.030)
+    tracer.count('cache_hits')
+    tracer.count('cache_hits', 2)
+
+    summary = tracer.summary()
+    fetch = summary['stages']['fetch']
+    assert fetch['category'] == 'request' and fetch['count'] == 2
+    assert round(fetch['total_ms']) == 40 and round(fetch['max_ms']) == 30
+    assert summary['counters'] == {'cache_hits': 3}
+
+
+def test_enable_starts_from_scratch():
+    tracer = Tracer()
+    tracer.enable()
+    tracer.count('requests')
+    tracer.enable()
+    assert tracer.counters == {}
+
+
+def test_saved_traces(tmp_path):
+    tracer = Tracer()
+    tracer.enable()
+    with tracer.span('scan'):
+        pass
+    tracer.count('requests', 4)
+
+    tracer.save(str(tmp_path / 'trace.json'))
+    with open(tmp_path / 'trace.json', 'r') as file:
+        events = json.load(file)['traceEvents']
+    assert [(event['name'], event['ph']) for event in events] == [('scan', 'X'), ('requests', 'C')]
+    assert events[1]['args'] == {'value': 4}
+
+    tracer.save(str(tmp_path / 'summary.json'), format='json')
+    with open(tmp_path / 'summary.json', 'r') as file:
+        summary = json.load(file)
+    assert summary['stages']['scan']['count'] == 1
+    assert summary['counters'] == {'requests': 4}
+    assert [span['name'] for span in summary['spans']] == ['scan']
+
+
+def test_profiled(tmp_path):
+    with profiled() as profiler:
+        assert profiler is None
+
+    path = str(tmp_path / 'run.prof')
+    with profiled(path):
+        sorted(range(1000))
+    assert pstats.Stats(path).total_calls > 0
+
+
+def test_from_environment(monkeypatch):
+    monkeypatch.setenv('MVM_TRACE', 'trace.json')
+    monkeypatch.setenv('MVM_TRACE_FORMAT', 'json')
+    monkeypatch.delenv('MVM_PROFILE', raising=False)
+    try:
+        assert from_environment() == ('trace.json', 'json', None)
+        assert TRACER.enabled
+    finally:
+        TRACER.disable()
+        TRACER.reset()
@@ -0,0 +1,128 @@
+# --------------------------------
+# File      : test_jarstore.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the shared jar store: linking, deduplication, garbage collection
+#             and installs taken from it
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import os
+
+from conftest import make_jar
+from jarstore import JarStore, link_or_copy
+from mvm import ModVersionMaintainer
+from scanindex import ScanIndex
+from update import Updater
+
+
+def scanned(store, folder):
+    entries, _ = ScanIndex(str(folder.parent / 'scan_index.json'), hash_jars=True, known_sha1=store.known_sha1).scan(str(folder))
+    store.record_folder(str(folder), entries)
+    return entries
+
+
+def two_packs(tmp_path):
+    pack_a, pack_b = tmp_path / 'a', tmp_path / 'b'
+    for folder in (pack_a, pack_b):
+        folder.mkdir()
+        make_jar(str(folder), 'sodium-0.6.5.jar', 'sodium', '0.6.5')
+    make_jar(str(pack_a), 'jei-11.2.0.jar', 'jei', '11.2.0')
+    return pack_a, pack_b
+
+
+def test_link_or_copy_prefers_a_hardlink(tmp_path):
+    source = make_jar(str(tmp_path), 'a.jar', 'a', '1.0')
+    assert link_or_copy(source, str(tmp_path / 'b.jar')) == 'hardlink'
+    assert os.path.samefile(source, tmp_path / 'b.jar')
+
+
+def test_identical_jars_are_stored_once_and_deduped(tmp_path):
+    store = JarStore(str(tmp_path / 'store'))
+    pack_a, pack_b = two_packs(tmp_path)
+    scanned(store, pack_a)
+    entries = scanned(store, pack_b)
+
+    stats = store.stats()
+    assert (stats['jars'], stats['folders'], stats['jars_in_folders']) == (2, 2, 3)
+    assert store.usage() == {'jei': {'11.2.0': [str(pack_a)]}, 'sodium': {'0.6.5': [str(pack_a), str(pack_b)]}}
+
+    # a's jars went into the store as links; b's copy of sodium gets swapped for one
+    swapped, freed = store.dedupe(str(pack_b))
+    assert swapped == 1 and freed == os.path.getsize(pack_b / 'sodium-0.6.5.jar')
+    assert os.path.samefile(pack_a / 'sodium-0.6.5.jar', pack_b / 'sodium-0.6.5.jar')
+    assert store.known_sha1(os.stat(pack_b / 'sodium-0.6.5.jar')) == entries['sodium-0.6.5.jar'].sha1
+
+
+def test_gc_only_removes_jars_nobody_uses(tmp_path):
+    store = JarStore(str(tmp_path / 'store'))
+    pack_a, pack_b = two_packs(tmp_path)
+    scanned(store, pack_a)
+    scanned(store, pack_b)
+    store.save()
+
+    # Everything is in use
+    assert store.gc() == 0
+    # jei's only pack is gone, sodium is still used by b
+    for name in os.listdir(pack_a):
+        os.remove(pack_a / name)
+    os.rmdir(pack_a)
+    assert store.gc() == 1
+    assert store.stats()['jars'] == 1
+
+    # Saved and loaded again, the store agrees
+    store.save()
+    assert list(JarStore(str(tmp_path / 'store')).usage()) == ['sodium']
+
+
+def test_install_takes_a_jar_another_pack_already_has(home, tmp_path, standin, backend):
+    # Pack a already has the newest sodium, named like CurseForge lists it; pack b is behind
+    pack_a, pack_b = tmp_path / 'a', tmp_path / 'b'
+    pack_a.mkdir(), pack_b.mkdir()
+    make_jar(str(pack_a), 'sodium-fabric-0.6.5+1.19.2.jar', 'sodium', '0.6.5', '1.19.2')
+    make_jar(str(pack_b), 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+
+    mvm_a = ModVersionMaintainer(backend=backend, prefetch=False, jar_store=True)
+    mvm_a.mods_folder = str(pack_a)
+    mvm_a.process_mods(mod_type='fabric', mc_version='1.19.2', interactive=False)
+
+    mvm_b = ModVersionMaintainer(backend=backend, prefetch=False, jar_store=mvm_a.jar_store)
+    mvm_b.mods_folder = str(pack_b)
+    mvm_b.process_mods(mod_type='fabric', mc_version='1.19.2', interactive=False)
+    mvm_b.process_links(mvm_b.mod_type, mvm_b.mc_version)
+
+    updater = Updater(mvm_b, backend=backend)
+    candidates = updater.plan()
+    requests = standin.stats['requests']
+    [result] = updater.install(candidates)
+
+    assert result.status == 'installed' and result.jar == 'sodium-fabric-0.6.5+1.19.2.jar'
+    assert standin.stats['requests'] == requests
+    assert os.path.samefile(pack_a / result.jar, pack_b / result.jar)
+    # And from now on by its file id too
+    assert mvm_a.jar_store.sha1_for_file(candidates[0].file.file_id) == result.sha1
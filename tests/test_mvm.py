@@ -0,0 +1,79 @@
+# --------------------------------
+# File      : test_mvm.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for loading the known aliases and outliers: lazily, prefetched in
+#             the background, and from the bundled copies when GitHub can't be reached
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import json
+import os
+
+from mvm import ModVersionMaintainer
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def bundled(name) -> dict:
+    with open(os.path.join(REPO_FOLDER, name), 'r') as file:
+        return json.load(file)
+
+
+def test_nothing_is_fetched_until_needed(home, standin, backend):
+    mvm = ModVersionMaintainer(backend=backend, prefetch=False)
+    assert standin.stats['requests'] == 0
+
+    assert mvm.known_aliases == bundled('known_aliases.json')
+    assert standin.stats['requests'] == 1
+    mvm.known_aliases
+    assert standin.stats['requests'] == 1
+
+    assert mvm.known_outliers == bundled('known_outliers.json')
+    assert standin.stats['requests'] == 2
+
+
+def test_prefetch_loads_both_in_the_background(home, standin, backend):
+    mvm = ModVersionMaintainer(backend=backend)
+    # Waiting on one doesn't hold up the other, and neither is fetched twice
+    mvm.known_aliases, mvm.known_outliers
+    mvm.known_aliases, mvm.known_outliers
+    assert standin.stats['requests'] == 2
+
+
+def test_bundled_copies_when_offline_with_nothing_cached(home):
+    mvm = ModVersionMaintainer(offline=True, prefetch=False)
+    assert mvm.known_aliases == bundled('known_aliases.json')
+    assert mvm.known_outliers == bundled('known_outliers.json')
+
+
+def test_edits_stick_to_the_loaded_table(home):
+    mvm = ModVersionMaintainer(offline=True, prefetch=False)
+    mvm.known_aliases.update({'somemod': 'some-mod'})
+    assert mvm.known_aliases['somemod'] == 'some-mod'
@@ -0,0 +1,86 @@
+# --------------------------------
+# File      : test_scanindex.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the incremental scan index: diffs between scans, hashing and forgetting folders
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import os
+
+from conftest import make_jar
+from scanindex import ScanIndex, sha1_file
+
+
+def test_rescans_report_what_changed(tmp_path):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    make_jar(str(folder), 'sodium.jar', 'sodium', '0.4.4')
+    make_jar(str(folder), 'jei.jar', 'jei', '11.2.0')
+    index = ScanIndex(str(tmp_path / 'scan_index.json'))
+
+    entries, diff = index.scan(str(folder))
+    assert (diff.added, diff.changed, diff.removed, diff.unchanged) == (['jei.jar', 'sodium.jar'], [], [], [])
+    assert entries['sodium.jar'].metadata.mod_id == 'sodium'
+
+    os.remove(folder / 'jei.jar')
+    make_jar(str(folder), 'sodium.jar', 'sodium', '0.4.5', filler=b'newer' * 100)
+    make_jar(str(folder), 'lithium.jar', 'lithium', '0.8.3')
+    entries, diff = index.scan(str(folder))
+    assert (diff.added, diff.changed, diff.removed, diff.unchanged) == (['lithium.jar'], ['sodium.jar'], ['jei.jar'], [])
+    assert entries['sodium.jar'].metadata.version == '0.4.5'
+
+    _, diff = index.scan(str(folder))
+    assert (diff.added, diff.changed, diff.removed, diff.unchanged) == ([], [], [], ['lithium.jar', 'sodium.jar'])
+
+
+def test_turning_hashing_on_hashes_without_reporting_changes(tmp_path):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    path = make_jar(str(folder), 'sodium.jar', 'sodium', '0.4.4')
+    ScanIndex(str(tmp_path / 'scan_index.json')).scan(str(folder))
+
+    entries, diff = ScanIndex(str(tmp_path / 'scan_index.json'), hash_jars=True, fingerprint=True).scan(str(folder))
+    assert diff.unchanged == ['sodium.jar']
+    assert entries['sodium.jar'].sha1 == sha1_file(path)
+    assert entries['sodium.jar'].fingerprint is not None
+
+
+def test_forget_leaves_other_folders_and_no_temp_files(tmp_path):
+    index = ScanIndex(str(tmp_path / 'scan_index.json'))
+    for name in ('a', 'b'):
+        (tmp_path / name).mkdir()
+        make_jar(str(tmp_path / name), f"{name}.jar", name, '1.0')
+        index.scan(str(tmp_path / name))
+
+    index.forget(str(tmp_path / 'a'))
+    with open(tmp_path / 'scan_index.json', 'r') as file:
+        assert list(json.load(file)) == [str(tmp_path / 'b')]
+    assert index.entries(str(tmp_path / 'a')) == {}
+    assert sorted(os.listdir(tmp_path)) == ['a', 'b', 'scan_index.json']
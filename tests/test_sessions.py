@@ -0,0 +1,99 @@
+# --------------------------------
+# File      : test_sessions.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for pooled scraper sessions and their persisted Cloudflare clearance
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import json
+import time
+
+import requests
+
+from backends import ScraperBackend, UrllibBackend, request_headers
+from cache import CachedResponse
+from crawler import Crawler
+
+URL = 'https://www.curseforge.com/minecraft/mc-mods/sodium/files'
+
+
+class RecordingSession:
+    # Looks enough like a cloudscraper session: its own headers and cookie jar. Remembers the headers each request went out with.
+    def __init__(self, user_agent) -> None:
+        self.headers = {'User-Agent': user_agent}
+        self.cookies = requests.cookies.RequestsCookieJar()
+        self.sent = []
+
+    def get(self, url, headers = None, stream = False):
+        self.sent.append({**self.headers, **(headers or {})})
+        return CachedResponse(url, 200, b'<html></html>')
+
+    def close(self) -> None:
+        pass
+
+
+class RecordingBackend(ScraperBackend):
+    def __init__(self, cookie_path) -> None:
+        self.made = []
+        super().__init__(cookie_path=cookie_path)
+
+    def session(self):
+        self.made.append(RecordingSession('Fresh/1.0'))
+        return self.made[-1]
+
+
+def test_plain_urllib_requests_still_get_a_user_agent():
+    assert request_headers(UrllibBackend(), {'Range': 'bytes=10-'}) == {'Range': 'bytes=10-', 'User-Agent': 'Mozilla/5.0'}
+    assert request_headers(RecordingSession('Solver/2.0')) == {}
+
+
+def test_restored_clearance_is_sent_with_the_user_agent_it_was_issued_to(tmp_path):
+    cookie_path = tmp_path / 'cookies.json'
+    with open(cookie_path, 'w') as file:
+        json.dump([['cf_clearance', 'token', '.curseforge.com', '/', time.time() + 3600, 'Solver/2.0']], file)
+
+    backend = RecordingBackend(str(cookie_path))
+    [result] = Crawler(workers=1, rate=100, retries=0, backend=backend).crawl({'sodium': URL})
+
+    assert result.response.status_code == 200
+    assert [sent['User-Agent'] for sent in backend.made[0].sent] == ['Solver/2.0']
+
+
+def test_saved_user_agent_is_the_one_that_was_sent(tmp_path):
+    cookie_path = tmp_path / 'cookies.json'
+    backend = RecordingBackend(str(cookie_path))
+    session = backend.acquire()
+    session.get(URL, headers=request_headers(session))
+    session.cookies.set('cf_clearance', 'earned', domain='.curseforge.com', path='/', expires=int(time.time()) + 3600)
+    backend.release(session, 200)
+
+    with open(cookie_path, 'r') as file:
+        [cookie] = json.load(file)
+    assert cookie[1] == 'earned'
+    assert cookie[5] == session.sent[0]['User-Agent'] == 'Fresh/1.0'
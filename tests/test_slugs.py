@@ -0,0 +1,93 @@
+# --------------------------------
+# File      : test_slugs.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the slug table: confirmed and missing slugs, expiry
+#             and saves from separate instances
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import time
+
+from slugs import SlugTable
+
+
+def test_confirmed_and_missing_slugs(tmp_path):
+    table = SlugTable(str(tmp_path / 'slugs.json'))
+    table.record('sodium', 'sodium', True)
+    table.record('jei', 'jei', False)
+
+    assert table.confirmed('sodium') == 'sodium'
+    assert table.confirmed('jei') is None
+    assert table.is_missing('jei', 'jei')
+    # A different guess for the same name is still worth a request
+    assert not table.is_missing('jei', 'jei-forge')
+    assert table.lookup('unknown') is None
+
+
+def test_entries_expire(tmp_path):
+    table = SlugTable(str(tmp_path / 'slugs.json'), confirmed_ttl=-1, missing_ttl=-1)
+    table.record('sodium', 'sodium', True)
+    table.record('jei', 'jei', False)
+    assert table.confirmed('sodium') is None
+    assert not table.is_missing('jei', 'jei')
+
+
+def test_saved_entries_load_back(tmp_path):
+    path = str(tmp_path / 'cache' / 'slugs.json')
+    table = SlugTable(path)
+    table.record('sodium', 'sodium', True)
+    table.save()
+    assert SlugTable(path).confirmed('sodium') == 'sodium'
+
+
+def test_saves_from_separate_instances_merge(tmp_path):
+    path = str(tmp_path / 'slugs.json')
+    first, second = SlugTable(path), SlugTable(path)
+    first.record('sodium', 'sodium', True)
+    second.record('jei', 'jei', False)
+    first.save()
+    second.save()
+
+    table = SlugTable(path)
+    assert table.confirmed('sodium') == 'sodium'
+    assert table.is_missing('jei', 'jei')
+
+
+def test_expired_entries_are_dropped_on_save(tmp_path):
+    path = str(tmp_path / 'slugs.json')
+    stale = SlugTable(path, missing_ttl=0.01)
+    stale.record('jei', 'jei', False)
+    stale.save()
+    time.sleep(0.05)
+
+    fresh = SlugTable(path)
+    fresh.record('sodium', 'sodium', True)
+    fresh.save()
+    assert 'jei' not in SlugTable(path)._load()
@@ -0,0 +1,127 @@
+# --------------------------------
+# File      : test_standin.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the stand-in server: filtered and paginated file pages,
+#             ETag revalidation, resumable downloads and injected failures
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+
+import io
+import json
+import os
+import re
+import zipfile
+
+from filetable import FILES_PER_PAGE, LOADER_FILTERS, parse_file_page, parse_file_table
+from standin import FIXTURES_FOLDER, StandinBackend, StandinServer
+
+FILES_URL = 'https://www.curseforge.com/minecraft/mc-mods/sodium/files/all'
+
+
+def test_unfiltered_page_is_the_fixture(backend):
+    response = backend.get(FILES_URL)
+    assert response.status_code == 200
+    with open(os.path.join(FIXTURES_FOLDER, 'curseforge_files_sodium.html'), 'rb') as file:
+        assert response.content == file.read()
+
+
+def listed_under(game_version) -> list:
+    # File ids the sodium fixture has for a game version: the one a row shows, or one in its "+N" badge's title
+    with open(os.path.join(FIXTURES_FOLDER, 'curseforge_files_sodium.html'), 'r') as file:
+        rows = re.findall(r'<tr>\s*<td>.*?</tr>', file.read(), re.S)
+    file_ids = []
+    for row in rows:
+        extra = re.search(r'class="extra-versions" title="([^"]*)"', row)
+        if f">{game_version}</span>" in row or (extra and game_version in extra.group(1).split(', ')):
+            file_ids.append(re.search(r'data-id="(\d+)"', row).group(1))
+    return file_ids
+
+
+def test_game_version_filter_and_pages(backend):
+    rows, filters = parse_file_page(backend.get(FILES_URL).content)
+    value = filters['1.19.2']
+    first = parse_file_table(backend.get(f"{FILES_URL}?filter-game-version={value}").content)
+    assert first and len(first) <= FILES_PER_PAGE
+    # Files whose first version is another one are on it too, if 1.19.2 is behind their "+N" badge
+    assert {row.game_version for row in first} > {'1.19.2'}
+
+    expected = listed_under('1.19.2')
+    pages, page = [], 1
+    while True:
+        found = parse_file_table(backend.get(f"{FILES_URL}?filter-game-version={value}&page={page}").content)
+        pages += found
+        if len(found) < FILES_PER_PAGE:
+            break
+        page += 1
+    assert [row.file_id for row in pages] == expected
+    assert parse_file_table(backend.get(f"{FILES_URL}?filter-game-version={value}&page={page + 1}").content) == []
+
+
+def test_loader_filter_drops_the_other_loaders_files(backend):
+    rows = parse_file_table(backend.get(f"{FILES_URL}?filter-game-version={LOADER_FILTERS['fabric']}").content)
+    assert rows and not any('forge' in row.name.lower() for row in rows)
+
+
+def test_unknown_mods_and_versions(backend):
+    assert backend.get('https://www.curseforge.com/minecraft/mc-mods/no-such-mod/files/all').status_code == 404
+    assert parse_file_table(backend.get(f"{FILES_URL}?filter-game-version=2020709689:1").content) == []
+
+
+def test_etag_revalidation(standin, backend):
+    response = backend.get(FILES_URL)
+    etag = response.headers['ETag']
+    assert backend.get(FILES_URL, headers={'If-None-Match': etag}).status_code == 304
+    assert standin.stats[304] == 1
+
+
+def test_downloads_are_jars_and_resume(backend):
+    url = 'https://www.curseforge.com/minecraft/mc-mods/sodium/download/4012345/file'
+    response = backend.get(url)
+    assert response.headers['Content-Disposition'] == 'attachment; filename="sodium-4012345.jar"'
+    with zipfile.ZipFile(io.BytesIO(response.content)) as jar:
+        assert json.loads(jar.read('fabric.mod.json'))['id'] == 'sodium'
+
+    part = backend.get(url, headers={'Range': 'bytes=1000-'})
+    assert part.status_code == 206
+    assert part.headers['Content-Range'] == f"bytes 1000-{len(response.content) - 1}/{len(response.content)}"
+    assert response.content[:1000] + part.content == response.content
+
+
+def test_injected_failures_only_hit_curseforge():
+    with StandinServer(port=0, rate_503=1.0) as server:
+        backend = StandinBackend(server.address)
+        assert backend.get(FILES_URL).status_code == 503
+        assert backend.get('https://raw.githubusercontent.com/x/y/main/known_aliases.json').status_code == 200
+
+
+def test_default_page_stands_in_for_unknown_mods():
+    with StandinServer(port=0, default_page='sodium') as server:
+        backend = StandinBackend(server.address)
+        assert backend.get('https://www.curseforge.com/minecraft/mc-mods/anything/files').status_code == 200
@@ -0,0 +1,196 @@
+# --------------------------------
+# File      : test_update.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for the updater: planning, resumable downloads, installs and rollback
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import hashlib
+import json
+import os
+
+from conftest import make_jar
+from filestore import FileStore
+from filetable import FileRow
+from inspector import JarMetadata
+from mvm import ModVersionMaintainer
+from update import Updater
+
+
+def row(file_id, name, uploaded, type = 'R'):
+    return FileRow(type, name, '1.00 MB', uploaded, '1.19.2', '1,000', 'Download', str(file_id))
+
+
+def offline_mod(folder, jar_file, rows, metadata = None) -> ModVersionMaintainer:
+    # A maintainer that already "scanned" one sodium jar and "crawled" its files, without any requests
+    mvm = ModVersionMaintainer(offline=True, prefetch=False)
+    mvm.mods_folder = str(folder)
+    mvm.mod_type, mvm.mc_version = 'Fabric', '1.19.2'
+    mvm.mods_dict = {'sodium': jar_file}
+    mvm._mods_metadata = {'sodium': metadata} if metadata else {}
+    mvm.file_store = FileStore()
+    mvm.file_store.extend('sodium', rows)
+    mvm.mod_files = {'sodium': mvm.file_store.files('sodium')}
+    return mvm
+
+
+def crawled_mod(folder, backend) -> ModVersionMaintainer:
+    mvm = ModVersionMaintainer(backend=backend, prefetch=False)
+    mvm.mods_folder = str(folder)
+    mvm.process_mods(mod_type='fabric', mc_version='1.19.2', interactive=False)
+    mvm.process_links(mvm.mod_type, mvm.mc_version)
+    return mvm
+
+
+def test_newer_release_is_planned(home, tmp_path):
+    rows = [row(30, 'sodium-fabric-0.6.5+1.19.2.jar', 'Sep 1, 2022'), row(28, 'sodium-fabric-0.6.3+1.19.2.jar', 'Aug 16, 2022')]
+    candidates = Updater(offline_mod(tmp_path, 'sodium-fabric-0.6.3+1.19.2.jar', rows)).plan()
+    assert [candidate.file.file_id for candidate in candidates] == [30]
+
+
+def test_installed_beta_is_never_downgraded_to_an_older_release(home, tmp_path):
+    rows = [row(29, 'sodium-fabric-0.6.4+1.19.2.jar', 'Aug 27, 2022', 'B'), row(28, 'sodium-fabric-0.6.3+1.19.2.jar', 'Aug 16, 2022')]
+    assert Updater(offline_mod(tmp_path, 'sodium-fabric-0.6.4+1.19.2.jar', rows)).plan() == []
+
+
+def test_display_names_are_matched_by_the_jars_version(home, tmp_path):
+    # CurseForge lists "Sodium 0.6.5", the jar is called something else entirely
+    rows = [row(30, 'Sodium 0.6.5', 'Sep 1, 2022'), row(28, 'Sodium 0.6.3', 'Aug 16, 2022')]
+    metadata = JarMetadata('sodium', 'Sodium', '0.6.5', 'fabric', '~1.19.2')
+    assert Updater(offline_mod(tmp_path, 'sodium-fabric-mc0.6.5.jar', rows, metadata)).plan() == []
+
+
+def test_install_keeps_the_real_file_name_and_is_not_planned_again(home, tmp_path, backend):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    make_jar(str(folder), 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+
+    mvm = crawled_mod(folder, backend)
+    updater = Updater(mvm, backend=backend)
+    candidates = updater.plan()
+    assert [candidate.file.file_id for candidate in candidates] == [3990000]
+
+    [result] = updater.install(candidates)
+    assert result.status == 'installed'
+    # The stand-in names the download sodium-<file id>.jar, unlike the listing's sodium-fabric-0.6.5+1.19.2.jar
+    assert result.jar == 'sodium-3990000.jar'
+    assert sorted(name for name in os.listdir(folder) if name.endswith('.jar')) == ['sodium-3990000.jar']
+
+    mvm.process_mods(mod_type='fabric', mc_version='1.19.2', interactive=False)
+    assert Updater(mvm, backend=backend).plan() == []
+
+    updater.rollback()
+    assert sorted(name for name in os.listdir(folder) if name.endswith('.jar')) == ['sodium-mc-0.6.1+1.19.2.jar']
+    assert updater.snapshots() == []
+
+
+def test_download_resumes_a_partial_file(home, tmp_path, standin, backend):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    make_jar(str(folder), 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+    mvm = crawled_mod(folder, backend)
+    updater = Updater(mvm, backend=backend)
+    [candidate] = updater.plan()
+
+    full = backend.get(candidate.url).content
+    os.makedirs(folder / '.mvm_downloads')
+    with open(folder / '.mvm_downloads' / f"{candidate.file.file_id}.part", 'wb') as file:
+        file.write(full[:len(full) // 3])
+
+    part_path, sha1, file_name = updater.download(candidate, {'sha1': hashlib.sha1(full).hexdigest()})
+    with open(part_path, 'rb') as file:
+        assert file.read() == full
+    assert file_name == 'sodium-3990000.jar'
+    assert standin.stats[206] == 1
+
+
+def test_installs_within_one_second_get_their_own_snapshot(home, tmp_path):
+    updater = Updater(offline_mod(tmp_path, 'sodium.jar', []))
+    first, second = updater._new_snapshot_folder(), updater._new_snapshot_folder()
+    assert first != second
+    assert updater.snapshots() == [first, second]
+
+
+def test_a_bad_download_leaves_the_folder_alone(home, tmp_path, backend):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    make_jar(str(folder), 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+    mvm = crawled_mod(folder, backend)
+    updater = Updater(mvm, backend=backend, retries=0)
+    [candidate] = updater.plan()
+
+    [result] = updater.install([candidate], {'sodium': {'sha1': '0' * 40}})
+    assert result.status == 'failed' and 'sha1 mismatch' in str(result.error)
+    assert sorted(name for name in os.listdir(folder) if name.endswith('.jar')) == ['sodium-mc-0.6.1+1.19.2.jar']
+    assert os.listdir(folder / '.mvm_downloads') == []
+    assert updater.snapshots() == []
+
+    # Nothing to roll back is not an error either
+    updater.rollback()
+    assert sorted(name for name in os.listdir(folder) if name.endswith('.jar')) == ['sodium-mc-0.6.1+1.19.2.jar']
+
+
+def test_rollback_puts_back_the_installed_file_ids(home, tmp_path, backend):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    make_jar(str(folder), 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+    before = {'sodium-mc-0.6.1+1.19.2.jar': 3961559, 'lithium.jar': 3900001}
+    (folder / '.mvm_installed.json').write_text(json.dumps(before))
+
+    mvm = crawled_mod(folder, backend)
+    updater = Updater(mvm, backend=backend)
+    updater.install(updater.plan())
+    assert json.loads((folder / '.mvm_installed.json').read_text()) == {'sodium-3990000.jar': 3990000, 'lithium.jar': 3900001}
+
+    updater.rollback()
+    assert json.loads((folder / '.mvm_installed.json').read_text()) == before
+    # The restored jar is known by its file id again
+    assert Updater(mvm, backend=backend).installed_file('sodium', 'sodium', 'sodium-mc-0.6.1+1.19.2.jar').file_id == 3961559
+
+
+def test_a_jar_the_new_one_would_overwrite_is_snapshotted_too(home, tmp_path, backend):
+    folder = tmp_path / 'mods'
+    folder.mkdir()
+    make_jar(str(folder), 'sodium-mc-0.6.1+1.19.2.jar', 'sodium', '0.6.1', '1.19.2')
+    mvm = crawled_mod(folder, backend)
+    # Something else already goes by the name the download will get
+    make_jar(str(folder), 'sodium-3990000.jar', 'other', '1.0', '1.19.2')
+    with open(folder / 'sodium-3990000.jar', 'rb') as file:
+        other = file.read()
+
+    updater = Updater(mvm, backend=backend)
+    [result] = updater.install(updater.plan())
+    assert result.jar == 'sodium-3990000.jar'
+    [snapshot] = updater.snapshots()
+    assert sorted(os.listdir(snapshot)) == ['snapshot.json', 'sodium-3990000.jar', 'sodium-mc-0.6.1+1.19.2.jar']
+
+    updater.rollback()
+    assert sorted(name for name in os.listdir(folder) if name.endswith('.jar')) == ['sodium-3990000.jar', 'sodium-mc-0.6.1+1.19.2.jar']
+    with open(folder / 'sodium-3990000.jar', 'rb') as file:
+        assert file.read() == other
@@ -0,0 +1,145 @@
+# --------------------------------
+# File      : test_versions.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Tests for Minecraft version detection and version range parsing
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+import pytest
+
+from versions import VersionIndex, in_range, parse_range
+
+RELEASES = VersionIndex(['1.21', '1.20.1', '1.20', '1.19.4', '1.19.3', '1.19.2', '1.19.1', '1.19', '1.18.2', '1.18', '1.16.5'])
+
+
+@pytest.mark.parametrize('constraint, expected', [
+    ('[1.19,1.20)', ['1.19.4', '1.19.3', '1.19.2', '1.19.1', '1.19']),
+    ('[1.20,1.21)', ['1.20.1', '1.20']),
+    ('(1.19,1.19.3)', ['1.19.2', '1.19.1']),
+    ('[1.19.2]', ['1.19.2']),
+    ('[1.20.1,)', ['1.21', '1.20.1']),
+    ('[1.18,1.18.2],[1.21,)', ['1.21', '1.18.2', '1.18']),
+    ('(,1.18]', ['1.18', '1.16.5']),
+])
+def test_forge_intervals(constraint, expected):
+    assert RELEASES.allowed(constraint) == expected
+
+
+@pytest.mark.parametrize('constraint, expected', [
+    ('>=1.20.1', ['1.21', '1.20.1']),
+    ('>= 1.20.1', ['1.21', '1.20.1']),
+    ('~1.19.2', ['1.19.4', '1.19.3', '1.19.2']),
+    ('~1.20', ['1.20.1', '1.20']),
+    ('^1.20', ['1.21', '1.20.1', '1.20']),
+    ('1.20.x', ['1.20.1', '1.20']),
+    ('1.19.2', ['1.19.2']),
+    ('>=1.18 <1.19', ['1.18.2', '1.18']),
+    ('1.16.5 || 1.18', ['1.18', '1.16.5']),
+    ('1.18 - 1.18.2', ['1.18.2', '1.18']),
+    ('1.19-alpha.22.10', ['1.19']),
+    ('<1.18', ['1.16.5']),
+    ('not a version', []),
+])
+def test_fabric_comparators(constraint, expected):
+    assert RELEASES.allowed(constraint) == expected
+
+
+def test_upper_bounds_are_respected():
+    forge, fabric = parse_range('[1.19,1.20)'), parse_range('~1.19.2')
+    assert in_range('1.19.4', forge) and not in_range('1.20', forge)
+    assert in_range('1.19.4', fabric) and not in_range('1.20', fabric) and not in_range('1.19.1', fabric)
+
+
+def test_ranges_confirm_file_names_or_pin_a_single_release():
+    assert RELEASES.match_range('[1.19,1.20)', 'jei-1.19.2-forge-11.4.0.jar') == '1.19.2'
+    assert RELEASES.match_range('[1.19.2]') == '1.19.2'
+    assert RELEASES.match_range('1.19.2', 'thing-1.0.jar') == '1.19.2'
+    # A name outside the range is ignored, and a range allowing several releases is no answer by itself
+    assert RELEASES.match_range('[1.19,1.20)', 'jei-1.18.2-forge-10.2.1.jar') is None
+    assert RELEASES.match_range('~1.19') is None
+    assert RELEASES.match_range('>=1.16.5') is None
+    assert RELEASES.match_range('*') is None
+
+
+def test_ranges_no_longer_make_a_folder_look_mixed():
+    jars = ['sodium-fabric-0.4.4+1.19.2.jar', 'jei-forge.jar', 'lithium.jar']
+    report = RELEASES.detect(jars, {'jei-forge.jar': '[1.19,1.20)', 'lithium.jar': '~1.19.2'})
+    assert report.per_mod == {'sodium-fabric-0.4.4+1.19.2.jar': '1.19.2', 'jei-forge.jar': None, 'lithium.jar': None}
+    assert report.version == '1.19.2'
+    assert not report.mixed
+
+
+def test_range_only_jars_outnumbering_named_ones_dont_outvote_them():
+    jars = ['sodium-mc1.19.2-0.4.4.jar', 'lithium-mc1.19.2-0.10.0.jar', 'a.jar', 'b.jar', 'c.jar']
+    report = RELEASES.detect(jars, {'a.jar': '~1.19', 'b.jar': '>=1.19', 'c.jar': '1.19.x'})
+    assert report.version == '1.19.2'
+    assert report.histogram == {'1.19.2': 2}
+    assert not report.mixed
+
+    report = RELEASES.detect(jars, {'a.jar': '>=1.16', 'b.jar': '>=1.16.5', 'c.jar': '>=1.16.5'})
+    assert report.version == '1.19.2'
+    assert not report.mixed
+
+
+def test_range_only_jars_still_break_ties():
+    # Without the ranges the newer 1.19.3 would win the tie
+    jars = ['a-1.19.1.jar', 'b-1.19.3.jar', 'c.jar', 'd.jar']
+    report = RELEASES.detect(jars, {'c.jar': '[1.19,1.19.2)', 'd.jar': '1.19 - 1.19.1'})
+    assert report.version == '1.19.1'
+
+    # And with nothing else to go on they don't make a guess
+    assert RELEASES.detect(['c.jar', 'd.jar'], {'c.jar': '~1.19.2', 'd.jar': '>=1.19'}).version is None
+
+
+def test_file_names_match_the_most_specific_known_release():
+    assert RELEASES.match('sodium-fabric-mc0.4.4+1.19.2.jar') == '1.19.2'
+    assert RELEASES.match('jei-1.19-forge-11.0.0.jar') == '1.19'
+    # 11.19.2 is not 1.19.2, and unknown versions don't count
+    assert RELEASES.match('thing-11.19.2.jar') is None
+    assert RELEASES.match('thing-1.99.jar') is None
+
+
+def test_detect_takes_the_line_most_jars_agree_on():
+    report = RELEASES.detect(['a-1.19.2.jar', 'b-1.19.2.jar', 'c-1.19.jar', 'd-1.18.2.jar', 'e.jar'])
+    assert report.version == '1.19.2'
+    assert report.histogram == {'1.19.2': 2, '1.19': 1, '1.18.2': 1}
+    assert report.per_mod['e.jar'] is None
+    assert report.mixed
+
+
+def test_detect_with_nothing_to_go_on():
+    report = RELEASES.detect(['a.jar', 'b.jar'])
+    assert report.version is None and not report.mixed
+
+
+def test_from_manifest_keeps_releases_only():
+    index = VersionIndex.from_manifest({'versions': [
+        {'id': '22w43a', 'type': 'snapshot'}, {'id': '1.19.2', 'type': 'release'}, {'id': '1.19.1', 'type': 'release'},
+    ]})
+    assert index.releases == ['1.19.2', '1.19.1']
@@ -31,8 +31,317 @@
 # TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
 # EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 
+from __init__ import *
+from backends import ScraperBackend, request_headers
+from scanindex import hash_file
+from instrument import TRACER
+
+
+# Release types in the files table, best first. R: release, B: beta, A: alpha
+RELEASE_TYPES = ('R', 'B', 'A')
+
+# A newer file picked for a mod. current_jar is the jar it replaces (file name in the mods folder).
+UpdateCandidate = namedtuple('UpdateCandidate', ['key', 'slug', 'current_jar', 'file', 'url'])
+
+# How installing one candidate went. status is one of 'installed', 'failed'
+UpdateResult = namedtuple('UpdateResult', ['key', 'jar', 'sha1', 'status', 'error'])
+
+
+class DownloadError(Exception):
+    pass
+
+
+def response_file_name(res):
+    # The name the server gives the file: Content-Disposition if it says, otherwise the last part of the URL we ended up at
+    # (CurseForge redirects downloads to its CDN, whose URLs end in the real file name). None if neither looks like a jar.
+    headers = {name.lower(): value for name, value in dict(res.headers or {}).items()}
+    match = re.search(r'filename\*?=(?:UTF-8\'\')?"?([^";]+)"?', headers.get('content-disposition', ''))
+    name = urllib.parse.unquote(match.group(1)) if match else urllib.parse.unquote(os.path.basename(urllib.parse.urlsplit(res.url or '').path))
+    name = os.path.basename(name.replace('\\', '/'))
+    return name if name.endswith('.jar') else None
+
+
 class Updater:
-    def __init__(self, mod) -> None:
+    def __init__(self, mod, workers = 4, backend = None, chunk_size = 64 * 1024, retries = 3, store = None) -> None:
+        # mod is the ModVersionMaintainer whose mods folder and scraped files we're updating.
+        # store is the JarStore (see jarstore.py) to take files from before downloading them, defaulting to the mod's own.
         self.mod = mod
+        self._store = store or getattr(mod, 'jar_store', None)
+        self._workers = max(1, workers)
+        self._retries = retries
+        self._backend = backend or mod.backend or ScraperBackend()
+        self._chunk_size = chunk_size
+
+        # Partial downloads live next to the mods (same drive, so moving them into place is atomic) until they're verified
+        self._downloads_folder = os.path.join(mod.mods_folder, '.mvm_downloads')
+        self._backups_folder = os.path.join(mod.mods_folder, '.mvm_backups')
+
+        # Jar file name -> CurseForge file id of every jar we installed, so we know exactly which file each of them is
+        self._installed_path = os.path.join(mod.mods_folder, '.mvm_installed.json')
+        try:
+            with open(self._installed_path, 'r') as file:
+                self._installed = json.load(file)
+        except (OSError, ValueError):
+            self._installed = {}
+
+    @property
+    def backups_folder(self):
+        return self._backups_folder
+
+    def installed_file(self, key, slug, current_jar):
+        # The row of the mod's files that the jar in the mods folder is, or None if we can't tell. In order of trust:
+        # the file id we installed it as, a row named like the jar, a single row naming the version in the jar's metadata.
+        files = self.mod.file_store.files(slug)
+        file_id = self._installed.get(current_jar)
+        for row in files:
+            if file_id and row.file_id == file_id:
+                return row
+
+        jar_name = os.path.splitext(current_jar)[0]
+        for row in files:
+            if row.name in (current_jar, jar_name):
+                return row
+
+        metadata = self.mod.mods_metadata.get(key)
+        version = getattr(metadata, 'version', None)
+        if version and any(character.isdigit() for character in version):
+            pattern = re.compile(rf'(?<![\w.]){re.escape(version)}(?![\w]|\.\d)')
+            named = [row for row in files if pattern.search(row.name)]
+            if len(named) == 1:
+                return named[0]
+        return None
+
+    def plan(self, release_types = ('R',)) -> list:
+        # One candidate per mod whose newest matching file is newer than the jar we already have
+        candidates = []
+        # The store answers "newest file for this version and loader" directly; files whose name doesn't give the loader away
+        # count for both loaders, and the most stable release type available wins over a newer but less stable one.
+        loader = str(self.mod.mod_type).lower()
+        for key in self.mod.mod_files:
+            slug, _ = self.mod.build_mod_link(key)
+            row = self.mod.file_store.latest(slug, self.mod.mc_version, loader, release_types)
+            current_jar = self.mod.mods_dict.get(key)
+            if current_jar is None or row is None or not row.file_id or row.name in (current_jar, os.path.splitext(current_jar)[0]):
+                continue
+
+            # Only ever forwards: a jar we can place among the files has to be older than the pick (so an installed beta
+            # that's newer than the latest release stays). A jar we can't place gets the pick, as before.
+            installed = self.installed_file(key, slug, current_jar)
+            if installed and (installed.uploaded, installed.file_id) >= (row.uploaded, row.file_id):
+                continue
+
+            candidates.append(UpdateCandidate(key, slug, current_jar, row, self.mod.build_download_link(slug, row.file_id)))
+        return candidates
+
+    def download(self, candidate, expected = None) -> tuple:
+        # Another mods folder may have downloaded this very file already
+        stored = self._from_store(candidate, expected)
+        if stored:
+            return stored
+
+        # A dropped connection just means the next attempt resumes from whatever made it to disk
+        for attempt in range(self._retries + 1):
+            try:
+                with TRACER.span('download', 'mod', key=candidate.key, attempt=attempt + 1):
+                    part_path, sha1, file_name = self._download(candidate, expected)
+                if self._store:
+                    self._store.add(part_path, sha1, name=file_name or os.path.basename(candidate.file.name))
+                    self._store.record_file(candidate.file.file_id, sha1)
+                return part_path, sha1, file_name
+            except (DownloadError, OSError) as e:
+                if attempt == self._retries:
+                    raise
+                time.sleep(2 ** attempt)
+
+    def _from_store(self, candidate, expected = None):
+        # (path of the .part file, sha1, file name) placed from the jar store without any request, or None if it doesn't have the file.
+        # The store knows files we downloaded by their id, and jars any pack already had by their file name.
+        # The stored jar still has to match whatever hashes we were given.
+        if not self._store:
+            return None
+        sha1 = self._store.sha1_for_file(candidate.file.file_id) or self._store.sha1_for_name(os.path.basename(candidate.file.name))
+        if not sha1:
+            return None
+
+        stored_path = self._store.path(sha1)
+        for name, digest in (expected or {}).items():
+            actual = sha1 if name == 'sha1' else hash_file(stored_path, name)
+            if actual.lower() != digest.lower():
+                return None
+
+        os.makedirs(self._downloads_folder, exist_ok=True)
+        part_path = os.path.join(self._downloads_folder, f"{candidate.file.file_id}.part")
+        self._store.place(sha1, part_path)
+        self._store.record_file(candidate.file.file_id, sha1)
+        TRACER.count('download.from_store')
+        return part_path, sha1, self._store.name(sha1)
+
+    def _download(self, candidate, expected = None) -> tuple:
+        # Streams the file to <mods>/.mvm_downloads/<file id>.part, picking up where an earlier attempt left off.
+        # expected optionally maps a hashlib algorithm name to the hex digest the file must have. The files table has no
+        # hashes, so nothing in MVM passes any yet; without them a download is only checked against the jar's own CRCs.
+        # Returns (path of the verified .part file, sha1, the file's real name or None if the server didn't say).
+        os.makedirs(self._downloads_folder, exist_ok=True)
+        part_path = os.path.join(self._downloads_folder, f"{candidate.file.file_id}.part")
+
+        hashes = {name: hashlib.new(name) for name in set(expected or {}) | {'sha1'}}
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+        headers = {}
+        if offset:
+            headers['Range'] = f"bytes={offset}-"
+
+        # A pooled session (warm connection, solved challenge) is borrowed for the download and handed back afterwards
+        session, res = self._backend.acquire(), None
+        try:
+            res = session.get(candidate.url, headers=request_headers(session, headers), stream=True)
+            if res.status_code == 206:
+                # Server is resuming for us; what we already have has to go through the hashes first
+                with open(part_path, 'rb') as file:
+                    for chunk in iter(lambda: file.read(self._chunk_size), b''):
+                        for digest in hashes.values(): digest.update(chunk)
+                mode = 'ab'
+            elif res.status_code == 200:
+                # Server ignored (or we didn't send) the range; start over
+                offset, mode = 0, 'wb'
+            elif res.status_code == 416:
+                # What we have is no good as a starting point (e.g. already the full file but failed verification)
+                os.remove(part_path)
+                raise DownloadError(f"{candidate.url} can't be resumed, starting over")
+            else:
+                raise DownloadError(f"{candidate.url} returned {res.status_code}")
+            file_name = response_file_name(res)
+
+            # Chunk by chunk straight to disk; the whole file is never held in memory
+            with open(part_path, mode) as file:
+                for chunk in res.iter_content(chunk_size=self._chunk_size):
+                    file.write(chunk)
+                    for digest in hashes.values(): digest.update(chunk)
+                    TRACER.count('download.bytes', len(chunk))
+        finally:
+            if res is not None: res.close()
+            self._backend.release(session, res.status_code if res is not None else None)
+
+        # Verify before it goes anywhere near the mods folder: the hashes we were given, and the jar's own CRCs
+        for name, digest in (expected or {}).items():
+            if hashes[name].hexdigest().lower() != digest.lower():
+                os.remove(part_path)
+                raise DownloadError(f"{candidate.file.name}: {name} mismatch")
+
+        try:
+            with zipfile.ZipFile(part_path) as jar:
+                bad_entry = jar.testzip()
+        except zipfile.BadZipFile:
+            bad_entry = '(not a zip file)'
+        if bad_entry:
+            os.remove(part_path)
+            raise DownloadError(f"{candidate.file.name}: corrupt jar, bad entry {bad_entry}")
+
+        return part_path, hashes['sha1'].hexdigest(), file_name
+
+    def install(self, candidates, expected = None) -> list:
+        # Downloads run concurrently; swapping jars into the mods folder happens one by one afterwards, in this thread.
+        # Every replaced jar (and any other jar the new one's name would overwrite) is moved into a snapshot folder first,
+        # along with what .mvm_installed.json said about the jars involved, so the whole update can be rolled back.
+        # expected is key -> hashes for download(); without it a jar is only checked against its own CRCs (see _download).
+        expected = expected or {}
+        results, downloaded = [], []
+
+        with ThreadPoolExecutor(max_workers=self._workers) as pool:
+            futures = {pool.submit(self.download, candidate, expected.get(candidate.key)): candidate for candidate in candidates}
+            for future in as_completed(futures):
+                candidate = futures[future]
+                try:
+                    downloaded.append((candidate, *future.result()))
+                except Exception as e:
+                    results.append(UpdateResult(candidate.key, candidate.file.name, None, 'failed', e))
+
+        if not downloaded:
+            return results
+
+        snapshot_folder = self._new_snapshot_folder()
+        # file_ids: every jar touched -> the file id .mvm_installed.json had for it before (None if it had none)
+        snapshot = {'installed': [], 'replaced': [], 'file_ids': {}}
+
+        for candidate, part_path, sha1, file_name in downloaded:
+            # The listing only has CurseForge's display name; the server's own file name wins when it told us one
+            jar_file = file_name or os.path.basename(candidate.file.name)
+            if not jar_file.endswith('.jar'):
+                jar_file += '.jar'
+
+            # The jar being replaced, and whatever jar already has the new one's name (e.g. another mod's), both go into the
+            # snapshot; nothing in the mods folder is ever overwritten without a copy to roll back to
+            for replaced in dict.fromkeys(jar for jar in (candidate.current_jar, jar_file) if jar):
+                # (a jar this same install put there is just overwritten; rolling back takes it out anyway)
+                if os.path.exists(os.path.join(self.mod.mods_folder, replaced)) and replaced not in snapshot['replaced'] + snapshot['installed']:
+                    os.replace(os.path.join(self.mod.mods_folder, replaced), os.path.join(snapshot_folder, replaced))
+                    snapshot['replaced'].append(replaced)
+            for jar in (candidate.current_jar, jar_file):
+                if jar and jar not in snapshot['file_ids']:
+                    snapshot['file_ids'][jar] = self._installed.get(jar)
+
+            os.replace(part_path, os.path.join(self.mod.mods_folder, jar_file))
+            snapshot['installed'].append(jar_file)
+            results.append(UpdateResult(candidate.key, jar_file, sha1, 'installed', None))
+            self._installed.pop(candidate.current_jar, None)
+            self._installed[jar_file] = candidate.file.file_id
+            self._save_installed()
+
+            # Written after every swap so a crash halfway still leaves a snapshot that can be rolled back
+            with open(os.path.join(snapshot_folder, 'snapshot.json'), 'w') as file:
+                json.dump(snapshot, file, indent=2)
+
+        if self._store:
+            self._store.save()
+        return results
+
+    def _new_snapshot_folder(self) -> str:
+        # <backups>/<date>-<time>-<n>: two installs within the same second still get a folder each
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        for number in itertools.count(1):
+            snapshot_folder = os.path.join(self._backups_folder, f"{stamp}-{number:03d}")
+            try:
+                os.makedirs(snapshot_folder)
+                return snapshot_folder
+            except FileExistsError:
+                continue
+
+    def _save_installed(self) -> None:
+        tmp_path = f"{self._installed_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(self._installed, file, indent=2)
+        os.replace(tmp_path, self._installed_path)
+
+    def snapshots(self) -> list:
+        # Snapshot folders, oldest first
+        if not os.path.isdir(self._backups_folder):
+            return []
+        return sorted(os.path.join(self._backups_folder, name) for name in os.listdir(self._backups_folder))
+
+    def rollback(self, snapshot_folder = None) -> None:
+        # Undo an install (the latest one by default): take out what it installed, put back what it replaced, and put
+        # .mvm_installed.json back the way it was for those jars
+        snapshot_folder = snapshot_folder or (self.snapshots() or [None])[-1]
+        if not snapshot_folder:
+            return
+
+        with open(os.path.join(snapshot_folder, 'snapshot.json'), 'r') as file:
+            snapshot = json.load(file)
+
+        for jar_file in snapshot['installed']:
+            path = os.path.join(self.mod.mods_folder, jar_file)
+            if os.path.exists(path): os.remove(path)
+
+        for jar_file in snapshot['replaced']:
+            os.replace(os.path.join(snapshot_folder, jar_file), os.path.join(self.mod.mods_folder, jar_file))
 
+        # Snapshots written before file ids were kept in them can only drop the entries of the jars they took out
+        file_ids = snapshot.get('file_ids', {jar_file: None for jar_file in snapshot['installed']})
+        for jar_file, file_id in file_ids.items():
+            if file_id is None:
+                self._installed.pop(jar_file, None)
+            else:
+                self._installed[jar_file] = file_id
+        self._save_installed()
 
+        shutil.rmtree(snapshot_folder)
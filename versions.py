@@ -0,0 +1,277 @@
+# --------------------------------
+# File      : versions.py
+# Author    : Doomlad
+# Date      : 10/18/2026
+# Info      : Minecraft version resolution for jar file names. Tokenizes every name once and
+#             looks the tokens up in an index of release ids built from the Mojang version manifest.
+# --------------------------------
+#
+# Copyright 2022 Shoaib Ali (Doomlad)
+#
+# Redistribution and use in source and binary forms, with or without modification,
+# are permitted provided that the following conditions are met:
+#
+# 1. Redistributions of source code must retain the above copyright notice,
+# this list of conditions and the following disclaimer.
+#
+# 2. Redistributions in binary form must reproduce the above copyright notice,
+# this list of conditions and the following disclaimer in the documentation and/or
+# other materials provided with the distribution.
+#
+# 3. Neither the name of the copyright holder nor the names of its contributors may be
+# used to endorse or promote products derived from this software without specific prior
+# written permission.
+#
+# THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS" AND ANY
+# EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE IMPLIED WARRANTIES
+# OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE DISCLAIMED. IN NO EVENT
+# SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE FOR ANY DIRECT, INDIRECT, INCIDENTAL,
+# SPECIAL, EXEMPLARY, OR CONSEQUENTIAL DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT
+# OF SUBSTITUTE GOODS OR SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION)
+# HOWEVER CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY, OR
+# TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE,
+# EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+
+from __init__ import *
+
+
+# Anything shaped like a dotted version number (1.19, 1.19.2, 0.58.0, ...) that isn't part of a longer one.
+# The lookbehind stops "11.19.2" from yielding "1.19.2", and because the match is greedy "1.19.2" never yields "1.19".
+_VERSION_TOKEN = re.compile(r'(?<![\d.])\d+(?:\.\d+)+')
+
+# Outcome of detecting the version of a whole mods folder.
+# version:   best guess for the folder (None if no jar mentioned a release)
+# histogram: Counter of release id -> how many jars matched it
+# per_mod:   jar file name -> release id it matched (or None, which includes jars whose range allows several releases)
+# mixed:     True if the jars point at more than one minor line (e.g. 1.18.x and 1.19.x)
+VersionReport = namedtuple('VersionReport', ['version', 'histogram', 'per_mod', 'mixed'])
+
+
+# Maven/Forge version ranges: "[1.19,1.20)", "[1.19.2]", "(,1.20)", several of them separated by commas
+_MAVEN_INTERVAL = re.compile(r'([\[(])\s*([^,\])]*?)\s*(?:(,)\s*([^\])]*?)\s*)?([\])])')
+
+# Fabric comparators: ">=1.19", "<1.20", "~1.19.2", "^1.19", "=1.19.2", "1.19.x", "1.19.2" (exact) and "*".
+# The numeric part only; "1.19-alpha.22.10" counts as 1.19.
+_FABRIC_COMPARATOR = re.compile(r'^(>=|<=|>|<|=|~|\^)?v?(\d+(?:\.(?:\d+|[xX*]))*)')
+
+# A version range as (low, low inclusive, high, high inclusive); None for an open end. Versions are int tuples.
+Interval = namedtuple('Interval', ['low', 'low_inclusive', 'high', 'high_inclusive'])
+
+
+def minor_line(version) -> str:
+    # 1.19.2 -> 1.19, 1.19 -> 1.19
+    return '.'.join(version.split('.')[:2])
+
+
+def version_key(version):
+    # "1.19" -> (1, 19, 0), so 1.19 and 1.19.0 compare equal. None if it doesn't start with a number.
+    match = re.match(r'\d+(?:\.\d+)*', version.strip().lstrip('vV'))
+    if not match:
+        return None
+    parts = tuple(int(part) for part in match.group(0).split('.'))
+    return parts + (0,) * (3 - len(parts))
+
+
+def _bump(parts, position):
+    # The first version past everything starting with parts[:position + 1]: (1, 19, 2) at 1 -> (1, 20, 0)
+    bumped = list(parts[:position + 1]) + [0] * (len(parts) - position - 1)
+    bumped[position] += 1
+    return tuple(bumped) + (0,) * (3 - len(bumped))
+
+
+def _maven_intervals(constraint) -> list:
+    # "[1.19,1.20)" -> [Interval((1, 19, 0), True, (1, 20, 0), False)]. A bare version without brackets is taken as exactly that version.
+    intervals, rest = [], constraint
+    for match in _MAVEN_INTERVAL.finditer(constraint):
+        opening, low, comma, high, closing = match.groups()
+        low_key = version_key(low) if low else None
+        if not comma:
+            # "[1.19.2]" is exactly that version
+            high_key = low_key
+        else:
+            high_key = version_key(high) if high else None
+        if (low and low_key is None) or (high and comma and high_key is None):
+            return []
+        intervals.append(Interval(low_key, opening == '[', high_key, closing == ']'))
+        rest = rest.replace(match.group(0), '', 1)
+
+    for bare in (part.strip() for part in rest.split(',')):
+        if bare:
+            key = version_key(bare)
+            if key is None:
+                return []
+            intervals.append(Interval(key, True, key, True))
+    return intervals
+
+
+def _fabric_interval(comparators):
+    # Everything space-separated in one alternative has to hold at once, so the intervals are intersected
+    low, low_inclusive, high, high_inclusive = None, True, None, True
+
+    def raise_low(key, inclusive):
+        nonlocal low, low_inclusive
+        if low is None or key > low or (key == low and not inclusive):
+            low, low_inclusive = key, inclusive
+
+    def drop_high(key, inclusive):
+        nonlocal high, high_inclusive
+        if high is None or key < high or (key == high and not inclusive):
+            high, high_inclusive = key, inclusive
+
+    for comparator in comparators:
+        if comparator in ('*', 'x', 'X'):
+            continue
+        match = _FABRIC_COMPARATOR.match(comparator)
+        if not match:
+            return None
+        operator, version = match.groups()
+        numbers = []
+        for part in version.split('.'):
+            if not part.isdigit():
+                break
+            numbers.append(int(part))
+        wildcard = len(numbers) < len(version.split('.'))
+        key = tuple(numbers) + (0,) * (3 - len(numbers))
+
+        if wildcard:
+            # "1.19.x": anything in 1.19
+            raise_low(key, True)
+            drop_high(_bump(numbers, len(numbers) - 1), False)
+        elif operator in (None, '='):
+            raise_low(key, True)
+            drop_high(key, True)
+        elif operator == '>=':
+            raise_low(key, True)
+        elif operator == '>':
+            raise_low(key, False)
+        elif operator == '<=':
+            drop_high(key, True)
+        elif operator == '<':
+            drop_high(key, False)
+        elif operator == '~':
+            # ~1.19.2 and ~1.19 stay within 1.19; ~1 within 1
+            raise_low(key, True)
+            drop_high(_bump(numbers, min(1, len(numbers) - 1)), False)
+        elif operator == '^':
+            # ^1.19 stays within 1.x
+            raise_low(key, True)
+            drop_high(_bump(numbers, 0), False)
+    return Interval(low, low_inclusive, high, high_inclusive)
+
+
+def _fabric_intervals(constraint) -> list:
+    # ">=1.19 <1.20 || 1.18.2" -> one interval per || alternative. "1.19 - 1.19.2" is a hyphen range.
+    intervals = []
+    for alternative in constraint.split('||'):
+        alternative = re.sub(r'(>=|<=|>|<|=|~|\^)\s+', r'\1', alternative.strip())
+        alternative = re.sub(r'(\S+)\s+-\s+(\S+)', r'>=\1 <=\2', alternative)
+        interval = _fabric_interval(alternative.split())
+        if interval is None:
+            return []
+        intervals.append(interval)
+    return intervals
+
+
+def parse_range(constraint) -> list:
+    # The intervals a jar's Minecraft version constraint allows, in Forge (Maven) or Fabric syntax. [] if it can't be read.
+    constraint = str(constraint or '').strip()
+    if not constraint:
+        return []
+    if '[' in constraint or '(' in constraint:
+        return _maven_intervals(constraint)
+    return _fabric_intervals(constraint)
+
+
+def in_range(version, intervals) -> bool:
+    key = version_key(version)
+    for interval in intervals:
+        if interval.low is not None and (key < interval.low or (key == interval.low and not interval.low_inclusive)):
+            continue
+        if interval.high is not None and (key > interval.high or (key == interval.high and not interval.high_inclusive)):
+            continue
+        return True
+    return False
+
+
+class VersionIndex:
+    def __init__(self, release_ids) -> None:
+        # release_ids newest first, like the manifest lists them. The position doubles as a "newness" rank.
+        self._rank = {}
+        for rank, release_id in enumerate(release_ids):
+            self._rank.setdefault(str(release_id).strip(), rank)
+
+    @classmethod
+    def from_manifest(cls, manifest):
+        # Works the same with a freshly downloaded manifest or the copy served by the response cache
+        return cls(version['id'] for version in manifest['versions'] if version['type'] == 'release')
+
+    @property
+    def releases(self):
+        return list(self._rank)
+
+    def __contains__(self, version):
+        return version in self._rank
+
+    def __len__(self):
+        return len(self._rank)
+
+    def _specificity(self, version):
+        # More components wins (1.19.2 over 1.19), then the newer release
+        return (version.count('.'), -self._rank[version])
+
+    def match(self, jar_file):
+        # Best release id mentioned in a single jar file name, or None
+        best = None
+        for token in _VERSION_TOKEN.findall(jar_file):
+            if token in self._rank and (best is None or self._specificity(token) > self._specificity(best)):
+                best = token
+        return best
+
+    def allowed(self, constraint) -> list:
+        # Known releases a Minecraft version range allows, newest first. [] if the range can't be read.
+        intervals = parse_range(constraint)
+        return [release for release in self._rank if in_range(release, intervals)]
+
+    def match_range(self, constraint, jar_file = ''):
+        # Release a jar is for according to the Minecraft version range its metadata declares, or None if that says too little.
+        # The range only confirms the release in the file name (a jar for 1.19.2 declaring [1.19,1.20)), or names one by itself
+        # when it allows exactly one ("1.19.2", "[1.19.2]"). ">=1.16" or "~1.19" is what the jar runs on, not what it was built
+        # for, so picking one of its releases would only be a guess.
+        allowed = self.allowed(constraint)
+        from_name = self.match(jar_file)
+        if from_name and from_name in allowed:
+            return from_name
+        return allowed[0] if len(allowed) == 1 else None
+
+    def detect(self, jar_files, constraints = None) -> VersionReport:
+        # One pass over the jars, one set lookup per token; no more scanning every release for every mod.
+        # constraints optionally maps a jar file name to the Minecraft version range its own metadata declares. A range
+        # checks the file name's release, but one that allows several releases never votes by itself; it only breaks ties
+        # between the releases other jars voted for.
+        constraints = constraints or {}
+        per_mod, ranges = {}, []
+        for jar_file in jar_files:
+            allowed = self.allowed(constraints[jar_file]) if constraints.get(jar_file) else []
+            if not allowed:
+                # No range, or nothing we know of fits it; the file name is all there is to go on
+                per_mod[jar_file] = self.match(jar_file)
+                continue
+            per_mod[jar_file] = self.match_range(constraints[jar_file], jar_file)
+            if per_mod[jar_file] is None:
+                ranges.append(set(allowed))
+        histogram = Counter(version for version in per_mod.values() if version)
+
+        if not histogram:
+            return VersionReport(None, histogram, per_mod, False)
+
+        # The minor line most jars agree on wins, then the most common version within it. Ties go to the one most of the
+        # remaining ranges allow, then the more specific/newer one, so {1.19: 3, 1.19.2: 3} guesses 1.19.2.
+        fits = {version: sum(version in allowed for allowed in ranges) for version in histogram}
+        rank = lambda v: (fits[v], self._specificity(v))
+        lines = Counter()
+        for version, count in histogram.items():
+            lines[minor_line(version)] += count
+        line = max(lines, key=lambda line: (lines[line], max(rank(v) for v in histogram if minor_line(v) == line)))
+        version = max((v for v in histogram if minor_line(v) == line), key=lambda v: (histogram[v], rank(v)))
+
+        return VersionReport(version, histogram, per_mod, len(lines) > 1)